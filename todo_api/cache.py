@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+
+class LRUCache:
+    """
+    Small thread-safe, per-process LRU cache whose entries also expire after
+    ``ttl`` seconds. Used for hot lookups that would otherwise hit the database
+    on every request.
+    """
+    _missing = object()
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, self._missing)
+            if entry is self._missing:
+                return default
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Version counters kept in Django's cache (shared between workers with a shared
+# backend). They start from the current time, so a counter evicted from the cache
+# never comes back with a value an old entry, or an old ETag, could match.
+
+def _new_counter():
+    return time.time_ns()
+
+
+def get_counter(key):
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, _new_counter(), None)
+        value = cache.get(key)
+    return value
+
+
+async def aget_counter(key):
+    value = await cache.aget(key)
+    if value is None:
+        await cache.aadd(key, _new_counter(), None)
+        value = await cache.aget(key)
+    return value
+
+
+def bump_counter(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_counter(), None)
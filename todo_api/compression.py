@@ -0,0 +1,71 @@
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered.
+    brotli = None
+
+
+# Content codings used by `todo_api.middleware.CompressionMiddleware`, in order of
+# preference when the client accepts several with the same q-value.
+
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding, encodings=ENCODINGS):
+    """
+    Returns the coding of ``encodings`` the ``Accept-Encoding`` header value
+    prefers, or None if it accepts none of them.
+    """
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        weight = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in encodings:
+        weight = weights.get(coding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def _compressor(encoding, level):
+    # Returns (compress(chunk), flush(), finish()) for one response body.
+    if encoding == 'br':
+        compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=level)
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def compress(content, encoding, level):
+    compress_chunk, _, finish = _compressor(encoding, level)
+    return compress_chunk(content) + finish()
+
+
+def compress_stream(chunks, encoding, level):
+    # Every chunk is flushed as it comes, so a streamed response keeps streaming.
+    compress_chunk, flush, finish = _compressor(encoding, level)
+    for chunk in chunks:
+        data = compress_chunk(chunk) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+async def acompress_stream(chunks, encoding, level):
+    compress_chunk, flush, finish = _compressor(encoding, level)
+    async for chunk in chunks:
+        data = compress_chunk(chunk) + flush()
+        if data:
+            yield data
+    yield finish()
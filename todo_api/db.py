@@ -0,0 +1,21 @@
+from django.db import transaction
+
+
+def delete_in_batches(queryset, batch_size=1000):
+    """
+    Delete the rows matched by ``queryset`` in primary-key batches, each one in
+    its own short transaction, so large purges never hold long table locks.
+    Batches go through the model's default manager, so a custom
+    ``QuerySet.delete()`` still runs. Returns the number of rows of
+    ``queryset.model`` that were deleted.
+    """
+    model = queryset.model
+    queryset = queryset.order_by('pk')
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        with transaction.atomic(using=queryset.db):
+            _, per_model = model._default_manager.using(queryset.db).filter(pk__in=pks).delete()
+        deleted += per_model.get(model._meta.label, 0)
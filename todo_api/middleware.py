@@ -0,0 +1,140 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from todo_api.compression import acompress_stream, choose_encoding, compress, compress_stream
+from todo_api.periodic import load_periodic_jobs
+
+
+class PeriodicJobsMiddleware:
+    """
+    Triggers the jobs configured in ``settings.PERIODIC_JOBS`` once they are
+    due. The jobs run in a background thread, so the request is never delayed.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.jobs = load_periodic_jobs()
+        if not self.jobs:
+            raise MiddlewareNotUsed
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        self.run_due_jobs()
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        self.run_due_jobs()
+        return response
+
+    def run_due_jobs(self):
+        for job in self.jobs:
+            job.run_if_due()
+
+
+class CompressionMiddleware:
+    """
+    Compresses API responses (``COMPRESSION_CONTENT_TYPES``) with Brotli or gzip,
+    whichever the client's ``Accept-Encoding`` prefers. Bodies smaller than
+    ``COMPRESSION_MIN_SIZE`` and responses that already have a
+    ``Content-Encoding`` are sent as they are; streaming responses are
+    compressed chunk by chunk.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.levels = {'br': settings.COMPRESSION_BROTLI_QUALITY, 'gzip': settings.COMPRESSION_GZIP_LEVEL}
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def is_compressible(self, response):
+        if response.has_header('Content-Encoding') or response.has_header('Content-Range'):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if not content_type.startswith(settings.COMPRESSION_CONTENT_TYPES):
+            return False
+        return response.streaming or len(response.content) >= settings.COMPRESSION_MIN_SIZE
+
+    def process_response(self, request, response):
+        if not self.is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        level = self.levels[encoding]
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(response.streaming_content, encoding, level)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, encoding, level)
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The compressed bytes differ from the identity ones: a strong ETag must become weak.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = encoding
+        return response
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware that can also run in async mode. WhiteNoise's own
+    middleware is sync only, and Django adapts the whole chain below a sync-only
+    middleware to sync: under ASGI every request, async views included, would run
+    in a worker thread. Here requests that are not for a static file go straight
+    to the next middleware; only serving a file (or looking it up on disk, with
+    autorefresh) runs in a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(self.get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -1,6 +1,241 @@
-from rest_framework.pagination import LimitOffsetPagination
+import json
+
+from asgiref.sync import sync_to_async
+from django.core import signing
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 
 class DefaultPaginationLOS(LimitOffsetPagination):
-    default_limit = 10
\ No newline at end of file
+    """
+    Limit/offset pagination. By default every page reports the exact total
+    (``count``), which costs a full COUNT(*). Clients can pick a cheaper mode
+    with ``?count=``:
+
+    * ``none``: ``count`` is null; ``next`` is still correct.
+    * ``capped``: the exact count up to ``count_cap``, else e.g. ``"1000+"``.
+    * ``estimate``: the query planner's row estimate on PostgreSQL; other
+      databases fall back to ``capped``.
+
+    When the requested page is the last one the exact count is free, so it is
+    returned in every mode.
+    """
+    default_limit = 10
+    count_query_param = 'count'
+    count_modes = ('exact', 'none', 'capped', 'estimate')
+    count_cap = 1000
+
+    def get_count_mode(self, request):
+        mode = request.query_params.get(self.count_query_param, 'exact')
+        return mode if mode in self.count_modes else 'exact'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count_mode = self.get_count_mode(request)
+        if self.count_mode == 'exact':
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        page = self.set_page(list(queryset[self.offset:self.offset + self.limit + 1]))
+        if self.count is None and self.count_mode == 'capped':
+            self.count = self.format_capped_count(queryset[:self.count_cap + 1].count())
+        elif self.count is None and self.count_mode == 'estimate':
+            self.count = self.estimate_count(queryset)
+        return page
+
+    def set_page(self, rows):
+        # Fetching one row more than the page tells whether there is a next page
+        # without counting; on the last page the total is known exactly.
+        self.has_next = len(rows) > self.limit
+        page = rows[:self.limit]
+        if not self.has_next and (page or self.offset == 0):
+            self.count = self.offset + len(page)
+        else:
+            self.count = None
+        return page
+
+    def format_capped_count(self, count):
+        return f'{self.count_cap}+' if count > self.count_cap else count
+
+    def estimate_count(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return self.format_capped_count(queryset[:self.count_cap + 1].count())
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def get_next_link(self):
+        if self.count_mode == 'exact':
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # Async counterpart of `paginate_queryset` for views using the async ORM.
+        self.count_mode = self.get_count_mode(request)
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        if self.count_mode != 'exact':
+            self.offset = self.get_offset(request)
+            page = self.set_page([obj async for obj in queryset[self.offset:self.offset + self.limit + 1]])
+            if self.count is None and self.count_mode == 'capped':
+                self.count = self.format_capped_count(await queryset[:self.count_cap + 1].acount())
+            elif self.count is None and self.count_mode == 'estimate':
+                self.count = await sync_to_async(self.estimate_count)(queryset)
+            return page
+
+        self.count = await queryset.acount()
+        self.offset = self.get_offset(request)
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+
+        if self.count == 0 or self.offset > self.count:
+            return []
+        return [obj async for obj in queryset[self.offset:self.offset + self.limit]]
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination: each page continues strictly after the last row of
+    the previous one, on (ordering field, pk). Deep pages cost the same as the
+    first one, no COUNT(*) is run, and rows inserted meanwhile never shift pages.
+
+    The view declares the orderings it supports in ``keyset_ordering_fields`` and
+    its default in ``keyset_default_ordering``; the client picks one with the
+    usual ``?ordering=`` parameter. Cursors are opaque and signed.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    ordering_query_param = 'ordering'
+    default_limit = 10
+    max_limit = 100
+    invalid_cursor_message = 'Invalid cursor'
+    salt = 'todo_api.pagination.KeysetPagination'
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def get_ordering(self, request, view):
+        fields = getattr(view, 'keyset_ordering_fields', [])
+        ordering = request.query_params.get(self.ordering_query_param, '')
+        if ordering.lstrip('-') in fields:
+            return ordering
+        return getattr(view, 'keyset_default_ordering', 'pk')
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            ordering, value, pk = signing.loads(encoded, salt=self.salt)
+        except (signing.BadSignature, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if ordering != self.ordering:
+            raise NotFound(self.invalid_cursor_message)
+        field = queryset.model._meta.get_field(self.field_name)
+        return field.to_python(value), pk
+
+    def encode_cursor(self, obj):
+        value = getattr(obj, self.field_name)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        return signing.dumps([self.ordering, value, obj.pk], salt=self.salt, compress=True)
+
+    def get_page_queryset(self, queryset, request, view):
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = self.get_ordering(request, view)
+        self.field_name = self.ordering.lstrip('-')
+        descending = self.ordering.startswith('-')
+
+        if self.field_name == 'pk':
+            queryset = queryset.order_by('-pk' if descending else 'pk')
+        else:
+            queryset = queryset.order_by(self.ordering, '-pk' if descending else 'pk')
+
+        position = self.decode_cursor(request, queryset)
+        if position is not None:
+            value, pk = position
+            after = 'lt' if descending else 'gt'
+            if self.field_name == 'pk':
+                queryset = queryset.filter(**{f'pk__{after}': pk})
+            else:
+                # The leading `field <= value` (or `>=`) keeps the condition index-friendly.
+                bound = 'lte' if descending else 'gte'
+                queryset = queryset.filter(
+                    Q(**{f'{self.field_name}__{bound}': value}),
+                    Q(**{f'{self.field_name}__{after}': value}) | Q(**{f'pk__{after}': pk}),
+                )
+        # One extra row tells whether there is a next page.
+        return queryset[:self.limit + 1]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows = list(self.get_page_queryset(queryset, request, view))
+        return self.set_page(rows)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        rows = [obj async for obj in self.get_page_queryset(queryset, request, view)]
+        return self.set_page(rows)
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.limit
+        self.page = rows[:self.limit]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class KeysetPaginationMixin:
+    """
+    Lets a view's listing opt in to `KeysetPagination` by sending ``?cursor=``
+    (empty for the first page); otherwise ``pagination_class`` is used.
+    """
+    keyset_pagination_class = KeysetPagination
+
+    def get_paginator(self, request):
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            return self.keyset_pagination_class()
+        return self.pagination_class()
@@ -0,0 +1,54 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """
+    Runs ``func`` in a background thread at most once every ``interval``
+    seconds. Jobs are triggered opportunistically by ``PeriodicJobsMiddleware``
+    so no scheduler process is needed; an interval of 0 disables the job.
+    """
+
+    def __init__(self, func, interval):
+        self.func = func
+        self.interval = interval
+        self._next_run = time.monotonic() + interval
+        self._running = False
+        self._lock = threading.Lock()
+
+    def run_if_due(self):
+        if self.interval <= 0 or time.monotonic() < self._next_run:
+            return False
+        with self._lock:
+            if self._running or time.monotonic() < self._next_run:
+                return False
+            self._running = True
+            self._next_run = time.monotonic() + self.interval
+        threading.Thread(target=self._run, daemon=True).start()
+        return True
+
+    def _run(self):
+        try:
+            result = self.func()
+            logger.info("Periodic job %s finished: %s", self.func.__qualname__, result)
+        except Exception:
+            logger.exception("Periodic job %s failed", self.func.__qualname__)
+        finally:
+            self._running = False
+            connections.close_all()
+
+
+def load_periodic_jobs():
+    jobs = []
+    for path, interval in getattr(settings, 'PERIODIC_JOBS', {}).items():
+        if interval and interval > 0:
+            jobs.append(PeriodicJob(import_string(path), interval))
+    return jobs
@@ -53,9 +53,14 @@ INSTALLED_APPS = [
     'workspace.apps.WorkspaceConfig'
 ]
 
+# Everything here can run in async mode, so under ASGI the chain is not adapted to sync.
+# Django's own MiddlewareMixin middleware still run their hooks through sync_to_async
+# (a thread hop each); `manage.py benchmark_middleware` measures what that costs.
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'todo_api.middleware.CompressionMiddleware',
+    'todo_api.middleware.PeriodicJobsMiddleware',
+    'todo_api.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -97,6 +102,34 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The membership cache and version counters must be shared between workers in
+# production; set REDIS_URL (requires the `redis` package) when running more
+# than one worker process.
+
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Whether every worker process sees the same `default` cache. What has to agree between
+# workers (list ETag versions, the membership cache) is only used when it does: with the
+# per-process LocMemCache a write in one worker would go unnoticed by the others. A
+# single-process deployment can opt in with CACHE_IS_SHARED=1.
+CACHE_IS_SHARED = bool(REDIS_URL) or os.environ.get('CACHE_IS_SHARED') == '1'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -150,7 +183,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'user.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
@@ -174,4 +207,66 @@ SIMPLE_JWT = {
     'BLACKLIST_ENABLED': True,
 }
 
+# Maximum delay (in seconds) before an access token revoked in one worker is
+# rejected by every other worker's in-memory blacklist.
+ACCESS_TOKEN_BLACKLIST_REFRESH_SECONDS = int(os.environ.get('ACCESS_TOKEN_BLACKLIST_REFRESH_SECONDS', 5))
+
+# Per-worker cache of authenticated users (see user.authentication). Entries are
+# invalidated on User save/delete in the same worker; the TTL bounds how long
+# another worker can keep serving a stale user.
+AUTH_USER_CACHE_SIZE = 1024
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 60))
+
+# Per-worker LRU in front of the shared workspace membership cache
+# (see workspace.membership).
+MEMBERSHIP_CACHE_SIZE = 4096
+MEMBERSHIP_CACHE_TTL = 300
+
+# Rows deleted per transaction when purging expired blacklisted access tokens.
+BLACKLIST_PURGE_BATCH_SIZE = 1000
+
+
+# In-process periodic jobs (dotted path -> interval in seconds), triggered by
+# PeriodicJobsMiddleware. An interval of 0 disables the job; use the matching
+# management command from a cron job instead when running many workers.
+PERIODIC_JOBS = {
+    'user.jobs.purge_expired_access_tokens': int(os.environ.get('BLACKLIST_PURGE_INTERVAL', 0)),
+    'workspace.jobs.purge_old_completed_tasks': int(os.environ.get('TASK_PURGE_INTERVAL', 0)),
+    'workspace.jobs.purge_task_tombstones': int(os.environ.get('TOMBSTONE_PURGE_INTERVAL', 0)),
+}
+
+# Completed tasks are purged once their final_at is older than this many days.
+COMPLETED_TASK_RETENTION_DAYS = int(os.environ.get('COMPLETED_TASK_RETENTION_DAYS', 90))
+TASK_PURGE_BATCH_SIZE = 500
+
+# Task sync endpoints (see workspace.sync): deleted-task tombstones are kept this many
+# days, which is also how old a sync token may be; changes are looked up from the
+# token's time minus the safety margin.
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+SYNC_SAFETY_MARGIN_SECONDS = 10
+# Most changed tasks per sync response; more are paged with the returned `sync_token`.
+SYNC_PAGE_SIZE = 500
+
+# Largest array accepted by the bulk task endpoints.
+BULK_TASK_MAX_ITEMS = 1000
+# Largest list of usernames accepted by the bulk membership endpoint.
+BULK_MEMBERSHIP_MAX_ITEMS = 1000
+
+# Rows read (and sent) per chunk by the streaming task exports.
+EXPORT_CHUNK_SIZE = 2000
+
+# Rows written per transaction by the task imports (endpoint and `import_tasks`).
+IMPORT_BATCH_SIZE = 1000
+# Row errors returned by the import endpoint; `import_tasks` reports all of them.
+IMPORT_MAX_REPORTED_ERRORS = 100
+
+# Response compression (todo_api.middleware.CompressionMiddleware). Brotli quality
+# goes from 0 to 11 and gzip level from 1 to 9: higher is smaller but costs more CPU
+# per response; `manage.py benchmark_compression` measures both.
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+# Only API payloads: HTML pages carry CSRF tokens, which compression would expose (BREACH).
+COMPRESSION_CONTENT_TYPES = ('application/json', 'application/x-ndjson', 'text/csv')
+
 CORS_ORIGIN_ALLOW_ALL = True
\ No newline at end of file
@@ -0,0 +1,66 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView that is dispatched as a coroutine, so it runs natively on the ASGI
+    server. Handlers may be ``async def`` (and use the async ORM) or plain
+    methods, which are run in a worker thread. Authentication, permission
+    checks and other sync hooks in ``initial()`` also run in a thread.
+    """
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(),
+                                  self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    def filter_queryset(self, queryset):
+        for backend in getattr(self, 'filter_backends', []):
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+
+async def _aiterate(iterator):
+    # Each chunk is produced in the request's sync thread (thread_sensitive), the
+    # one that owns the database connection and any open cursor.
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    done = object()
+    while (chunk := await next_chunk(iterator, done)) is not done:
+        yield chunk
+
+
+def streaming_response(request, chunks, content_type, **kwargs):
+    """
+    StreamingHttpResponse over the sync iterator ``chunks`` that stays streamed
+    under both servers: Django would otherwise read a sync iterator to the end
+    before sending anything when running under ASGI.
+    """
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = _aiterate(iter(chunks))
+    return StreamingHttpResponse(chunks, content_type=content_type, **kwargs)
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.validators import validate_email
@@ -11,21 +13,15 @@ class RegistroSerializer(serializers.ModelSerializer):
         model = User  
         fields = ['username', 'email', 'first_name', 'last_name' , 'password' ]
         extra_kwargs = {  
-            'password': {'write_only': True}  
+            'password': {'write_only': True},
+            # La unicidad del nombre de usuario la garantiza la base de datos (ver `create`),
+            # así que se omite el UniqueValidator que añade DRF y que haría otra consulta.
+            'username': {'validators': [UnicodeUsernameValidator()]},
         }
 
     # Metodo para validar los datos de entrada
     def validate(self, data):  
 
-
-        # Verificar que el correo electrónico no esté en uso
-        if User.objects.filter(email=data['email']).exists():  
-            raise serializers.ValidationError({'email': 'El email ya está registrado.'})  
-
-        # Verificar que el nombre de usuario no esté en uso
-        if User.objects.filter(username=data['username']).exists():
-            raise serializers.ValidationError({'username': 'El nombre de usuario ya está en uso.'})
-
         # Validar el formato del correo electrónico
         try:
             validate_email(data['email'])
@@ -41,7 +37,16 @@ class RegistroSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = User(**validated_data)
         user.set_password(validated_data['password'])
-        user.save()
+
+        # El email y el nombre de usuario son únicos en la base de datos, así que el alta
+        # es un único INSERT. Solo si falla se consulta cuál de los dos está en uso.
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            if User.objects.filter(email=validated_data['email']).exists():
+                raise serializers.ValidationError({'email': ['El email ya está registrado.']})
+            raise serializers.ValidationError({'username': ['El nombre de usuario ya está en uso.']})
         return UserSerializer(user).data
     
     
@@ -8,7 +8,11 @@ from rest_framework.response import Response
 from .serializers import UserSerializer
 from rest_framework.permissions import IsAdminUser
 from user.models import BlacklistedAccessToken
+from user.blacklist import access_token_blacklist
+from user.cache import user_cache
 from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
 from .serializers import CustomTokenObtainPairSerializer
 
 
@@ -41,15 +45,19 @@ def logout_view(request):
         if refresh_token is None or auth_header is None:
             return Response({"error": "Faltan tokens en la solicitud"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Extrae el token de acceso del encabezado de autorización.
-        access_token = auth_header.split(" ")[1]
-
         # Marca el token de refresco como inválido (lo agrega a la lista negra).
         token = RefreshToken(refresh_token)
         token.blacklist()
 
-        # Marca el token de acceso como inválido almacenándolo en la base de datos.
-        BlacklistedAccessToken.objects.create(token=access_token)
+        # Marca el token de acceso como inválido guardando solo su jti y su expiración.
+        # `request.auth` es el token de acceso ya validado por la autenticación JWT.
+        jti = request.auth[api_settings.JTI_CLAIM]
+        expires_at = datetime_from_epoch(request.auth['exp'])
+        BlacklistedAccessToken.objects.create(jti=jti, expires_at=expires_at)
+
+        # Lo añade también a la lista negra en memoria de este proceso; el resto de procesos
+        # lo verán en su próximo refresco (`ACCESS_TOKEN_BLACKLIST_REFRESH_SECONDS`).
+        access_token_blacklist.add(jti, expires_at)
 
         # Devuelve una respuesta con el código de estado 205 (contenido restablecido).
         return Response(status=status.HTTP_205_RESET_CONTENT)
@@ -69,6 +77,12 @@ class UserDeleteView(generics.DestroyAPIView):
     serializer_class = UserSerializer
     # Especifica los permisos requeridos para acceder a esta vista.
     permission_classes = [IsAdminUser]
+
+    def perform_destroy(self, instance):
+        user_id = instance.pk
+        super().perform_destroy(instance)
+        # Elimina al usuario de la caché de autenticación para que sus tokens dejen de funcionar.
+        user_cache.invalidate(user_id)
     
 
 
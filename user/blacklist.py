@@ -0,0 +1,103 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils.timezone import now
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import BlacklistedAccessToken
+
+
+# Copia en memoria (por proceso) de la lista negra de tokens de acceso.
+# Evita consultar la base de datos en cada solicitud autenticada: las búsquedas
+# se resuelven contra un conjunto de `jti` y la base de datos solo se consulta
+# al refrescar, como máximo una vez cada `ACCESS_TOKEN_BLACKLIST_REFRESH_SECONDS`.
+
+class AccessTokenBlacklist:
+
+    def __init__(self, refresh_interval=None):
+        self._refresh_interval = refresh_interval
+        self._jtis = {}  # jti -> expires_at
+        self._last_seen = None  # Mayor `blacklisted_at` leído de la base de datos.
+        self._next_refresh = 0.0
+        self._warm = False
+        self._lock = threading.Lock()
+
+    @property
+    def refresh_interval(self):
+        if self._refresh_interval is not None:
+            return self._refresh_interval
+        return getattr(settings, 'ACCESS_TOKEN_BLACKLIST_REFRESH_SECONDS', 5)
+
+    def needs_refresh(self):
+        return not self._warm or time.monotonic() >= self._next_refresh
+
+    def refresh(self):
+        # Solo un hilo refresca a la vez; los demás siguen usando el conjunto actual.
+        if not self._lock.acquire(blocking=not self._warm):
+            return
+        try:
+            if not self.needs_refresh():
+                return
+
+            queryset = BlacklistedAccessToken.objects.all()
+            if self._last_seen is not None:
+                # Se solapa una ventana igual al intervalo para no perder filas cuya
+                # transacción se confirmó después de otra con un `blacklisted_at` mayor.
+                since = self._last_seen - timedelta(seconds=self.refresh_interval)
+                queryset = queryset.filter(blacklisted_at__gte=since)
+
+            current_time = now()
+            queryset = queryset.filter(expires_at__gt=current_time)
+            rows = queryset.values_list('jti', 'expires_at', 'blacklisted_at').iterator()
+            for jti, expires_at, blacklisted_at in rows:
+                self._jtis[jti] = expires_at
+                if self._last_seen is None or blacklisted_at > self._last_seen:
+                    self._last_seen = blacklisted_at
+
+            # Los tokens expirados ya no pueden usarse, así que se descartan de memoria.
+            self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > current_time}
+
+            self._warm = True
+            self._next_refresh = time.monotonic() + self.refresh_interval
+        finally:
+            self._lock.release()
+
+    def add(self, jti, expires_at):
+        # Registra una revocación hecha en este proceso sin esperar al siguiente refresco.
+        # Con el cerrojo: `refresh()` recorre y reconstruye el diccionario mientras lo tiene.
+        with self._lock:
+            self._jtis[jti] = expires_at
+
+    def contains(self, jti, refresh=True):
+        # Con `refresh=False` nunca se consulta la base de datos (por ejemplo, en código
+        # asíncrono, que refresca antes por su cuenta con `sync_to_async`).
+        if refresh and self.needs_refresh():
+            self.refresh()
+        return jti in self._jtis
+
+    def clear(self):
+        with self._lock:
+            self._jtis = {}
+            self._last_seen = None
+            self._next_refresh = 0.0
+            self._warm = False
+
+    @staticmethod
+    def get_jti(token):
+        # Sin verificar la firma ni la expiración: solo sirve para buscar el jti en la lista
+        # negra. La autenticación JWT verifica el token después; uno falsificado se rechaza
+        # allí, esté o no su jti en la lista.
+        # Como nada está verificado, el claim puede ser de cualquier tipo (una lista no se
+        # puede buscar en el diccionario); solo se acepta una cadena.
+        try:
+            jti = AccessToken(token, verify=False).get(api_settings.JTI_CLAIM)
+        except TokenError:
+            return None
+        return jti if isinstance(jti, str) else None
+
+
+access_token_blacklist = AccessTokenBlacklist()
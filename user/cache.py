@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS
+
+from todo_api.cache import LRUCache
+
+
+# Caché por proceso de los usuarios autenticados. Guarda solo los valores de las
+# columnas (una tupla) y construye una instancia nueva de `User` en cada acierto,
+# de modo que las solicitudes concurrentes nunca comparten el mismo objeto.
+
+class UserCache:
+
+    def __init__(self, maxsize, ttl):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._field_names = [field.attname for field in User._meta.concrete_fields]
+
+    def get(self, user_id):
+        values = self._cache.get(str(user_id))
+        if values is None:
+            return None
+        return User.from_db(DEFAULT_DB_ALIAS, self._field_names, values)
+
+    def set(self, user):
+        values = tuple(getattr(user, name) for name in self._field_names)
+        self._cache.set(str(user.pk), values)
+
+    def invalidate(self, user_id):
+        self._cache.delete(str(user_id))
+
+    def clear(self):
+        self._cache.clear()
+
+
+user_cache = UserCache(maxsize=settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL)
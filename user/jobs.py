@@ -0,0 +1,7 @@
+from .models import BlacklistedAccessToken
+
+
+# Tareas periódicas de la aplicación `user`. Se activan desde `PERIODIC_JOBS` en settings.
+
+def purge_expired_access_tokens():
+    return BlacklistedAccessToken.purge_expired()
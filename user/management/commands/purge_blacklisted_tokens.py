@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from user.models import BlacklistedAccessToken
+
+
+class Command(BaseCommand):
+    help = "Delete expired access tokens from the blacklist in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.BLACKLIST_PURGE_BATCH_SIZE,
+            help="Number of rows deleted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        purged = BlacklistedAccessToken.purge_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired blacklisted access tokens."))
@@ -1,6 +1,8 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import SynchronousOnlyOperation
+from django.db import DatabaseError
 from django.utils.deprecation import MiddlewareMixin
-from rest_framework_simplejwt.tokens import AccessToken
-from .models import BlacklistedAccessToken
+from .blacklist import access_token_blacklist
 from django.http import JsonResponse
 from rest_framework import status
 
@@ -11,7 +13,30 @@ class BlacklistAccessTokenMiddleware(MiddlewareMixin):
     # Esta clase extiende MiddlewareMixin, lo que permite que se utilice como middleware en Django.
     # Su propósito es interceptar las solicitudes entrantes y verificar si el token de acceso está en la lista negra.
 
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        # Precarga la lista negra en memoria al iniciar el proceso. Si la base de datos
+        # aún no está disponible (por ejemplo, sin migrar) o el middleware se crea dentro del
+        # bucle de eventos (ASGI), se cargará en la primera solicitud.
+        try:
+            access_token_blacklist.refresh()
+        except (DatabaseError, SynchronousOnlyOperation):
+            pass
+
+    async def __acall__(self, request):
+        # Versión asíncrona (ASGI). La comprobación se hace en memoria en el propio bucle de
+        # eventos; solo el refresco periódico de la lista negra se ejecuta en un hilo.
+        if access_token_blacklist.needs_refresh():
+            await sync_to_async(access_token_blacklist.refresh)()
+        response = self.check_token(request, refresh=False)
+        if response is None:
+            response = await self.get_response(request)
+        return response
+
     def process_request(self, request):
+        return self.check_token(request)
+
+    def check_token(self, request, refresh=True):
         # Este metodo se ejecuta antes de que la solicitud sea procesada por las vistas.
         # Aquí se realiza la lógica para verificar el token de acceso.
 
@@ -26,12 +51,17 @@ class BlacklistAccessTokenMiddleware(MiddlewareMixin):
             access_token = auth_header.split(' ')[1]
             # Extrae el token de acceso del encabezado de autorización.
 
-            if BlacklistedAccessToken.objects.filter(token=access_token).exists():
-                # Consulta la base de datos para verificar si el token de acceso está en la lista negra.
+            jti = access_token_blacklist.get_jti(access_token)
+            # Obtiene el identificador (jti) del token. Si el token no es válido se deja pasar,
+            # ya que la autenticación JWT lo rechazará más adelante.
+
+            if jti is not None and access_token_blacklist.contains(jti, refresh=refresh):
+                # Consulta la copia en memoria de la lista negra; la base de datos solo se
+                # consulta al refrescarla, cada `ACCESS_TOKEN_BLACKLIST_REFRESH_SECONDS` segundos.
                 # Si el token está en la lista negra, se bloquea la solicitud.
 
                 return JsonResponse(
                     {"detail": "Token is blacklisted", "code": "token_not_valid"},
                     status=status.HTTP_401_UNAUTHORIZED
                 )
-                # Devuelve una respuesta JSON con un mensaje de error y un código de estado 401 (no autorizado).
\ No newline at end of file
+                # Devuelve una respuesta JSON con un mensaje de error y un código de estado 401 (no autorizado).
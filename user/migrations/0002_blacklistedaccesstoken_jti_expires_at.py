@@ -0,0 +1,65 @@
+# Generated by Django 5.2 on 2026-10-16 10:00
+
+from datetime import datetime, timezone
+
+import jwt
+from django.db import migrations, models
+
+
+def tokens_to_jti(apps, schema_editor):
+    # Extrae jti y exp de los tokens guardados. Los que no se pueden leer o ya
+    # expiraron se descartan: la autenticación JWT los rechaza de todos modos.
+    BlacklistedAccessToken = apps.get_model('user', 'BlacklistedAccessToken')
+    current_time = datetime.now(tz=timezone.utc)
+    for entry in BlacklistedAccessToken.objects.all().iterator():
+        try:
+            payload = jwt.decode(entry.token, options={'verify_signature': False})
+            entry.jti = payload['jti']
+            entry.expires_at = datetime.fromtimestamp(payload['exp'], tz=timezone.utc)
+        except (jwt.InvalidTokenError, KeyError, TypeError, ValueError):
+            entry.delete()
+            continue
+        if entry.expires_at <= current_time:
+            entry.delete()
+        else:
+            entry.save(update_fields=['jti', 'expires_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blacklistedaccesstoken',
+            name='jti',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='blacklistedaccesstoken',
+            name='expires_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(tokens_to_jti, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='blacklistedaccesstoken',
+            name='token',
+        ),
+        migrations.AlterField(
+            model_name='blacklistedaccesstoken',
+            name='jti',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='blacklistedaccesstoken',
+            name='expires_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='blacklistedaccesstoken',
+            name='blacklisted_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
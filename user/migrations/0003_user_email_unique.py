@@ -0,0 +1,35 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def check_duplicate_emails(apps, schema_editor):
+    # Los emails repetidos no se pueden renombrar sin dejar a los usuarios sin su correo,
+    # así que la migración se detiene y los enumera para resolverlos a mano.
+    User = apps.get_model('auth', 'User')
+    duplicates = (User.objects.exclude(email='').values('email').annotate(rows=Count('pk'))
+                  .filter(rows__gt=1).order_by('email'))
+    if duplicates:
+        emails = ', '.join(f"{row['email']} ({row['rows']} usuarios)" for row in duplicates)
+        raise RuntimeError(
+            f"No se puede crear el índice único de auth_user.email: hay emails repetidos: {emails}. "
+            f"Cambia o elimina los usuarios repetidos y vuelve a ejecutar migrate."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_blacklistedaccesstoken_jti_expires_at'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    # El modelo User de Django no declara el email como único, así que el índice se
+    # crea a mano. Es parcial porque el email es opcional (por ejemplo, en usuarios
+    # creados desde el admin) y puede haber varios vacíos.
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.RunSQL(
+            "CREATE UNIQUE INDEX auth_user_email_uniq ON auth_user (email) WHERE email <> ''",
+            "DROP INDEX auth_user_email_uniq",
+        ),
+    ]
@@ -1,9 +1,24 @@
+from django.conf import settings
 from django.db import models
+from django.utils.timezone import now
+
+from todo_api.db import delete_in_batches
+
 
 # Create your models here.
 class BlacklistedAccessToken(models.Model):
-    token = models.CharField(max_length=255, unique=True)
-    blacklisted_at = models.DateTimeField(auto_now_add=True)
+    # Solo se guarda el identificador (jti) y la expiración del token, no el JWT completo.
+    jti = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    blacklisted_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
-        return self.token
\ No newline at end of file
+        return self.jti
+
+    @classmethod
+    def purge_expired(cls, batch_size=None):
+        # Un token expirado ya es rechazado por la autenticación JWT, así que su entrada
+        # en la lista negra no aporta nada y se puede borrar.
+        if batch_size is None:
+            batch_size = settings.BLACKLIST_PURGE_BATCH_SIZE
+        return delete_in_batches(cls.objects.filter(expires_at__lte=now()), batch_size)
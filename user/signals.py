@@ -1,7 +1,8 @@
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from decouple import config
+from .cache import user_cache
 
 
 
@@ -44,4 +45,13 @@ def create_superuser(sender, **kwargs):
                 print("A superuser with this email or username already exists")
     except Exception as e:
         # Captura cualquier excepción que ocurra durante la ejecución y la imprime.
-        print(e)
\ No newline at end of file
+        print(e)
+
+
+# Invalida la caché de usuarios autenticados (ver `user.authentication`) cada vez que
+# un usuario se modifica o se elimina, para que la siguiente solicitud lo recargue.
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
@@ -1,3 +1,356 @@
-from django.test import TestCase
+import io
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import jwt
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from user.blacklist import AccessTokenBlacklist, access_token_blacklist
+from user.cache import user_cache
+from user.middleware import BlacklistAccessTokenMiddleware
+from user.models import BlacklistedAccessToken
+
+
+class RegistroTests(APITestCase):
+
+    def register(self, username, email):
+        data = {'username': username, 'email': email, 'first_name': 'Ana', 'last_name': 'Ruiz',
+                'password': 'password123'}
+        return self.client.post('/user/register/', data, format='json')
+
+    def test_alta_es_un_solo_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.register('ana', 'ana@example.com')
+        self.assertEqual(response.status_code, 201)
+        user_queries = [q['sql'].split()[0] for q in queries if '"auth_user"' in q['sql']]
+        self.assertEqual(user_queries, ['INSERT'])
+
+    def test_email_y_nombre_de_usuario_repetidos(self):
+        self.register('ana', 'ana@example.com')
+
+        response = self.register('otra', 'ana@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['email'], ['El email ya está registrado.'])
+
+        response = self.register('ana', 'otra@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['username'], ['El nombre de usuario ya está en uso.'])
+        self.assertEqual(User.objects.filter(username='ana').count(), 1)
+
+
+@override_settings(ACCESS_TOKEN_BLACKLIST_REFRESH_SECONDS=3600)
+class ListaNegraTests(APITestCase):
+
+    def setUp(self):
+        access_token_blacklist.clear()
+        User.objects.create_user('ana', 'ana@example.com', 'password123')
+
+    def tearDown(self):
+        access_token_blacklist.clear()
+
+    def login(self):
+        self.client.credentials()
+        response = self.client.post('/user/login/', {'username': 'ana', 'password': 'password123'}, format='json')
+        return response.data['access'], response.data['refresh']
+
+    def test_token_revocado_es_rechazado(self):
+        access, refresh = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get('/todo/user/tasks/').status_code, 200)
+        self.assertEqual(self.client.post('/user/logout/', {'refresh': refresh}, format='json').status_code, 205)
+
+        response = self.client.get('/todo/user/tasks/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'token_not_valid')
+        # Otro token del mismo usuario sigue siendo válido.
+        access, _ = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get('/todo/user/tasks/').status_code, 200)
+
+    def test_revocacion_de_otro_proceso_tras_el_refresco(self):
+        access, _ = self.login()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.get('/todo/user/tasks/').status_code, 200)
+        token = AccessToken(access)
+        BlacklistedAccessToken.objects.create(jti=token['jti'], expires_at=datetime_from_epoch(token['exp']))
+        # Hasta el siguiente refresco la lista en memoria no lo incluye.
+        self.assertEqual(self.client.get('/todo/user/tasks/').status_code, 200)
+        with mock.patch('user.blacklist.time.monotonic', return_value=time.monotonic() + 3600):
+            self.assertEqual(self.client.get('/todo/user/tasks/').status_code, 401)
+
+    def test_el_jti_se_lee_sin_verificar_la_firma(self):
+        access, _ = self.login()
+        jti = AccessToken(access)['jti']
+        self.assertEqual(access_token_blacklist.get_jti(access[:-4] + 'AAAA'), jti)
+        self.assertIsNone(access_token_blacklist.get_jti('no-es-un-token'))
+        # La autenticación rechaza igualmente el token con la firma alterada.
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access[:-4]}AAAA')
+        self.assertEqual(self.client.get('/todo/user/tasks/').status_code, 401)
+
+    def test_jti_que_no_es_una_cadena(self):
+        # Un token falsificado puede traer cualquier tipo en el claim: no debe provocar un 500.
+        token = jwt.encode({'token_type': 'access', 'user_id': 1, 'jti': ['x'],
+                            'exp': int(time.time()) + 60}, 'otra-clave', algorithm='HS256')
+        self.assertIsNone(access_token_blacklist.get_jti(token))
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(self.client.get('/todo/user/tasks/').status_code, 401)
+
+
+@override_settings(ACCESS_TOKEN_BLACKLIST_REFRESH_SECONDS=3600)
+class UsuarioEnCacheTests(APITestCase):
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user('ana', 'ana@example.com', 'password123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def tearDown(self):
+        user_cache.clear()
+
+    def get(self):
+        # Devuelve el código de estado y las consultas a la tabla de usuarios.
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/todo/user/tasks/')
+        return response.status_code, len([q for q in queries if 'FROM "auth_user"' in q['sql']])
+
+    def test_acierto_sin_consultas(self):
+        self.assertEqual(self.get(), (200, 1))
+        self.assertEqual(self.get(), (200, 0))
+        self.assertIsNot(user_cache.get(self.user.pk), user_cache.get(self.user.pk))
+
+    def test_desactivar_invalida(self):
+        self.get()
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(user_cache.get(self.user.pk))
+        self.assertEqual(self.get()[0], 401)
+
+    def test_cambio_de_contrasena_invalida(self):
+        self.get()
+        self.user.set_password('otra-password456')
+        self.user.save()
+        self.assertIsNone(user_cache.get(self.user.pk))
+        # La siguiente solicitud recarga el usuario con la contraseña nueva.
+        self.assertEqual(self.get(), (200, 1))
+        self.assertEqual(user_cache.get(self.user.pk).password, self.user.password)
+
+    def test_borrar_invalida(self):
+        self.get()
+        self.user.delete()
+        self.assertEqual(self.get()[0], 401)
+
+
+class RefrescoIncrementalTests(TestCase):
+    # Tras la primera carga, cada refresco solo lee las filas con un `blacklisted_at`
+    # posterior al último visto menos un intervalo.
+
+    def setUp(self):
+        self.lista = AccessTokenBlacklist(refresh_interval=60)
+        self.expira = now() + timedelta(hours=1)
+
+    def revocar(self, jti, hace=None, expira=None):
+        fila = BlacklistedAccessToken.objects.create(jti=jti, expires_at=expira or self.expira)
+        if hace is not None:
+            BlacklistedAccessToken.objects.filter(pk=fila.pk).update(blacklisted_at=now() - hace)
+        return fila
+
+    def refrescar(self):
+        self.lista._next_refresh = 0.0
+        with CaptureQueriesContext(connection) as queries:
+            self.lista.refresh()
+        return [q['sql'] for q in queries]
+
+    def test_ventana_del_refresco(self):
+        self.revocar('a')
+        consultas = self.refrescar()
+        self.assertEqual(len(consultas), 1)
+        self.assertNotIn('blacklisted_at" >=', consultas[0])
+        self.assertTrue(self.lista.contains('a', refresh=False))
+
+        # Confirmada tarde, pero dentro de la ventana: se lee.
+        self.revocar('b', hace=timedelta(seconds=30))
+        # Fuera de la ventana: el refresco incremental ya no la ve.
+        self.revocar('c', hace=timedelta(minutes=10))
+        consultas = self.refrescar()
+        self.assertIn('blacklisted_at" >=', consultas[0])
+        self.assertTrue(self.lista.contains('b', refresh=False))
+        self.assertFalse(self.lista.contains('c', refresh=False))
+        self.assertTrue(self.lista.contains('a', refresh=False))
+
+    def test_no_refresca_antes_del_intervalo(self):
+        self.revocar('a')
+        self.lista.refresh()
+        self.revocar('b')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(self.lista.contains('b'))
+        self.assertEqual(len(queries), 0)
+
+    def test_add_espera_al_refresco(self):
+        # `refresh()` reconstruye el diccionario con el cerrojo tomado; `add()` debe esperarlo.
+        self.lista._lock.acquire()
+        hilo = threading.Thread(target=self.lista.add, args=('a', self.expira))
+        hilo.start()
+        hilo.join(timeout=0.2)
+        self.assertTrue(hilo.is_alive())
+        self.assertFalse(self.lista.contains('a', refresh=False))
+        self.lista._lock.release()
+        hilo.join()
+        self.assertTrue(self.lista.contains('a', refresh=False))
+
+    def test_descarta_los_tokens_expirados(self):
+        self.revocar('a')
+        self.lista.refresh()
+        self.lista.add('b', now() - timedelta(seconds=1))
+        self.assertTrue(self.lista.contains('b', refresh=False))
+        self.refrescar()
+        self.assertFalse(self.lista.contains('b', refresh=False))
+        self.assertTrue(self.lista.contains('a', refresh=False))
+
+
+class MigracionJtiTests(TransactionTestCase):
+    # 0002 sustituye el token completo por su jti y su expiración.
+    anterior = [('user', '0001_initial')]
+    posterior = [('user', '0002_blacklistedaccesstoken_jti_expires_at')]
+
+    def migrar(self, destino):
+        executor = MigrationExecutor(connection)
+        executor.migrate(destino)
+        return executor.loader.project_state(destino).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def token(self, lifetime):
+        token = AccessToken()
+        token.set_exp(lifetime=lifetime)
+        return token
+
+    def test_migracion(self):
+        apps = self.migrar(self.anterior)
+        Antiguo = apps.get_model('user', 'BlacklistedAccessToken')
+        vigente = self.token(timedelta(hours=1))
+        Antiguo.objects.create(token=str(vigente))
+        Antiguo.objects.create(token=str(self.token(-timedelta(hours=1))))
+        Antiguo.objects.create(token='no-es-un-token')
+
+        apps = self.migrar(self.posterior)
+        Nuevo = apps.get_model('user', 'BlacklistedAccessToken')
+        # Los tokens expirados o ilegibles se descartan.
+        self.assertEqual(list(Nuevo.objects.values_list('jti', 'expires_at')),
+                         [(vigente['jti'], datetime_from_epoch(vigente['exp']))])
+
+
+class MigracionEmailUnicoTests(TransactionTestCase):
+    anterior = [('user', '0002_blacklistedaccesstoken_jti_expires_at')]
+    posterior = [('user', '0003_user_email_unique')]
+
+    def migrar(self, destino):
+        executor = MigrationExecutor(connection)
+        executor.migrate(destino)
+        return executor.loader.project_state(destino).apps
+
+    def tearDown(self):
+        User.objects.all().delete()
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_emails_repetidos_detienen_la_migracion(self):
+        self.migrar(self.anterior)
+        for username, email in (('ana', 'ana@example.com'), ('ana2', 'ana@example.com'), ('sin1', ''), ('sin2', '')):
+            User.objects.create(username=username, email=email)
+        with self.assertRaisesMessage(RuntimeError, 'ana@example.com (2 usuarios)'):
+            self.migrar(self.posterior)
+
+        # Resueltos los repetidos, la migración se aplica; los emails vacíos pueden repetirse.
+        User.objects.filter(username='ana2').update(email='ana2@example.com')
+        self.migrar(self.posterior)
+        with self.assertRaises(IntegrityError):
+            User.objects.create(username='otra', email='ana@example.com')
+
+
+class PurgaListaNegraTests(TestCase):
+
+    def test_solo_borra_los_expirados_por_lotes(self):
+        for i in range(5):
+            BlacklistedAccessToken.objects.create(jti=f'expirado{i}', expires_at=now() - timedelta(minutes=1))
+        for i in range(2):
+            BlacklistedAccessToken.objects.create(jti=f'vigente{i}', expires_at=now() + timedelta(hours=1))
+
+        salida = io.StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('purge_blacklisted_tokens', batch_size=2, stdout=salida)
+        self.assertIn('Purged 5 expired', salida.getvalue())
+        borrados = [q['sql'] for q in queries if q['sql'].startswith('DELETE')]
+        self.assertEqual(len(borrados), 3)
+        self.assertEqual(sorted(BlacklistedAccessToken.objects.values_list('jti', flat=True)),
+                         ['vigente0', 'vigente1'])
+
+
+@override_settings(ACCESS_TOKEN_BLACKLIST_REFRESH_SECONDS=3600)
+class ListaNegraAsincronaTests(TestCase):
+    # BlacklistAccessTokenMiddleware en modo asíncrono (ASGI): `__acall__`.
+
+    def setUp(self):
+        access_token_blacklist.clear()
+        self.user = User.objects.create_user('ana', 'ana@example.com', 'password123')
+        self.token = AccessToken.for_user(self.user)
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+
+    def tearDown(self):
+        access_token_blacklist.clear()
+
+    async def revocar(self):
+        await BlacklistedAccessToken.objects.acreate(jti=self.token['jti'],
+                                                     expires_at=datetime_from_epoch(self.token['exp']))
+
+    async def test_token_valido(self):
+        response = await self.async_client.get('/todo/user/tasks/', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
+    async def test_token_revocado_en_otro_proceso(self):
+        # La lista negra se refresca desde la base de datos (en un hilo) antes de comprobar el token.
+        await self.revocar()
+        response = await self.async_client.get('/todo/user/tasks/', headers=self.headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'token_not_valid')
+
+    async def test_la_comprobacion_es_en_memoria(self):
+        await self.async_client.get('/todo/user/tasks/', headers=self.headers)
+        # Hasta el próximo refresco, solo cuenta la copia en memoria.
+        await self.revocar()
+        response = await self.async_client.get('/todo/user/tasks/', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        access_token_blacklist.add(self.token['jti'], datetime_from_epoch(self.token['exp']))
+        response = await self.async_client.get('/todo/user/tasks/', headers=self.headers)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_no_llama_a_la_vista_si_el_token_esta_revocado(self):
+        llamadas = []
+
+        async def get_response(request):
+            llamadas.append(request)
+            return HttpResponse()
+
+        middleware = BlacklistAccessTokenMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = AsyncRequestFactory().get('/todo/user/tasks/', headers=self.headers)
+        self.assertEqual((await middleware(request)).status_code, 200)
+
+        await self.revocar()
+        access_token_blacklist.clear()
+        self.assertEqual((await middleware(request)).status_code, 401)
+        self.assertEqual(len(llamadas), 1)
@@ -0,0 +1,95 @@
+import django_filters
+from django import forms
+from django.db.models import Count, Exists, OuterRef
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+from workspace.models import Task, UserTask
+from workspace.search import search
+
+
+class IntegerFilter(django_filters.Filter):
+    field_class = forms.IntegerField
+
+
+class IntegerInFilter(django_filters.BaseInFilter, IntegerFilter):
+    # Comma-separated ids; anything that is not an integer (e.g. `1.5`) is a 400.
+    pass
+
+
+class TaskFilterSet(django_filters.FilterSet):
+    # Half-open ranges: `*_after` is inclusive, `*_before` exclusive. Each one is a
+    # range scan on the (workspace|user, created_at|final_at) indexes.
+    created_after = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = django_filters.DateTimeFilter(field_name='created_at', lookup_expr='lt')
+    completed_after = django_filters.DateTimeFilter(field_name='final_at', lookup_expr='gte')
+    completed_before = django_filters.DateTimeFilter(field_name='final_at', lookup_expr='lt')
+
+    # `?tags=1,2,3` keeps tasks with any (default) or all (`tags_mode=all`) of the tags.
+    # Both are subqueries on the tags through table rather than joins, so a task never
+    # comes back twice and no DISTINCT is needed.
+    tags = IntegerInFilter(method='filter_tags')
+    tags_mode = django_filters.ChoiceFilter(choices=[('any', 'any'), ('all', 'all')], method='filter_noop')
+
+    def tag_links(self):
+        # The tags through table and the names of its task and tag id columns.
+        field = self._meta.model.tags.field
+        return field.remote_field.through, f'{field.m2m_field_name()}_id', f'{field.m2m_reverse_field_name()}_id'
+
+    def filter_tags(self, queryset, name, value):
+        tag_ids = {tag_id for tag_id in value if tag_id is not None}
+        if not tag_ids:
+            return queryset
+        through, task_column, tag_column = self.tag_links()
+        links = through.objects.filter(**{f'{tag_column}__in': tag_ids})
+
+        if self.form.cleaned_data.get('tags_mode') == 'all':
+            # Tasks linked to every requested tag: GROUP BY task HAVING COUNT(tag) = n.
+            complete = (links.values(task_column)
+                        .annotate(matched=Count(tag_column, distinct=True))
+                        .filter(matched=len(tag_ids))
+                        .values(task_column))
+            return queryset.filter(pk__in=complete)
+        return queryset.filter(Exists(links.filter(**{task_column: OuterRef('pk')})))
+
+    def filter_noop(self, queryset, name, value):
+        # Only read by `filter_tags`.
+        return queryset
+
+
+class TaskFilter(TaskFilterSet):
+    tags__name = django_filters.CharFilter(method='filter_tag_name')
+
+    class Meta:
+        model = Task
+        fields = ['status', 'assigned_to']
+
+    def filter_tag_name(self, queryset, name, value):
+        through, task_column, tag_column = self.tag_links()
+        links = through.objects.filter(**{task_column: OuterRef('pk'), 'tag__name': value})
+        return queryset.filter(Exists(links))
+
+
+class UserTaskFilter(TaskFilterSet):
+    class Meta:
+        model = UserTask
+        fields = ['status']
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """
+    Indexed, prefix-matching search on task titles (see `workspace.search`).
+    Results are ranked by relevance unless the client asks for an explicit
+    ordering.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, '')
+        ranked = OrderingFilter.ordering_param not in request.query_params
+        return search(queryset, term, ranked=ranked, scope=self.get_scope(request, queryset, view))
+
+    def get_scope(self, request, queryset, view):
+        # Workspace task views are routed by workspace; user task views list the user's own tasks.
+        if queryset.model is UserTask:
+            return request.user.pk
+        return view.kwargs.get('workspace_id')
@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
@@ -11,6 +12,8 @@ class WorkspaceSerializer(serializers.ModelSerializer):
     class Meta:
         model = Workspace
         fields = ['id', 'title', 'description', 'admin', 'members']
+        # Uniqueness is enforced by the database constraint (see WorkspaceListCreateView.post).
+        extra_kwargs = {'title': {'validators': []}}
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -96,4 +99,23 @@ class UserTaskSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("One or more tags do not exist or do not belong to the user.")
         user_task.tags.set(tags)
 
-        return user_task
\ No newline at end of file
+        return user_task
+
+
+class BulkStatusSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=settings.BULK_TASK_MAX_ITEMS,
+        help_text="IDs of the tasks to update."
+    )
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES, help_text="Target status.")
+
+
+class BulkMembershipSerializer(serializers.Serializer):
+    usernames = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=settings.BULK_MEMBERSHIP_MAX_ITEMS,
+        help_text="Usernames to add to or remove from the workspace."
+    )
@@ -10,7 +10,9 @@ from workspace.api.views import (
     UserTagListCreateView,
     UserTaskListCreateView, CompleteTaskView, CompleteUserTaskView,
     UserTagDeleteView, UserTaskDeleteView, UserTaskDetailView, RemoveUserFromWorkspaceView, RemoveTagFromWorkspaceView,
-    NonWorkspaceUsersView
+    NonWorkspaceUsersView, TaskBulkCreateView, TaskBulkStatusView, UserTaskBulkStatusView,
+    TaskSyncView, UserTaskSyncView, TaskExportView, UserTaskExportView,
+    TaskImportView, WorkspaceMembersBulkView
 )
 
 urlpatterns = [
@@ -18,6 +20,9 @@ urlpatterns = [
     path('user/tags/', UserTagListCreateView.as_view(), name='user-tag-list-create'),
     path('user/tags/<int:tag_id>/delete/', UserTagDeleteView.as_view(), name='delete-user-tag'),
     path('user/tasks/', UserTaskListCreateView.as_view(), name='user-task-list-create'),
+    path('user/tasks/sync/', UserTaskSyncView.as_view(), name='user-task-sync'),
+    path('user/tasks/export/', UserTaskExportView.as_view(), name='user-task-export'),
+    path('user/tasks/bulk/status/', UserTaskBulkStatusView.as_view(), name='user-task-bulk-status'),
     path('user/tasks/<int:task_id>/complete/', CompleteUserTaskView.as_view(), name='complete-user-task'),
     path('user/tasks/<int:task_id>/delete/', UserTaskDeleteView.as_view(), name='delete-user-task'),
     path('user/tasks/<int:task_id>/', UserTaskDetailView.as_view(), name='user-task-detail'),
@@ -29,9 +34,17 @@ urlpatterns = [
     path('workspaces/<int:pk>/', WorkspaceDetailView.as_view(), name='workspace-detail'),
     path('workspaces/<int:workspace_id>/add-user/', AddUserToWorkspaceView.as_view(), name='add-user-to-workspace'),
     path('workspaces/<int:workspace_id>/remove-user/', RemoveUserFromWorkspaceView.as_view(), name='remove-user-from-workspace'),
+    path('workspaces/<int:workspace_id>/members/bulk/', WorkspaceMembersBulkView.as_view(),
+         name='workspace-members-bulk'),
 
     # Task URLs (Workspace-specific)
     path('workspaces/<int:workspace_id>/tasks/', TaskListCreateView.as_view(), name='workspace-task-list-create'),
+    path('workspaces/<int:workspace_id>/tasks/sync/', TaskSyncView.as_view(), name='workspace-task-sync'),
+    path('workspaces/<int:workspace_id>/tasks/export/', TaskExportView.as_view(), name='workspace-task-export'),
+    path('workspaces/<int:workspace_id>/tasks/import/', TaskImportView.as_view(), name='workspace-task-import'),
+    path('workspaces/<int:workspace_id>/tasks/bulk/', TaskBulkCreateView.as_view(), name='workspace-task-bulk-create'),
+    path('workspaces/<int:workspace_id>/tasks/bulk/status/', TaskBulkStatusView.as_view(),
+         name='workspace-task-bulk-status'),
     path('workspace/tasks/<int:pk>/', TaskDetailView.as_view(), name='task-detail'),
     path('workspace/tasks/<int:task_id>/add-user/', AddUserToTaskView.as_view(), name='add-user-to-task'),
     path('workspaces/<int:workspace_id>/non-members/', NonWorkspaceUsersView.as_view(), name='non-workspace-users'),
@@ -1,25 +1,60 @@
+import codecs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef, Q
 from django.utils.timezone import now
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from workspace.models import Workspace, UserTask, UserTag
+from workspace.models import Workspace, UserTask, UserTag, TaskTombstone, UserTaskTombstone
 from workspace.api.serializers import WorkspaceSerializer, AddUserToWorkspaceSerializer, UserTagSerializer, \
-    UserTaskSerializer
+    UserTaskSerializer, BulkStatusSerializer, BulkMembershipSerializer
 from workspace.models import Task
 from workspace.api.serializers import TaskSerializer
 from workspace.models import Tag
 from workspace.api.serializers import TagSerializer
-from todo_api.pagination import DefaultPaginationLOS
+from todo_api.pagination import DefaultPaginationLOS, KeysetPagination, KeysetPaginationMixin
+from todo_api.views import AsyncAPIView, streaming_response
+from workspace.membership import get_workspace_access, aget_workspace_access
+from workspace.api.filters import TaskFilter, TitleSearchFilter, UserTaskFilter
+from workspace.export import FORMATS as EXPORT_FORMATS, TASK_COLUMNS, USER_TASK_COLUMNS, export_tasks
+from workspace.imports import FORMATS as IMPORT_FORMATS, InvalidImportFile, format_for, import_tasks, read_rows
+from workspace.sync import ExpiredSyncToken, InvalidSyncToken, changed_tasks, next_sync_token, read_sync_token, \
+    split_page
+from workspace.versions import alist_etag, bump_user, bump_workspace, list_etag, not_modified, set_etag, user_scope, \
+    workspace_scope
 from rest_framework import filters
 
 
 
+def bulk_status_result(ids, updated):
+    updated = sorted(updated)
+    changed = set(updated)
+    return {"updated": updated, "skipped": sorted({pk for pk in ids if pk not in changed})}
+
+
+def export_response(request, tasks, columns, filename):
+    # Shared by the task export views: `tasks` is already scoped and filtered.
+    export_format = request.query_params.get('output', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return Response({"error": f"Unknown output format. Use one of: {', '.join(EXPORT_FORMATS)}."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if not tasks.ordered:
+        tasks = tasks.order_by('pk')
+    return streaming_response(
+        request, export_tasks(tasks, columns, export_format), EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{export_format}"'}
+    )
+
+
 class UserTagListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -38,9 +73,15 @@ class UserTagListCreateView(APIView):
         }
     )
     def get(self, request):
+        scope = user_scope(request.user.pk)
+        etag = list_etag(request, scope)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
         tags = UserTag.objects.filter(user=request.user)
         serializer = UserTagSerializer(tags, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return set_etag(Response(serializer.data, status=status.HTTP_200_OK), etag)
 
     @swagger_auto_schema(
         operation_description="Create a new tag associated with the user.",
@@ -56,20 +97,60 @@ class UserTagListCreateView(APIView):
         }
     )
     def post(self, request):
-        if UserTag.objects.filter(name=request.data.get('name'), user=request.user).exists():
-            return Response({"error": "A tag with this name already exists."}, status=status.HTTP_400_BAD_REQUEST)
         serializer = UserTagSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user)
+            try:
+                with transaction.atomic():
+                    serializer.save(user=request.user)
+            except IntegrityError:
+                return Response({"error": "A tag with this name already exists."}, status=status.HTTP_400_BAD_REQUEST)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserTaskListCreateView(APIView):
+class UserTaskListCreateView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, TitleSearchFilter]
+    filterset_class = UserTaskFilter
 
     @swagger_auto_schema(
         operation_description="Retrieve a list of tasks associated with the user.",
+        manual_parameters=[
+            openapi.Parameter(
+                'status', openapi.IN_QUERY, description="Filter tasks by status (e.g., 'pending', 'completed').",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'created_after', openapi.IN_QUERY, description="Only tasks created at or after this date/time.",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+            ),
+            openapi.Parameter(
+                'created_before', openapi.IN_QUERY, description="Only tasks created before this date/time.",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+            ),
+            openapi.Parameter(
+                'completed_after', openapi.IN_QUERY, description="Only tasks completed at or after this date/time.",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+            ),
+            openapi.Parameter(
+                'completed_before', openapi.IN_QUERY, description="Only tasks completed before this date/time.",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+            ),
+            openapi.Parameter(
+                'tags', openapi.IN_QUERY, description="Comma-separated tag ids, e.g. `1,4,7`.",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'tags_mode', openapi.IN_QUERY,
+                description="'any' (default) keeps tasks with at least one of `tags`, 'all' tasks with every one.",
+                type=openapi.TYPE_STRING, enum=['any', 'all']
+            ),
+            openapi.Parameter(
+                'search', openapi.IN_QUERY,
+                description="Search tasks by title; matches word prefixes, best matches first.",
+                type=openapi.TYPE_STRING
+            )
+        ],
         responses={
             200: openapi.Response(
                 description="List of user tasks.",
@@ -82,10 +163,17 @@ class UserTaskListCreateView(APIView):
             )
         }
     )
-    def get(self, request):
-        tasks = UserTask.objects.filter(user=request.user)
-        serializer = UserTaskSerializer(tasks, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    async def get(self, request):
+        scope = user_scope(request.user.pk)
+        etag = await alist_etag(request, scope)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+        tasks = UserTask.objects.filter(user=request.user).prefetch_related('tags')
+        tasks = await sync_to_async(self.filter_queryset)(tasks)
+        serializer = UserTaskSerializer([task async for task in tasks], many=True)
+        return set_etag(Response(serializer.data, status=status.HTTP_200_OK), etag)
 
     @swagger_auto_schema(
         operation_description="Create a new task associated with the user.",
@@ -102,14 +190,130 @@ class UserTaskListCreateView(APIView):
     )
     def post(self, request):
         serializer = UserTaskSerializer(data=request.data)
-        if UserTask.objects.filter(title=request.data.get('title'), user=request.user).exists():
-            return Response({"error": "A task with this name already exists."}, status=status.HTTP_400_BAD_REQUEST)
         if serializer.is_valid():
-            serializer.save(user=request.user)
+            try:
+                with transaction.atomic():
+                    serializer.save(user=request.user)
+            except IntegrityError:
+                return Response({"error": "A task with this name already exists."}, status=status.HTTP_400_BAD_REQUEST)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class UserTaskSyncView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Incremental sync of the user's tasks: only what changed since `since`. "
+                              "Clients should upsert `changed` and remove `deleted` by id. At most "
+                              "`SYNC_PAGE_SIZE` tasks are returned per response: while `has_more` is true, "
+                              "call again with the returned `sync_token`.",
+        manual_parameters=[
+            openapi.Parameter(
+                'since', openapi.IN_QUERY,
+                description="`sync_token` from the previous response. Without it every task is returned, "
+                            "a page at a time.",
+                type=openapi.TYPE_STRING
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                description="Tasks created or modified, and ids of tasks deleted, since the token.",
+                examples={
+                    "application/json": {
+                        "changed": [{"id": 1, "title": "Task 1", "status": "pending"}],
+                        "deleted": [7, 9],
+                        "has_more": False,
+                        "sync_token": "eyJ...:1tA2bC:..."
+                    }
+                }
+            ),
+            400: "Invalid sync token.",
+            410: "Sync token too old: sync again from the first page, without `since`."
+        }
+    )
+    async def get(self, request):
+        started_at = now()
+        scope = f'user:{request.user.pk}'
+        try:
+            state = read_sync_token(request.query_params.get('since'), scope)
+        except InvalidSyncToken:
+            return Response({"error": "Invalid sync token."}, status=status.HTTP_400_BAD_REQUEST)
+        except ExpiredSyncToken:
+            return Response({"error": "Sync token expired; sync again without `since`."}, status=status.HTTP_410_GONE)
+
+        tasks = changed_tasks(UserTask.objects.filter(user=request.user).prefetch_related('tags'), state)
+        page, last_task = split_page([task async for task in tasks])
+        deleted = []
+        if state.since is not None and state.after is None:
+            tombstones = UserTaskTombstone.objects.filter(user_id=request.user.pk, deleted_at__gt=state.since)
+            deleted = [task_id async for task_id in tombstones.values_list('task_id', flat=True)]
+
+        serializer = UserTaskSerializer(page, many=True)
+        return Response({
+            "changed": serializer.data,
+            "deleted": deleted,
+            "has_more": last_task is not None,
+            "sync_token": next_sync_token(scope, state, started_at, last_task),
+        }, status=status.HTTP_200_OK)
+
+
+class UserTaskExportView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, TitleSearchFilter]
+    filterset_class = UserTaskFilter
+
+    @swagger_auto_schema(
+        operation_description="Stream every task of the user as NDJSON or CSV, with the same filters as the "
+                              "task list and no pagination.",
+        manual_parameters=[
+            openapi.Parameter(
+                'output', openapi.IN_QUERY,
+                description="`ndjson` (default, one JSON object per line) or `csv`.",
+                type=openapi.TYPE_STRING, enum=['ndjson', 'csv']
+            )
+        ],
+        responses={
+            200: "The tasks, streamed (`id`, `title`, `status`, `created_at`, `final_at`, `tags`).",
+            400: "Invalid filter or output format."
+        }
+    )
+    async def get(self, request):
+        tasks = UserTask.objects.filter(user=request.user)
+        tasks = await sync_to_async(self.filter_queryset)(tasks)
+        return export_response(request, tasks, USER_TASK_COLUMNS, 'tasks')
+
+
+class UserTaskBulkStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Move many of the user's tasks to a status at once (e.g. complete them). "
+                              "Tasks that do not belong to the user or already have that status are skipped.",
+        request_body=BulkStatusSerializer,
+        responses={
+            200: openapi.Response(
+                description="IDs whose status changed, and IDs left untouched.",
+                examples={
+                    "application/json": {"updated": [1, 2], "skipped": [3]}
+                }
+            ),
+            400: "Bad Request",
+        }
+    )
+    def post(self, request):
+        serializer = BulkStatusSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        ids = serializer.validated_data['ids']
+
+        tasks = UserTask.objects.filter(user=request.user, pk__in=ids)
+        updated = tasks.set_status(serializer.validated_data['status'])
+        if updated:
+            bump_user(request.user.pk)
+        return Response(bulk_status_result(ids, updated), status=status.HTTP_200_OK)
+
+
 class UserTaskDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -130,7 +334,11 @@ class UserTaskDetailView(APIView):
 
         serializer = UserTaskSerializer(task, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            try:
+                with transaction.atomic():
+                    serializer.save()
+            except IntegrityError:
+                return Response({"error": "A task with this name already exists."}, status=status.HTTP_400_BAD_REQUEST)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -178,7 +386,7 @@ class RemoveUserFromWorkspaceView(APIView):
         try:
             workspace = Workspace.objects.get(id=workspace_id)
 
-            if workspace.admin != request.user:
+            if workspace.admin_id != request.user.pk:
                 return Response({"error": "You do not have permission to remove users from this workspace."},
                                 status=status.HTTP_403_FORBIDDEN)
 
@@ -193,7 +401,7 @@ class RemoveUserFromWorkspaceView(APIView):
                 return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
 
 
-            if user not in workspace.members.all():
+            if not workspace.members.filter(pk=user.pk).exists():
                 return Response({"error": "User is not a member of this workspace."},
                                 status=status.HTTP_400_BAD_REQUEST)
 
@@ -205,6 +413,110 @@ class RemoveUserFromWorkspaceView(APIView):
             return Response({"error": "Workspace not found."}, status=status.HTTP_404_NOT_FOUND)
 
 
+class WorkspaceMembersBulkView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get_workspace(self, request, workspace_id):
+        # Returns (workspace, None), or (None, error response) unless the user is the admin.
+        workspace = Workspace.objects.filter(pk=workspace_id).first()
+        if workspace is None:
+            return None, Response({"error": "Workspace not found."}, status=status.HTTP_404_NOT_FOUND)
+        if workspace.admin_id != request.user.pk:
+            return None, Response({"error": "You do not have permission to manage the members of this workspace."},
+                                  status=status.HTTP_403_FORBIDDEN)
+        return workspace, None
+
+    def resolve(self, request):
+        # Returns ({username: user id} of the existing users, usernames not found), or a 400 response.
+        serializer = BulkMembershipSerializer(data=request.data)
+        if not serializer.is_valid():
+            return None, Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        usernames = list(dict.fromkeys(serializer.validated_data['usernames']))
+        users = dict(User.objects.filter(username__in=usernames).values_list('username', 'pk'))
+        return (users, [username for username in usernames if username not in users]), None
+
+    @swagger_auto_schema(
+        operation_description="Add many users to a workspace at once. Only the admin of the workspace can "
+                              "perform this action.",
+        request_body=BulkMembershipSerializer,
+        responses={
+            200: openapi.Response(
+                description="Outcome for each username.",
+                examples={
+                    "application/json": {"added": ["alice", "bob"], "already_members": ["carol"],
+                                         "not_found": ["dave"]}
+                }
+            ),
+            400: "Bad Request",
+            403: "Forbidden",
+            404: "Workspace not found"
+        }
+    )
+    def post(self, request, workspace_id):
+        workspace, error = self.get_workspace(request, workspace_id)
+        if error:
+            return error
+        resolved, error = self.resolve(request)
+        if error:
+            return error
+        users, not_found = resolved
+
+        with transaction.atomic():
+            current = set(Workspace.members.through.objects.filter(
+                workspace_id=workspace.pk, user_id__in=users.values()
+            ).values_list('user_id', flat=True))
+            added = [username for username, pk in users.items() if pk not in current]
+            if added:
+                workspace.members.add(*(users[username] for username in added))
+
+        return Response({
+            "added": added,
+            "already_members": [username for username, pk in users.items() if pk in current],
+            "not_found": not_found,
+        }, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_description="Remove many users from a workspace at once. Only the admin of the workspace can "
+                              "perform this action; the admin is never removed.",
+        request_body=BulkMembershipSerializer,
+        responses={
+            200: openapi.Response(
+                description="Outcome for each username.",
+                examples={
+                    "application/json": {"removed": ["alice", "bob"], "not_members": ["carol"],
+                                         "not_found": ["dave"], "skipped": ["admin"]}
+                }
+            ),
+            400: "Bad Request",
+            403: "Forbidden",
+            404: "Workspace not found"
+        }
+    )
+    def delete(self, request, workspace_id):
+        workspace, error = self.get_workspace(request, workspace_id)
+        if error:
+            return error
+        resolved, error = self.resolve(request)
+        if error:
+            return error
+        users, not_found = resolved
+
+        with transaction.atomic():
+            current = set(Workspace.members.through.objects.filter(
+                workspace_id=workspace.pk, user_id__in=users.values()
+            ).values_list('user_id', flat=True))
+            removed = [username for username, pk in users.items() if pk in current and pk != workspace.admin_id]
+            if removed:
+                workspace.members.remove(*(users[username] for username in removed))
+
+        return Response({
+            "removed": removed,
+            "not_members": [username for username, pk in users.items() if pk not in current],
+            "not_found": not_found,
+            "skipped": [username for username, pk in users.items() if pk == workspace.admin_id],
+        }, status=status.HTTP_200_OK)
+
+
 class AddUserToTaskView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -235,40 +547,31 @@ class AddUserToTaskView(APIView):
         }
     )
     def post(self, request, task_id):
-        try:
-
-            task = Task.objects.get(id=task_id)
-            workspace = task.workspace
-
-
-            if workspace.admin != request.user:
-                return Response({"error": "You do not have permission to add users to this task."},
-                                status=status.HTTP_403_FORBIDDEN)
-
-
-            username = request.data.get('username')
-            if not username:
-                return Response({"error": "Username is required."}, status=status.HTTP_400_BAD_REQUEST)
-
-
-            try:
-                user = User.objects.get(username=username)
-            except User.DoesNotExist:
-                return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
-
-
-            if user not in workspace.members.all():
-                return Response({"error": "User is not a member of this workspace."},
-                                status=status.HTTP_400_BAD_REQUEST)
-
-
-            task.assigned_to = user
-            task.save()
-
-            return Response({"message": "User added to the task successfully."}, status=status.HTTP_200_OK)
-
-        except Task.DoesNotExist:
+        username = request.data.get('username')
+        user = User.objects.filter(username=username).first() if username else None
+
+        if user is not None:
+            # One conditional UPDATE: the caller must be the workspace admin and the user
+            # a member of the task's workspace at the time of the write.
+            membership = Workspace.members.through.objects.filter(workspace_id=OuterRef('workspace_id'),
+                                                                  user_id=user.pk)
+            tasks = Task.objects.filter(pk=task_id, workspace__admin_id=request.user.pk).filter(Exists(membership))
+            if tasks.update(assigned_to=user, updated_at=now()):
+                bump_workspace(Task.objects.filter(pk=task_id).values_list('workspace_id', flat=True).first())
+                return Response({"message": "User added to the task successfully."}, status=status.HTTP_200_OK)
+
+        # Nothing was written: find out why.
+        task = Task.objects.filter(pk=task_id).values('workspace__admin_id').first()
+        if task is None:
             return Response({"error": "Task not found."}, status=status.HTTP_404_NOT_FOUND)
+        if task['workspace__admin_id'] != request.user.pk:
+            return Response({"error": "You do not have permission to add users to this task."},
+                            status=status.HTTP_403_FORBIDDEN)
+        if not username:
+            return Response({"error": "Username is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if user is None:
+            return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"error": "User is not a member of this workspace."}, status=status.HTTP_400_BAD_REQUEST)
 
 class AddUserToWorkspaceView(APIView):
     permission_classes = [IsAuthenticated]
@@ -293,7 +596,7 @@ class AddUserToWorkspaceView(APIView):
     def post(self, request, workspace_id):
         try:
             workspace = Workspace.objects.get(id=workspace_id)
-            if workspace.admin != request.user:
+            if workspace.admin_id != request.user.pk:
                 return Response({"error": "You do not have permission to add users to this workspace."},
                                 status=status.HTTP_403_FORBIDDEN)
         except Workspace.DoesNotExist:
@@ -303,20 +606,22 @@ class AddUserToWorkspaceView(APIView):
         serializer = AddUserToWorkspaceSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data['username']
-            if user in workspace.members.all():
+            if workspace.members.filter(pk=user.pk).exists():
                 return Response({"error": "User is already a member of this workspace."},
                                 status=status.HTTP_400_BAD_REQUEST)
             workspace.members.add(user)
             return Response({"message": "User added successfully."}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class WorkspaceListCreateView(APIView):
+class WorkspaceListCreateView(KeysetPaginationMixin, AsyncAPIView):
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultPaginationLOS
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
     filterset_fields = ['admin__username']
     search_fields = ['members__username', 'title']
     ordering_fields = ['title']
+    keyset_ordering_fields = ['title']
+    keyset_default_ordering = 'title'
 
     @swagger_auto_schema(
         operation_description="Retrieve a list of workspaces where the user is a member or admin.",
@@ -332,6 +637,17 @@ class WorkspaceListCreateView(APIView):
             openapi.Parameter(
                 'ordering', openapi.IN_QUERY, description="Order workspaces by title.",
                 type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY,
+                description="Use keyset pagination: send it empty for the first page, then follow `next`.",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'count', openapi.IN_QUERY,
+                description="How `count` is computed: 'exact' (default), 'none', 'capped' (e.g. \"1000+\") "
+                            "or 'estimate' (planner estimate on PostgreSQL).",
+                type=openapi.TYPE_STRING, enum=['exact', 'none', 'capped', 'estimate']
             )
         ],
         responses={
@@ -354,17 +670,23 @@ class WorkspaceListCreateView(APIView):
         }
     )
 
-    def get(self, request):
+    async def get(self, request):
+        scope = user_scope(request.user.pk)
+        etag = await alist_etag(request, scope)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
         workspaces = Workspace.objects.filter(Q(members=request.user) | Q(admin=request.user)).distinct()
+        workspaces = workspaces.with_related()
 
-        for backend in self.filter_backends:
-            workspaces = backend().filter_queryset(request, workspaces, self)
+        workspaces = await sync_to_async(self.filter_queryset)(workspaces)
 
-        paginator = self.pagination_class()
-        paginated_workspaces = paginator.paginate_queryset(workspaces, request)
+        paginator = self.get_paginator(request)
+        paginated_workspaces = await paginator.apaginate_queryset(workspaces, request, self)
 
         serializer = WorkspaceSerializer(paginated_workspaces, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        return set_etag(paginator.get_paginated_response(serializer.data), etag)
 
     @swagger_auto_schema(
         operation_description="Create a new workspace. The user will be set as the admin.",
@@ -386,12 +708,14 @@ class WorkspaceListCreateView(APIView):
         }
     )
     def post(self, request):
-        if Workspace.objects.filter(title=request.data.get('title')).exists():
-            return Response({"error": "A workspace with this title already exists."},
-                            status=status.HTTP_400_BAD_REQUEST)
         serializer = WorkspaceSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(admin=request.user)
+            try:
+                with transaction.atomic():
+                    serializer.save(admin=request.user)
+            except IntegrityError:
+                return Response({"error": "A workspace with this title already exists."},
+                                status=status.HTTP_400_BAD_REQUEST)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -403,8 +727,8 @@ class WorkspaceDetailView(APIView):
 
     def get_object(self, pk, user):
         try:
-            workspace = Workspace.objects.get(pk=pk)
-            if user not in workspace.members.all() and workspace.admin != user:
+            workspace = Workspace.objects.with_access(user).with_related().get(pk=pk)
+            if not workspace.has_access(user):
                 return None
             return workspace
         except Workspace.DoesNotExist:
@@ -455,13 +779,14 @@ class WorkspaceDetailView(APIView):
         return Response({"message": "Workspace deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
 
 
-class TaskListCreateView(APIView):
+class TaskListCreateView(KeysetPaginationMixin, AsyncAPIView):
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultPaginationLOS
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, filters.SearchFilter]
-    filterset_fields = ['status', 'assigned_to', 'tags__name']
-    search_fields = ['title', 'created_at', 'final_at']
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, TitleSearchFilter]
+    filterset_class = TaskFilter
     ordering_fields = ['title', 'created_at']
+    keyset_ordering_fields = ['title', 'created_at']
+    keyset_default_ordering = '-created_at'
 
     @swagger_auto_schema(
         operation_description="Retrieve a list of tasks in a workspace with optional filters.",
@@ -479,12 +804,50 @@ class TaskListCreateView(APIView):
                 type=openapi.TYPE_STRING
             ),
             openapi.Parameter(
-                'search', openapi.IN_QUERY, description="Search tasks by title or date.",
+                'created_after', openapi.IN_QUERY, description="Only tasks created at or after this date/time.",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+            ),
+            openapi.Parameter(
+                'created_before', openapi.IN_QUERY, description="Only tasks created before this date/time.",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+            ),
+            openapi.Parameter(
+                'completed_after', openapi.IN_QUERY, description="Only tasks completed at or after this date/time.",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+            ),
+            openapi.Parameter(
+                'completed_before', openapi.IN_QUERY, description="Only tasks completed before this date/time.",
+                type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME
+            ),
+            openapi.Parameter(
+                'tags', openapi.IN_QUERY, description="Comma-separated tag ids, e.g. `1,4,7`.",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'tags_mode', openapi.IN_QUERY,
+                description="'any' (default) keeps tasks with at least one of `tags`, 'all' tasks with every one.",
+                type=openapi.TYPE_STRING, enum=['any', 'all']
+            ),
+            openapi.Parameter(
+                'search', openapi.IN_QUERY,
+                description="Search tasks by title; matches word prefixes, best matches first "
+                            "unless `ordering` is given.",
                 type=openapi.TYPE_STRING
             ),
             openapi.Parameter(
                 'ordering', openapi.IN_QUERY, description="Order tasks by title or creation date.",
                 type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY,
+                description="Use keyset pagination: send it empty for the first page, then follow `next`.",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'count', openapi.IN_QUERY,
+                description="How `count` is computed: 'exact' (default), 'none', 'capped' (e.g. \"1000+\") "
+                            "or 'estimate' (planner estimate on PostgreSQL).",
+                type=openapi.TYPE_STRING, enum=['exact', 'none', 'capped', 'estimate']
             )
         ],
         responses={
@@ -506,26 +869,29 @@ class TaskListCreateView(APIView):
             )
         }
     )
-    def get(self, request, workspace_id):
-        Task.delete_old_completed_tasks()
-        try:
-            workspace = Workspace.objects.get(id=workspace_id)
-            if request.user != workspace.admin and request.user not in workspace.members.all():
-                return Response({"error": "You do not have permission to view tasks in this workspace."},
-                                status=status.HTTP_403_FORBIDDEN)
-        except Workspace.DoesNotExist:
+    async def get(self, request, workspace_id):
+        access = await aget_workspace_access(request.user, workspace_id)
+        if access is None:
             return Response({"error": "Workspace not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not access.allowed:
+            return Response({"error": "You do not have permission to view tasks in this workspace."},
+                            status=status.HTTP_403_FORBIDDEN)
 
-        tasks = Task.objects.filter(workspace=workspace)
+        scope = workspace_scope(workspace_id)
+        etag = await alist_etag(request, scope)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
 
-        for backend in self.filter_backends:
-            tasks = backend().filter_queryset(request, tasks, self)
+        tasks = Task.objects.filter(workspace_id=workspace_id).with_related()
 
-        paginator = self.pagination_class()
-        paginated_tasks = paginator.paginate_queryset(tasks, request)
+        tasks = await sync_to_async(self.filter_queryset)(tasks)
+
+        paginator = self.get_paginator(request)
+        paginated_tasks = await paginator.apaginate_queryset(tasks, request, self)
 
         serializer = TaskSerializer(paginated_tasks, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        return set_etag(paginator.get_paginated_response(serializer.data), etag)
 
     @swagger_auto_schema(
         operation_description="Create a new task in the specified workspace. Optionally, assign tags to the task.",
@@ -564,17 +930,13 @@ class TaskListCreateView(APIView):
 
     def post(self, request, workspace_id):
         try:
-            workspace = Workspace.objects.get(id=workspace_id)
-            if request.user not in workspace.members.all() and request.user != workspace.admin:
+            workspace = Workspace.objects.with_access(request.user).get(id=workspace_id)
+            if not workspace.has_access(request.user):
                 return Response({"error": "You do not have permission to create tasks in this workspace."},
                                 status=status.HTTP_403_FORBIDDEN)
         except Workspace.DoesNotExist:
             return Response({"error": "Workspace not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        if Task.objects.filter(title=request.data.get('title'), workspace=workspace).exists():
-            return Response({"error": "A task with this title already exists in this workspace."},
-                            status=status.HTTP_400_BAD_REQUEST)
-
         tags_data = request.data.get('tags', [])
         tags = Tag.objects.filter(id__in=tags_data, workspace=workspace)
         if len(tags) != len(tags_data):
@@ -583,19 +945,353 @@ class TaskListCreateView(APIView):
 
         serializer = TaskSerializer(data=request.data)
         if serializer.is_valid():
-            task = serializer.save(workspace=workspace)
-            task.tags.set(tags)  # Assign the tags to the task
+            try:
+                with transaction.atomic():
+                    task = serializer.save(workspace=workspace)
+                    task.tags.set(tags)  # Assign the tags to the task
+            except IntegrityError:
+                return Response({"error": "A task with this title already exists in this workspace."},
+                                status=status.HTTP_400_BAD_REQUEST)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class TaskSyncView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Incremental sync of a workspace's tasks: only what changed since `since`. "
+                              "Clients should upsert `changed` and remove `deleted` by id. At most "
+                              "`SYNC_PAGE_SIZE` tasks are returned per response: while `has_more` is true, "
+                              "call again with the returned `sync_token`.",
+        manual_parameters=[
+            openapi.Parameter(
+                'since', openapi.IN_QUERY,
+                description="`sync_token` from the previous response. Without it every task is returned, "
+                            "a page at a time.",
+                type=openapi.TYPE_STRING
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                description="Tasks created or modified, and ids of tasks deleted, since the token.",
+                examples={
+                    "application/json": {
+                        "changed": [{"id": 1, "title": "Task 1", "status": "pending"}],
+                        "deleted": [7, 9],
+                        "has_more": False,
+                        "sync_token": "eyJ...:1tA2bC:..."
+                    }
+                }
+            ),
+            400: "Invalid sync token.",
+            403: "Forbidden",
+            404: "Workspace not found",
+            410: "Sync token too old: sync again from the first page, without `since`."
+        }
+    )
+    async def get(self, request, workspace_id):
+        started_at = now()
+        access = await aget_workspace_access(request.user, workspace_id)
+        if access is None:
+            return Response({"error": "Workspace not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not access.allowed:
+            return Response({"error": "You do not have permission to view tasks in this workspace."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        scope = f'workspace:{workspace_id}'
+        try:
+            state = read_sync_token(request.query_params.get('since'), scope)
+        except InvalidSyncToken:
+            return Response({"error": "Invalid sync token."}, status=status.HTTP_400_BAD_REQUEST)
+        except ExpiredSyncToken:
+            return Response({"error": "Sync token expired; sync again without `since`."}, status=status.HTTP_410_GONE)
+
+        tasks = changed_tasks(Task.objects.filter(workspace_id=workspace_id).with_related(), state)
+        page, last_task = split_page([task async for task in tasks])
+        deleted = []
+        if state.since is not None and state.after is None:
+            tombstones = TaskTombstone.objects.filter(workspace_id=workspace_id, deleted_at__gt=state.since)
+            deleted = [task_id async for task_id in tombstones.values_list('task_id', flat=True)]
+
+        serializer = TaskSerializer(page, many=True)
+        return Response({
+            "changed": serializer.data,
+            "deleted": deleted,
+            "has_more": last_task is not None,
+            "sync_token": next_sync_token(scope, state, started_at, last_task),
+        }, status=status.HTTP_200_OK)
+
+
+class TaskExportView(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, TitleSearchFilter]
+    filterset_class = TaskFilter
+    ordering_fields = ['title', 'created_at']
+
+    @swagger_auto_schema(
+        operation_description="Stream every task of a workspace as NDJSON or CSV, with the same filters and "
+                              "ordering as the task list and no pagination.",
+        manual_parameters=[
+            openapi.Parameter(
+                'output', openapi.IN_QUERY,
+                description="`ndjson` (default, one JSON object per line) or `csv`.",
+                type=openapi.TYPE_STRING, enum=['ndjson', 'csv']
+            )
+        ],
+        responses={
+            200: "The tasks, streamed (`id`, `title`, `status`, `created_at`, `final_at`, `assigned_to`, `tags`).",
+            400: "Invalid filter or output format.",
+            403: "Forbidden",
+            404: "Workspace not found"
+        }
+    )
+    async def get(self, request, workspace_id):
+        access = await aget_workspace_access(request.user, workspace_id)
+        if access is None:
+            return Response({"error": "Workspace not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not access.allowed:
+            return Response({"error": "You do not have permission to view tasks in this workspace."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        tasks = Task.objects.filter(workspace_id=workspace_id)
+        tasks = await sync_to_async(self.filter_queryset)(tasks)
+        return export_response(request, tasks, TASK_COLUMNS, f'workspace-{workspace_id}-tasks')
+
+
+class TaskBulkCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Create many tasks in a workspace at once. Each item takes the same fields as a "
+                              "single task creation. Valid items are created; invalid ones are reported by index.",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'title': openapi.Schema(type=openapi.TYPE_STRING, description="Title of the task."),
+                    'status': openapi.Schema(type=openapi.TYPE_STRING, description="Status of the task."),
+                    'final_at': openapi.Schema(type=openapi.FORMAT_DATETIME, description="Deadline for the task."),
+                    'tags': openapi.Schema(
+                        type=openapi.TYPE_ARRAY,
+                        items=openapi.Items(type=openapi.TYPE_INTEGER),
+                        description="List of tag IDs to assign to the task."
+                    )
+                },
+                required=['title']
+            )
+        ),
+        responses={
+            201: openapi.Response(
+                description="At least one task was created.",
+                examples={
+                    "application/json": {
+                        "created": [{"id": 1, "title": "Task 1", "status": "pending",
+                                     "workspace": "Workspace 1", "tags_detail": []}],
+                        "errors": [{"index": 1, "errors": {"title": ["A task with this title already exists "
+                                                                     "in this workspace."]}}]
+                    }
+                }
+            ),
+            400: "No task could be created, or the body is not a list.",
+            403: "Forbidden",
+            404: "Workspace not found"
+        }
+    )
+    def post(self, request, workspace_id):
+        access = get_workspace_access(request.user, workspace_id)
+        if access is None:
+            return Response({"error": "Workspace not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not access.allowed:
+            return Response({"error": "You do not have permission to create tasks in this workspace."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "Expected a non-empty list of tasks."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.BULK_TASK_MAX_ITEMS:
+            return Response({"error": f"At most {settings.BULK_TASK_MAX_ITEMS} tasks can be created at once."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Field validation needs no queries; titles and tags are then checked for the
+        # whole batch with one query each.
+        errors = {}
+        valid = {}
+        for index, item in enumerate(items):
+            serializer = TaskSerializer(data=item)
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                errors[index] = serializer.errors
+
+        titles = {data['title'] for data in valid.values()}
+        taken = set(Task.objects.filter(workspace_id=workspace_id, title__in=titles).values_list('title', flat=True))
+        tag_ids = {tag_id for data in valid.values() for tag_id in data.get('tags', [])}
+        known_tags = set(Tag.objects.filter(workspace_id=workspace_id, id__in=tag_ids).values_list('id', flat=True))
+
+        for index, data in list(valid.items()):
+            if data['title'] in taken:
+                errors[index] = {"title": ["A task with this title already exists in this workspace."]}
+            elif not known_tags.issuperset(data.get('tags', [])):
+                errors[index] = {"tags": ["One or more tags do not exist or do not belong to the workspace."]}
+            else:
+                taken.add(data['title'])  # Later duplicates within the same batch.
+                continue
+            del valid[index]
+
+        created = []
+        if valid:
+            tasks = [
+                Task(workspace_id=workspace_id, **{k: v for k, v in data.items() if k != 'tags'})
+                for data in valid.values()
+            ]
+            try:
+                with transaction.atomic():
+                    Task.objects.bulk_create(tasks)
+                    Task.tags.through.objects.bulk_create([
+                        Task.tags.through(task_id=task.pk, tag_id=tag_id)
+                        for task, data in zip(tasks, valid.values())
+                        for tag_id in set(data.get('tags', []))
+                    ])
+            except IntegrityError:
+                # A title was taken by a concurrent request after the check above.
+                return Response({"error": "A task with this title already exists in this workspace."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            bump_workspace(workspace_id)
+            created = TaskSerializer(
+                Task.objects.filter(pk__in=[task.pk for task in tasks]).with_related().order_by('pk'), many=True
+            ).data
+
+        body = {
+            "created": created,
+            "errors": [{"index": index, "errors": errors[index]} for index in sorted(errors)],
+        }
+        return Response(body, status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST)
+
+
+class TaskImportView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    @swagger_auto_schema(
+        operation_description="Import tasks into a workspace from a CSV or JSON Lines upload (an export file "
+                              "can be imported back). Columns: `title`, `status`, `final_at`, `assigned_to` "
+                              "(username) and `tags` (names; `|`-separated in CSV). Missing tags are created. "
+                              "Invalid rows are skipped and reported by line. For very large files use the "
+                              "`import_tasks` management command.",
+        manual_parameters=[
+            openapi.Parameter(
+                'file', openapi.IN_FORM, description="The file to import.", type=openapi.TYPE_FILE, required=True
+            ),
+            openapi.Parameter(
+                'input', openapi.IN_FORM,
+                description="`csv` or `jsonl`; guessed from the file name by default.",
+                type=openapi.TYPE_STRING, enum=list(IMPORT_FORMATS)
+            )
+        ],
+        responses={
+            201: openapi.Response(
+                description="Number of tasks created and of rows skipped, with the errors of the first "
+                            "skipped rows.",
+                examples={
+                    "application/json": {
+                        "created": 2,
+                        "failed": 1,
+                        "errors": [{"line": 3, "errors": {"status": ['"done" is not a valid choice.']}}]
+                    }
+                }
+            ),
+            400: "Missing or unreadable file, or no task could be imported.",
+            403: "Forbidden",
+            404: "Workspace not found"
+        }
+    )
+    def post(self, request, workspace_id):
+        access = get_workspace_access(request.user, workspace_id)
+        if access is None:
+            return Response({"error": "Workspace not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not access.allowed:
+            return Response({"error": "You do not have permission to create tasks in this workspace."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "Upload the tasks as `file`."}, status=status.HTTP_400_BAD_REQUEST)
+        import_format = request.data.get('input') or format_for(upload.name)
+        if import_format not in IMPORT_FORMATS:
+            return Response({"error": f"Unknown input format. Use one of: {', '.join(IMPORT_FORMATS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        errors = []
+
+        def report(line, row_errors):
+            if len(errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+                errors.append({"line": line, "errors": row_errors})
+
+        try:
+            rows = read_rows(codecs.iterdecode(upload, 'utf-8-sig'), import_format)
+            created, failed = import_tasks(workspace_id, rows, report)
+        except InvalidImportFile as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if not created and not failed:
+            return Response({"error": "The file contains no tasks."}, status=status.HTTP_400_BAD_REQUEST)
+
+        body = {"created": created, "failed": failed, "errors": errors}
+        return Response(body, status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST)
+
+
+class TaskBulkStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Move many tasks of a workspace to a status at once (e.g. close a sprint). "
+                              "Any member can change statuses, but only the admin or the assignee can "
+                              "complete a task. Tasks out of reach or already in that status are skipped.",
+        request_body=BulkStatusSerializer,
+        responses={
+            200: openapi.Response(
+                description="IDs whose status changed, and IDs left untouched.",
+                examples={
+                    "application/json": {"updated": [1, 2], "skipped": [3]}
+                }
+            ),
+            400: "Bad Request",
+            403: "Forbidden",
+            404: "Workspace not found"
+        }
+    )
+    def post(self, request, workspace_id):
+        access = get_workspace_access(request.user, workspace_id)
+        if access is None:
+            return Response({"error": "Workspace not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not access.allowed:
+            return Response({"error": "You do not have permission to edit tasks in this workspace."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+        serializer = BulkStatusSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        ids = serializer.validated_data['ids']
+        new_status = serializer.validated_data['status']
+
+        tasks = Task.objects.filter(workspace_id=workspace_id, pk__in=ids)
+        if new_status == 'completed' and not access.is_admin:
+            # Same rule as CompleteTaskView.
+            tasks = tasks.filter(assigned_to=request.user)
+        updated = tasks.set_status(new_status)
+        if updated:
+            bump_workspace(workspace_id)
+        return Response(bulk_status_result(ids, updated), status=status.HTTP_200_OK)
+
+
 class TaskDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self, pk, user):
         try:
-            task = Task.objects.get(pk=pk)
-            if user not in task.workspace.members.all() and task.workspace.admin != user:
+            task = Task.objects.with_access(user).with_related().get(pk=pk)
+            if not task.has_access(user):
                 return None
             return task
         except Task.DoesNotExist:
@@ -663,7 +1359,12 @@ class TaskDetailView(APIView):
             return Response({"error": "You do not have permission to edit this task."}, status=status.HTTP_403_FORBIDDEN)
         serializer = TaskSerializer(task, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            try:
+                with transaction.atomic():
+                    serializer.save()
+            except IntegrityError:
+                return Response({"error": "A task with this title already exists in this workspace."},
+                                status=status.HTTP_400_BAD_REQUEST)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -685,12 +1386,31 @@ class TaskDetailView(APIView):
         task.delete()
         return Response({"message": "Task deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
 
-class TagListCreateView(APIView):
+class TagListCreateView(KeysetPaginationMixin, APIView):
     permission_classes = [IsAuthenticated]
     pagination_class = DefaultPaginationLOS
+    keyset_ordering_fields = ['name']
+    keyset_default_ordering = 'name'
 
     @swagger_auto_schema(
         operation_description="Retrieve a list of tags in a workspace.",
+        manual_parameters=[
+            openapi.Parameter(
+                'ordering', openapi.IN_QUERY, description="Order tags by name when using `cursor`.",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY,
+                description="Use keyset pagination: send it empty for the first page, then follow `next`.",
+                type=openapi.TYPE_STRING
+            ),
+            openapi.Parameter(
+                'count', openapi.IN_QUERY,
+                description="How `count` is computed: 'exact' (default), 'none', 'capped' (e.g. \"1000+\") "
+                            "or 'estimate' (planner estimate on PostgreSQL).",
+                type=openapi.TYPE_STRING, enum=['exact', 'none', 'capped', 'estimate']
+            )
+        ],
         responses={
             200: openapi.Response(
                 description="Paginated list of tags.",
@@ -709,22 +1429,26 @@ class TagListCreateView(APIView):
         }
     )
     def get(self, request, workspace_id):
-        try:
-            workspace = Workspace.objects.get(id=workspace_id)
-            if request.user not in workspace.members.all() and request.user != workspace.admin:
-                return Response({"error": "You do not have permission to read tags in this workspace."},
-                                status=status.HTTP_403_FORBIDDEN)
-        except Workspace.DoesNotExist:
+        access = get_workspace_access(request.user, workspace_id)
+        if access is None:
             return Response({"error": "Workspace not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not access.allowed:
+            return Response({"error": "You do not have permission to read tags in this workspace."},
+                            status=status.HTTP_403_FORBIDDEN)
 
-        tags = Tag.objects.filter(Q(workspace__members=request.user) | Q(workspace__admin=request.user),
-                                  workspace__id=workspace_id).distinct()
+        scope = workspace_scope(workspace_id)
+        etag = list_etag(request, scope)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
 
-        paginator = self.pagination_class()
-        paginated_tags = paginator.paginate_queryset(tags, request)
+        tags = Tag.objects.filter(workspace_id=workspace_id).select_related('workspace')
+
+        paginator = self.get_paginator(request)
+        paginated_tags = paginator.paginate_queryset(tags, request, self)
 
         serializer = TagSerializer(paginated_tags, many=True)
-        return paginator.get_paginated_response(serializer.data)
+        return set_etag(paginator.get_paginated_response(serializer.data), etag)
 
     @swagger_auto_schema(
         operation_description="Create a new tag in the specified workspace.",
@@ -748,20 +1472,21 @@ class TagListCreateView(APIView):
     )
     def post(self, request, workspace_id):
         try:
-            workspace = Workspace.objects.get(id=workspace_id)
-            if request.user not in workspace.members.all() and request.user != workspace.admin:
+            workspace = Workspace.objects.with_access(request.user).get(id=workspace_id)
+            if not workspace.has_access(request.user):
                 return Response({"error": "You do not have permission to create tags in this workspace."},
                                 status=status.HTTP_403_FORBIDDEN)
         except Workspace.DoesNotExist:
             return Response({"error": "Workspace not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        if Tag.objects.filter(name=request.data.get('name'), workspace=workspace).exists():
-            return Response({"error": "A tag with this name already exists in this workspace."},
-                            status=status.HTTP_400_BAD_REQUEST)
-
         serializer = TagSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(workspace=workspace)
+            try:
+                with transaction.atomic():
+                    serializer.save(workspace=workspace)
+            except IntegrityError:
+                return Response({"error": "A tag with this name already exists in this workspace."},
+                                status=status.HTTP_400_BAD_REQUEST)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -802,7 +1527,7 @@ class RemoveTagFromWorkspaceView(APIView):
             workspace = Workspace.objects.get(id=workspace_id)
 
 
-            if workspace.admin != request.user:
+            if workspace.admin_id != request.user.pk:
                 return Response({"error": "You do not have permission to remove tags from this workspace."},
                                 status=status.HTTP_403_FORBIDDEN)
 
@@ -812,7 +1537,10 @@ class RemoveTagFromWorkspaceView(APIView):
                 return Response({"error": "Tag not found."}, status=status.HTTP_404_NOT_FOUND)
 
 
-            tag.delete()
+            with transaction.atomic():
+                # The tag disappears from these tasks: make them show up in the next sync.
+                Task.objects.filter(tags=tag).update(updated_at=now())
+                tag.delete()
             return Response({"message": "Tag removed successfully from the workspace."}, status=status.HTTP_204_NO_CONTENT)
 
         except Workspace.DoesNotExist:
@@ -859,28 +1587,22 @@ class CompleteTaskView(APIView):
     )
 
     def post(self, request, task_id):
-        try:
-
-            task = Task.objects.get(id=task_id)
-            workspace = task.workspace
-
-
-            if request.user != workspace.admin and request.user != task.assigned_to:
-                return Response({"message": "You do not have permission to complete this task."},
-                                status=status.HTTP_403_FORBIDDEN)
-
-            if task.status == 'completed':
-                return Response({"message": "This task is already completed and cannot be completed again."},
-                                status=status.HTTP_400_BAD_REQUEST)
-
-            task.status = 'completed'
-            task.final_at = now()
-            task.save()
-
+        # One conditional UPDATE, so two concurrent requests cannot both complete the task.
+        tasks = Task.objects.filter(Q(workspace__admin_id=request.user.pk) | Q(assigned_to_id=request.user.pk),
+                                    pk=task_id).exclude(status='completed')
+        if tasks.update(status='completed', final_at=now(), updated_at=now()):
+            bump_workspace(Task.objects.filter(pk=task_id).values_list('workspace_id', flat=True).first())
             return Response({"message": "Task completed successfully."}, status=status.HTTP_200_OK)
 
-        except Task.DoesNotExist:
+        # Nothing was written: find out why.
+        task = Task.objects.filter(pk=task_id).values('status', 'assigned_to_id', 'workspace__admin_id').first()
+        if task is None:
             return Response({"message": "Task not found."}, status=status.HTTP_404_NOT_FOUND)
+        if request.user.pk not in (task['workspace__admin_id'], task['assigned_to_id']):
+            return Response({"message": "You do not have permission to complete this task."},
+                            status=status.HTTP_403_FORBIDDEN)
+        return Response({"message": "This task is already completed and cannot be completed again."},
+                        status=status.HTTP_400_BAD_REQUEST)
 
 
 class CompleteUserTaskView(APIView):
@@ -922,29 +1644,21 @@ class CompleteUserTaskView(APIView):
         }
     )
     def post(self, request, task_id):
-        try:
-
-            task = UserTask.objects.get(id=task_id)
-
-
-            if task.user != request.user:
-                return Response({"message": "You do not have permission to complete this task."},
-                                status=status.HTTP_403_FORBIDDEN)
-
-
-            if task.status == 'completed':
-                return Response({"message": "This task is already completed and cannot be completed again."},
-                                status=status.HTTP_400_BAD_REQUEST)
-
-
-            task.status = 'completed'
-            task.final_at = now()
-            task.save()
-
+        # One conditional UPDATE, so two concurrent requests cannot both complete the task.
+        tasks = UserTask.objects.filter(pk=task_id, user_id=request.user.pk).exclude(status='completed')
+        if tasks.update(status='completed', final_at=now(), updated_at=now()):
+            bump_user(request.user.pk)
             return Response({"message": "User task completed successfully."}, status=status.HTTP_200_OK)
 
-        except UserTask.DoesNotExist:
+        # Nothing was written: find out why.
+        task = UserTask.objects.filter(pk=task_id).values('user_id').first()
+        if task is None:
             return Response({"message": "User task not found."}, status=status.HTTP_404_NOT_FOUND)
+        if task['user_id'] != request.user.pk:
+            return Response({"message": "You do not have permission to complete this task."},
+                            status=status.HTTP_403_FORBIDDEN)
+        return Response({"message": "This task is already completed and cannot be completed again."},
+                        status=status.HTTP_400_BAD_REQUEST)
 
 
 class UserTagDeleteView(APIView):
@@ -983,10 +1697,13 @@ class UserTagDeleteView(APIView):
         try:
 
             tag = UserTag.objects.get(id=tag_id)
-            if tag.user != request.user:
+            if tag.user_id != request.user.pk:
                 return Response({"error": "You do not have permission to delete this tag."},
                                 status=status.HTTP_403_FORBIDDEN)
-            tag.delete()
+            with transaction.atomic():
+                # The tag disappears from these tasks: make them show up in the next sync.
+                UserTask.objects.filter(tags=tag).update(updated_at=now())
+                tag.delete()
             return Response({"message": "Tag deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
         except UserTag.DoesNotExist:
             return Response({"error": "Tag not found."}, status=status.HTTP_404_NOT_FOUND)
@@ -1029,7 +1746,7 @@ class UserTaskDeleteView(APIView):
         try:
 
             task = UserTask.objects.get(id=task_id)
-            if task.user != request.user:
+            if task.user_id != request.user.pk:
                 return Response({"error": "You do not have permission to delete this task."},
                                 status=status.HTTP_403_FORBIDDEN)
             task.delete()
@@ -1040,14 +1757,44 @@ class UserTaskDeleteView(APIView):
 
 class NonWorkspaceUsersView(APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering_fields = ['username']
+    keyset_default_ordering = 'username'
 
     @swagger_auto_schema(
-        operation_description="Retrieve a list of usernames that are not members of the workspace. Only the admin of the workspace can access this.",
+        operation_description="Look up users that are not members of the workspace by username prefix, e.g. "
+                              "for an invite typeahead. Results are ordered by username and paginated with "
+                              "`next`. Only the admin of the workspace can access this.",
+        manual_parameters=[
+            openapi.Parameter(
+                'q', openapi.IN_QUERY, description="Username prefix. Case sensitivity follows the database: "
+                                             "ASCII letters match case-insensitively on SQLite, "
+                                             "case-sensitively on PostgreSQL.",
+                type=openapi.TYPE_STRING, required=True
+            ),
+            openapi.Parameter(
+                'limit', openapi.IN_QUERY, description="Page size (default 10, at most 100).",
+                type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY, description="Opaque cursor from the `next` link of the previous page.",
+                type=openapi.TYPE_STRING
+            )
+        ],
         responses={
             200: openapi.Response(
-                description="List of usernames not in the workspace.",
+                description="Usernames starting with `q` that are not in the workspace.",
+                examples={
+                    "application/json": {
+                        "next": "http://example.com/todo/workspaces/1/non-members/?q=us&cursor=...",
+                        "results": ["user1", "user2", "user3"]
+                    }
+                }
+            ),
+            400: openapi.Response(
+                description="Missing prefix.",
                 examples={
-                    "application/json": ["user1", "user2", "user3"]
+                    "application/json": {"error": "A username prefix (`q`) is required."}
                 }
             ),
             403: openapi.Response(
@@ -1065,19 +1812,23 @@ class NonWorkspaceUsersView(APIView):
         }
     )
     def get(self, request, workspace_id):
-        try:
-            workspace = Workspace.objects.get(id=workspace_id)
-
-
-            if workspace.admin != request.user:
-                return Response({"error": "You do not have permission to view this list."},
-                                status=status.HTTP_403_FORBIDDEN)
-
+        access = get_workspace_access(request.user, workspace_id)
+        if access is None:
+            return Response({"error": "Workspace not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not access.is_admin:
+            return Response({"error": "You do not have permission to view this list."},
+                            status=status.HTTP_403_FORBIDDEN)
 
-            non_members = User.objects.exclude(id__in=workspace.members.values_list('id', flat=True))
-            usernames = non_members.values_list('username', flat=True)
+        prefix = request.query_params.get('q', '').strip()
+        if not prefix:
+            return Response({"error": "A username prefix (`q`) is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-            return Response(usernames, status=status.HTTP_200_OK)
+        # An indexed prefix match (LIKE 'q%', which SQLite compares case-insensitively for
+        # ASCII) and NOT EXISTS on the members table: only
+        # users matching the prefix are read, and at most one page of them is returned.
+        membership = Workspace.members.through.objects.filter(workspace_id=workspace_id, user_id=OuterRef('pk'))
+        users = User.objects.filter(username__startswith=prefix).filter(~Exists(membership)).only('username')
 
-        except Workspace.DoesNotExist:
-            return Response({"error": "Workspace not found."}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(users, request, self)
+        return paginator.get_paginated_response([user.username for user in page])
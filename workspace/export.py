@@ -0,0 +1,117 @@
+import csv
+import io
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# Streaming exports of task querysets as NDJSON or CSV. Rows are read with
+# values_list().iterator(), a chunk at a time, and each chunk's tag names come from
+# one query on the tags through table, so memory stays flat however many tasks
+# are exported. Every chunk is encoded into a single string for the response.
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+TASK_COLUMNS = [
+    ('id', 'id'),
+    ('title', 'title'),
+    ('status', 'status'),
+    ('created_at', 'created_at'),
+    ('final_at', 'final_at'),
+    ('assigned_to', 'assigned_to__username'),
+]
+
+USER_TASK_COLUMNS = TASK_COLUMNS[:-1]
+
+# Separates tag names in the CSV `tags` column.
+CSV_TAG_SEPARATOR = '|'
+
+
+def _tag_names(model, task_ids, using):
+    field = model._meta.get_field('tags')
+    task_column = f'{field.m2m_field_name()}_id'
+    links = field.remote_field.through.objects.using(using).filter(**{f'{task_column}__in': task_ids})
+    names = defaultdict(list)
+    for task_id, name in links.values_list(task_column, f'{field.m2m_reverse_field_name()}__name').order_by(
+        f'{field.m2m_reverse_field_name()}__name'
+    ):
+        names[task_id].append(name)
+    return names
+
+
+def iter_task_chunks(queryset, columns, chunk_size=None):
+    """
+    Yields lists of dicts (one per task, ``columns`` plus ``tags``), at most
+    ``chunk_size`` tasks each.
+    """
+    if chunk_size is None:
+        chunk_size = settings.EXPORT_CHUNK_SIZE
+    names = [name for name, _ in columns]
+    rows = queryset.values_list(*(lookup for _, lookup in columns)).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        tasks = [dict(zip(names, row)) for row in chunk]
+        tags = _tag_names(queryset.model, [task['id'] for task in tasks], queryset.db)
+        for task in tasks:
+            task['tags'] = tags.get(task['id'], [])
+        yield tasks
+
+
+_encoder = JSONEncoder(ensure_ascii=False)
+
+
+# Cells starting with one of these are formulas to spreadsheet applications.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _escape_cell(value):
+    # Prefixing `'` makes spreadsheets show the text instead of evaluating it.
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def _format_value(value):
+    # Same representation as the JSON API (ISO 8601 dates, `Z` for UTC).
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return _encoder.default(value)
+    return _escape_cell(value)
+
+
+def encode_ndjson(chunks):
+    for tasks in chunks:
+        yield ''.join(_encoder.encode(task) + '\n' for task in tasks)
+
+
+def encode_csv(chunks, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow([name for name, _ in columns] + ['tags'])
+    yield flush()
+    for tasks in chunks:
+        for task in tasks:
+            row = [_format_value(task[name]) for name, _ in columns]
+            writer.writerow(row + [_escape_cell(CSV_TAG_SEPARATOR.join(task['tags']))])
+        yield flush()
+
+
+def export_tasks(queryset, columns, export_format, chunk_size=None):
+    """Returns an iterator of encoded chunks in ``export_format`` (see FORMATS)."""
+    chunks = iter_task_chunks(queryset, columns, chunk_size)
+    if export_format == 'csv':
+        return encode_csv(chunks, columns)
+    return encode_ndjson(chunks)
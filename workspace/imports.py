@@ -0,0 +1,220 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+
+from workspace.export import CSV_TAG_SEPARATOR, FORMULA_PREFIXES
+from workspace.models import Tag, Task, Workspace
+from workspace.versions import bump_workspace
+
+
+# Bulk import of tasks into a workspace from CSV or JSON Lines (the files written by
+# the export endpoints can be imported back). The input is read a row at a time and
+# written in batches of IMPORT_BATCH_SIZE rows, each in one transaction: one query
+# for the titles already taken, one bulk INSERT for the tags that do not exist yet,
+# one for the tasks and one for their tag links. Tag names and assignee usernames
+# are resolved through maps loaded once per import. Rows that cannot be imported are
+# skipped and passed to `on_error(line, errors)`; the rest of the file goes on.
+#
+# Columns: `title` (required), `status`, `final_at`, `assigned_to` (username of a
+# member) and `tags` (a list of names; in CSV, names separated by `|`). Others,
+# such as the exported `id` and `created_at`, are ignored.
+
+FORMATS = ('csv', 'jsonl')
+
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+# Color of the tags created by an import.
+NEW_TAG_COLOR = '#FFFFFF'
+
+STATUSES = {value for value, _ in Task.STATUS_CHOICES}
+
+
+class InvalidImportFile(Exception):
+    pass
+
+
+def format_for(filename):
+    return EXTENSIONS.get(os.path.splitext(filename or '')[1].lower())
+
+
+def _unescape_cell(value):
+    # Undoes the `'` the CSV export puts before cells that would read as formulas.
+    if isinstance(value, str) and value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+def read_rows(lines, import_format):
+    """
+    Yields ``(line, row)`` for each record of ``lines`` (an iterable of text
+    lines); ``row`` is a dict, or None when the line could not be parsed.
+    """
+    if import_format == 'csv':
+        reader = csv.DictReader(lines)
+        if reader.fieldnames is None or 'title' not in reader.fieldnames:
+            raise InvalidImportFile("The CSV file needs a header row with at least a `title` column.")
+        for row in reader:
+            yield reader.line_num, {key: _unescape_cell(value) for key, value in row.items()}
+        return
+
+    for line, text in enumerate(lines, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+        yield line, row if isinstance(row, dict) else None
+
+
+def clean_row(row, members):
+    """Returns ``(task fields, tag names, errors)`` for one parsed row."""
+    if row is None:
+        return None, None, {"row": ["Not a valid record."]}
+
+    errors = {}
+    title = row.get('title')
+    title = title.strip() if isinstance(title, str) else ''
+    if not title:
+        errors['title'] = ["This field is required."]
+    elif len(title) > Task._meta.get_field('title').max_length:
+        errors['title'] = ["Ensure this field has no more than 255 characters."]
+
+    task_status = row.get('status') or 'pending'
+    if not isinstance(task_status, str) or task_status not in STATUSES:
+        errors['status'] = [f'"{task_status}" is not a valid choice.']
+
+    final_at = row.get('final_at') or None
+    if final_at is not None:
+        try:
+            final_at = parse_datetime(final_at) if isinstance(final_at, str) else None
+        except ValueError:  # Well formed but impossible, e.g. February 30th.
+            final_at = None
+        if final_at is None:
+            errors['final_at'] = ["Datetime has wrong format."]
+        elif is_naive(final_at):
+            final_at = make_aware(final_at)
+    elif task_status == 'completed':
+        final_at = now()
+
+    assigned_to_id = None
+    username = row.get('assigned_to') or None
+    if username is not None:
+        assigned_to_id = members.get(username) if isinstance(username, str) else None
+        if assigned_to_id is None:
+            errors['assigned_to'] = ["User is not a member of the workspace."]
+
+    tags = row.get('tags') or []
+    if isinstance(tags, str):
+        tags = tags.split(CSV_TAG_SEPARATOR)
+    if not isinstance(tags, list) or not all(isinstance(name, str) for name in tags):
+        errors['tags'] = ["Expected a list of tag names."]
+    else:
+        tags = {name.strip() for name in tags if name.strip()}
+        if any(len(name) > Tag._meta.get_field('name').max_length for name in tags):
+            errors['tags'] = ["Tag names can have at most 50 characters."]
+
+    if errors:
+        return None, None, errors
+    fields = {'title': title, 'status': task_status, 'final_at': final_at, 'assigned_to_id': assigned_to_id}
+    return fields, tags, None
+
+
+def _import_batch(workspace_id, batch, tag_ids):
+    # `batch` holds (line, task fields, tag names). Returns the number of tasks created
+    # and the (line, errors) of the rows skipped.
+    errors = []
+    with transaction.atomic():
+        titles = {fields['title'] for _, fields, _ in batch}
+        taken = set(Task.objects.filter(workspace_id=workspace_id, title__in=titles).values_list('title', flat=True))
+        rows = []
+        for line, fields, tags in batch:
+            if fields['title'] in taken:
+                errors.append((line, {"title": ["A task with this title already exists in this workspace."]}))
+                continue
+            taken.add(fields['title'])
+            rows.append((fields, tags))
+        if not rows:
+            return 0, errors
+
+        new_tag_ids = {}
+        missing = {name for _, tags in rows for name in tags if name not in tag_ids}
+        if missing:
+            Tag.objects.bulk_create(
+                [Tag(workspace_id=workspace_id, name=name, color=NEW_TAG_COLOR) for name in missing],
+                ignore_conflicts=True,  # Created meanwhile by another request.
+            )
+            new_tag_ids = dict(Tag.objects.filter(workspace_id=workspace_id, name__in=missing)
+                               .values_list('name', 'id'))
+
+        tasks = Task.objects.bulk_create([Task(workspace_id=workspace_id, **fields) for fields, _ in rows])
+        Task.tags.through.objects.bulk_create([
+            Task.tags.through(task_id=task.pk, tag_id=tag_ids.get(name) or new_tag_ids[name])
+            for task, (_, tags) in zip(tasks, rows)
+            for name in tags
+        ])
+        bump_workspace(workspace_id)
+
+    # Only once the batch is committed: a rolled back batch leaves no tags behind.
+    tag_ids.update(new_tag_ids)
+    return len(tasks), errors
+
+
+def import_tasks(workspace_id, rows, on_error, batch_size=None):
+    """
+    Imports the ``(line, row)`` pairs of ``rows`` (see `read_rows`) into the
+    workspace. Returns ``(created, failed)``.
+    """
+    if batch_size is None:
+        batch_size = settings.IMPORT_BATCH_SIZE
+    tag_ids = dict(Tag.objects.filter(workspace_id=workspace_id).values_list('name', 'id'))
+    members = dict(Workspace.members.through.objects.filter(workspace_id=workspace_id)
+                   .values_list('user__username', 'user_id'))
+
+    failed = 0
+
+    def fail(line, errors):
+        nonlocal failed
+        failed += 1
+        on_error(line, errors)
+
+    def valid_rows():
+        for line, row in rows:
+            fields, tags, errors = clean_row(row, members)
+            if errors:
+                fail(line, errors)
+            else:
+                yield line, fields, tags
+
+    created = 0
+    valid = valid_rows()
+    try:
+        while batch := list(islice(valid, batch_size)):
+            try:
+                batch_created, batch_errors = _import_batch(workspace_id, batch, tag_ids)
+            except IntegrityError:
+                # A title of the batch was taken by a concurrent request after the check.
+                batch_created, batch_errors = 0, [
+                    (line, {"title": ["A task with this title was created meanwhile; import the row again."]})
+                    for line, _, _ in batch
+                ]
+            created += batch_created
+            for line, errors in batch_errors:
+                fail(line, errors)
+    except UnicodeDecodeError:
+        fail(None, {"file": ["The file is not valid UTF-8; the rows after this point were not imported."]})
+    except csv.Error as exc:
+        # E.g. a field over the csv module's size limit: the rest of the file cannot be read.
+        raise InvalidImportFile(f"The CSV file could not be read ({exc}); {created} tasks had been imported "
+                                f"before that point.")
+    return created, failed
@@ -0,0 +1,12 @@
+from workspace.models import Task
+from workspace.sync import purge_tombstones
+
+
+# Periodic jobs of the workspace app, enabled through `PERIODIC_JOBS` in settings.
+
+def purge_old_completed_tasks():
+    return Task.delete_old_completed_tasks()
+
+
+def purge_task_tombstones():
+    return purge_tombstones()
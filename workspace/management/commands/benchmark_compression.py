@@ -0,0 +1,63 @@
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from todo_api.compression import ENCODINGS, compress
+
+
+class Command(BaseCommand):
+    help = (
+        "Report, per endpoint, the bytes saved by Brotli and gzip and the CPU time each one costs per "
+        "response. Bodies are fetched uncompressed from a running server, then compressed in-process "
+        "with the same code as CompressionMiddleware."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=['/todo/workspaces/'],
+                            help="Endpoints to measure, e.g. /todo/workspaces/1/tasks/?limit=100.")
+        parser.add_argument('--token', required=True, help="JWT access token sent as a Bearer token.")
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help="Where the server listens.")
+        parser.add_argument('--gzip-levels', nargs='+', type=int, default=[settings.COMPRESSION_GZIP_LEVEL])
+        parser.add_argument('--brotli-qualities', nargs='+', type=int,
+                            default=[settings.COMPRESSION_BROTLI_QUALITY])
+        parser.add_argument('--repeat', type=int, default=50, help="Compressions timed per measurement.")
+
+    def handle(self, *args, **options):
+        codings = [('gzip', level) for level in options['gzip_levels']]
+        if 'br' in ENCODINGS:
+            codings = [('br', quality) for quality in options['brotli_qualities']] + codings
+        else:
+            self.stderr.write(self.style.WARNING("Brotli is not installed; measuring gzip only."))
+
+        self.stdout.write(
+            f"{'endpoint':<40}{'coding':<9}{'bytes':>10}{'compressed':>12}{'saved':>8}{'cpu ms':>9}"
+        )
+        for path in options['paths']:
+            body = self.fetch(options['base_url'].rstrip('/') + path, options['token'])
+            for encoding, level in codings:
+                size, cpu = self.measure(body, encoding, level, options['repeat'])
+                saved = 1 - size / len(body) if body else 0.0
+                self.stdout.write(
+                    f"{path:<40}{f'{encoding}-{level}':<9}{len(body):>10}{size:>12}{saved:>8.1%}{cpu * 1000:>9.3f}"
+                )
+
+    def fetch(self, url, token):
+        request = urllib.request.Request(url, headers={
+            'Authorization': f'Bearer {token}',
+            'Accept-Encoding': 'identity',
+        })
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.read()
+        except (urllib.error.URLError, OSError) as exc:
+            raise CommandError(f"Cannot fetch {url}: {exc}")
+
+    def measure(self, body, encoding, level, repeat):
+        # CPU time, not wall time: what each compressed response costs a worker.
+        started = time.process_time()
+        for _ in range(repeat):
+            compressed = compress(body, encoding, level)
+        return len(compressed), (time.process_time() - started) / repeat
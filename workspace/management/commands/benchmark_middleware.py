@@ -0,0 +1,71 @@
+import asyncio
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, override_settings
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.module_loading import import_string
+
+
+def runs_in_thread(middleware_class):
+    """
+    Whether the middleware leaves the event loop under ASGI: sync-only
+    middleware, and MiddlewareMixin subclasses without their own ``__acall__``,
+    whose hooks Django runs through sync_to_async.
+    """
+    if not getattr(middleware_class, 'async_capable', False):
+        return True
+    return (
+        issubclass(middleware_class, MiddlewareMixin)
+        and middleware_class.__acall__ is MiddlewareMixin.__acall__
+        and any(hasattr(middleware_class, hook) for hook in ('process_request', 'process_view', 'process_response'))
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what the middleware that still runs in a worker thread under ASGI costs per request. "
+        "Requests go through the ASGI handler in-process, against the configured database, once with "
+        "MIDDLEWARE as configured and once without that middleware."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=['/todo/workspaces/'],
+                            help="Endpoints to measure, e.g. /todo/workspaces/1/tasks/.")
+        parser.add_argument('--token', required=True, help="JWT access token sent as a Bearer token.")
+        parser.add_argument('--requests', type=int, default=500, help="Requests timed per measurement.")
+
+    def handle(self, *args, **options):
+        threaded = [path for path in settings.MIDDLEWARE if runs_in_thread(import_string(path))]
+        native = [path for path in settings.MIDDLEWARE if path not in threaded]
+        self.stdout.write("Middleware run in a worker thread under ASGI:")
+        for path in threaded:
+            self.stdout.write(f"  {path}")
+
+        self.stdout.write(f"{'endpoint':<40}{'middleware':<12}{'p50 ms':>10}{'p95 ms':>10}")
+        for path in options['paths']:
+            for label, middleware in (('configured', settings.MIDDLEWARE), ('native', native)):
+                timings = self.time_requests(path, options['token'], options['requests'], middleware)
+                self.stdout.write(f"{path:<40}{label:<12}{statistics.median(timings):>10.2f}"
+                                  f"{timings[int(len(timings) * 0.95) - 1]:>10.2f}")
+
+    def time_requests(self, path, token, count, middleware):
+        async def run():
+            # The client builds its handler, and so the middleware chain, when created.
+            client = AsyncClient()
+            headers = {'Authorization': f'Bearer {token}'}
+            timings = []
+            for i in range(count + 10):  # The first requests warm the per-worker caches.
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                elapsed = time.perf_counter() - started
+                if response.status_code != 200:
+                    raise CommandError(f"GET {path} answered {response.status_code}.")
+                if i >= 10:
+                    timings.append(elapsed * 1000)
+            return sorted(timings)
+
+        with override_settings(MIDDLEWARE=middleware, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            return asyncio.run(run())
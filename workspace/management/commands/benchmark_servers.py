@@ -0,0 +1,112 @@
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+SERVERS = {
+    'gunicorn-sync': [
+        sys.executable, '-m', 'gunicorn', 'todo_api.wsgi:application',
+        '--worker-class', 'sync', '--workers', '{workers}', '--bind', '127.0.0.1:{port}',
+        '--log-level', 'warning',
+    ],
+    'uvicorn': [
+        sys.executable, '-m', 'uvicorn', 'todo_api.asgi:application',
+        '--workers', '{workers}', '--host', '127.0.0.1', '--port', '{port}',
+        '--log-level', 'warning', '--no-access-log',
+    ],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare requests/sec of the API under gunicorn (sync workers) and uvicorn (ASGI). "
+        "Each server is started against the configured database and hit with concurrent GETs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=['/todo/workspaces/'],
+                            help="Endpoints to benchmark, e.g. /todo/workspaces/1/tasks/.")
+        parser.add_argument('--token', required=True, help="JWT access token sent as a Bearer token.")
+        parser.add_argument('--servers', nargs='+', choices=sorted(SERVERS), default=sorted(SERVERS))
+        parser.add_argument('--workers', type=int, default=2, help="Server worker processes.")
+        parser.add_argument('--concurrency', type=int, default=16, help="Concurrent client threads.")
+        parser.add_argument('--duration', type=float, default=10.0, help="Seconds of load per endpoint.")
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        results = []
+        for name in options['servers']:
+            command = [part.format(workers=options['workers'], port=options['port']) for part in SERVERS[name]]
+            process = subprocess.Popen(command, cwd=settings.BASE_DIR)
+            try:
+                self.wait_for_port(options['port'], process)
+                for path in options['paths']:
+                    url = f"http://127.0.0.1:{options['port']}{path}"
+                    stats = self.run_load(url, options['token'], options['concurrency'], options['duration'])
+                    results.append((name, path, stats))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+        self.stdout.write(f"{'server':<15}{'endpoint':<40}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+        for name, path, stats in results:
+            self.stdout.write(
+                f"{name:<15}{path:<40}{stats['rps']:>10.1f}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['errors']:>8}"
+            )
+
+    def wait_for_port(self, port, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"Server exited with code {process.returncode}.")
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"Server did not start listening on port {port}.")
+
+    def run_load(self, url, token, concurrency, duration):
+        latencies = []
+        errors = [0]
+        lock = threading.Lock()
+        deadline = time.monotonic() + duration
+
+        def worker():
+            request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request, timeout=30) as response:
+                        response.read()
+                    ok = True
+                except (urllib.error.URLError, OSError):
+                    ok = False
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if ok:
+                        latencies.append(elapsed)
+                    else:
+                        errors[0] += 1
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        latencies.sort()
+        return {
+            'rps': len(latencies) / duration,
+            'p50': statistics.median(latencies) * 1000 if latencies else 0.0,
+            'p95': latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+            'errors': errors[0],
+        }
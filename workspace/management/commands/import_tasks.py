@@ -0,0 +1,74 @@
+import csv
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from workspace.imports import FORMATS, InvalidImportFile, format_for, import_tasks, read_rows
+from workspace.models import Workspace
+
+
+class ErrorReport:
+    # CSV of the rows that were not imported: line, field, error. The file is only
+    # created on the first error.
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.writer = None
+
+    def write(self, line, errors):
+        if self.file is None:
+            self.file = open(self.path, 'w', encoding='utf-8', newline='')
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(['line', 'field', 'error'])
+        for field, messages in errors.items():
+            for message in messages:
+                self.writer.writerow(['' if line is None else line, field, message])
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+class Command(BaseCommand):
+    help = "Import tasks into a workspace from a CSV or JSON Lines file, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('workspace_id', type=int, help="Workspace the tasks are created in.")
+        parser.add_argument('path', help="File to import (.csv, .jsonl or .ndjson).")
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help="Format of the file; guessed from its extension by default.",
+        )
+        parser.add_argument(
+            '--report',
+            help="Where to write the rows that could not be imported (default: <path>.errors.csv).",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.IMPORT_BATCH_SIZE,
+            help="Number of tasks created per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        workspace_id = options['workspace_id']
+        if not Workspace.objects.filter(pk=workspace_id).exists():
+            raise CommandError(f"Workspace {workspace_id} does not exist.")
+        import_format = options['format'] or format_for(options['path'])
+        if import_format is None:
+            raise CommandError("Cannot tell the format from the file name; use --format.")
+
+        report = ErrorReport(options['report'] or f"{options['path']}.errors.csv")
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+                created, failed = import_tasks(workspace_id, read_rows(lines, import_format), report.write,
+                                               batch_size=options['batch_size'])
+        except InvalidImportFile as exc:
+            raise CommandError(str(exc))
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+        finally:
+            report.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {created} tasks."))
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} rows were not imported; see {report.path}."))
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from workspace.models import Task
+
+
+class Command(BaseCommand):
+    help = "Delete completed tasks older than the retention window in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days', type=int, default=settings.COMPLETED_TASK_RETENTION_DAYS,
+            help="Delete tasks completed more than this many days ago.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TASK_PURGE_BATCH_SIZE,
+            help="Number of tasks deleted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        purged = Task.delete_old_completed_tasks(
+            retention_days=options['retention_days'], batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} completed tasks."))
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from workspace.sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete deleted-task tombstones older than the sync retention window in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days', type=int, default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help="Delete tombstones older than this many days.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TASK_PURGE_BATCH_SIZE,
+            help="Number of tombstones deleted per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_tombstones(retention_days=options['retention_days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} task tombstones."))
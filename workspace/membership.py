@@ -0,0 +1,126 @@
+from collections import namedtuple
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from todo_api.cache import LRUCache, aget_counter, bump_counter, get_counter
+from workspace.models import Workspace
+
+
+# Cache of workspace memberships: user_id -> {workspace_id: (is_admin, is_member, version)}.
+#
+# Entries live in Django's cache framework (shared between workers when a shared
+# backend such as Redis is configured) and in a small per-worker LRU in front of it.
+# Every workspace has a version counter that the signals in `workspace.signals`
+# bump whenever its membership changes or it is deleted; an entry is only trusted
+# while its recorded version matches the current one. The bump waits for the change
+# to commit, so a concurrent request cannot cache the old membership under the new
+# version. Only positive answers are cached, so a user added to a workspace is never
+# wrongly rejected: an unknown (user, workspace) pair falls back to one indexed query.
+#
+# A removal must be seen by every worker, so without a shared cache
+# (settings.CACHE_IS_SHARED) nothing is cached and every check is that query.
+
+class WorkspaceAccess(namedtuple('WorkspaceAccess', ['is_admin', 'is_member'])):
+    @property
+    def allowed(self):
+        return self.is_admin or self.is_member
+
+_local = LRUCache(maxsize=settings.MEMBERSHIP_CACHE_SIZE, ttl=settings.MEMBERSHIP_CACHE_TTL)
+
+
+def _version_key(workspace_id):
+    return f'workspace:{workspace_id}:membership-version'
+
+
+def _user_key(user_id):
+    return f'membership:user:{user_id}'
+
+
+def get_version(workspace_id):
+    return get_counter(_version_key(workspace_id))
+
+
+def bump_version(workspace_id):
+    transaction.on_commit(partial(bump_counter, _version_key(workspace_id)))
+
+
+def _get_entry(user_id):
+    entry = _local.get(user_id)
+    if entry is None:
+        entry = cache.get(_user_key(user_id), {})
+        _local.set(user_id, entry)
+    return entry
+
+
+def _remember(user_id, workspace_id, access, version):
+    entry = dict(_get_entry(user_id))
+    entry[workspace_id] = (access.is_admin, access.is_member, version)
+    _local.set(user_id, entry)
+    cache.set(_user_key(user_id), entry, settings.MEMBERSHIP_CACHE_TTL)
+
+
+def _cached_access(entry, workspace_id, version):
+    cached = entry.get(workspace_id)
+    if cached is not None and cached[2] == version:
+        return WorkspaceAccess(cached[0], cached[1])
+    return None
+
+
+def _access_query(user, workspace_id):
+    return Workspace.objects.with_access(user).filter(pk=workspace_id).values_list('is_admin', 'is_member')
+
+
+def get_workspace_access(user, workspace_id):
+    """
+    Return the WorkspaceAccess of ``user`` in the workspace, or None if the
+    workspace does not exist.
+    """
+    workspace_id = int(workspace_id)
+    if not settings.CACHE_IS_SHARED:
+        row = _access_query(user, workspace_id).first()
+        return WorkspaceAccess(*row) if row is not None else None
+
+    version = get_version(workspace_id)
+    access = _cached_access(_get_entry(user.pk), workspace_id, version)
+    if access is not None:
+        return access
+
+    row = _access_query(user, workspace_id).first()
+    if row is None:
+        return None
+    access = WorkspaceAccess(*row)
+    if access.allowed:
+        _remember(user.pk, workspace_id, access, version)
+    return access
+
+
+async def aget_workspace_access(user, workspace_id):
+    """Async version of `get_workspace_access`."""
+    workspace_id = int(workspace_id)
+    if not settings.CACHE_IS_SHARED:
+        row = await _access_query(user, workspace_id).afirst()
+        return WorkspaceAccess(*row) if row is not None else None
+
+    version = await aget_counter(_version_key(workspace_id))
+
+    entry = _local.get(user.pk)
+    if entry is None:
+        entry = await cache.aget(_user_key(user.pk), {})
+        _local.set(user.pk, entry)
+    access = _cached_access(entry, workspace_id, version)
+    if access is not None:
+        return access
+
+    row = await _access_query(user, workspace_id).afirst()
+    if row is None:
+        return None
+    access = WorkspaceAccess(*row)
+    if access.allowed:
+        entry = dict(entry)
+        entry[workspace_id] = (access.is_admin, access.is_member, version)
+        _local.set(user.pk, entry)
+        await cache.aset(_user_key(user.pk), entry, settings.MEMBERSHIP_CACHE_TTL)
+    return access
@@ -0,0 +1,67 @@
+# Generated by Django 5.2 on 2026-10-17 00:16
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+UNIQUE_FIELDS = [
+    ('Tag', 'workspace', 'name'),
+    ('Task', 'workspace', 'title'),
+    ('UserTag', 'user', 'name'),
+    ('UserTask', 'user', 'title'),
+    ('Workspace', None, 'title'),
+]
+
+
+def rename_duplicates(apps, schema_editor):
+    # The old exists() checks were racy, so duplicates may exist. Keep the oldest row
+    # as is and append the id to the others: "Title (42)".
+    for model_name, scope, field in UNIQUE_FIELDS:
+        model = apps.get_model('workspace', model_name)
+        key = [f'{scope}_id', field] if scope else [field]
+        max_length = model._meta.get_field(field).max_length
+        duplicates = model.objects.values(*key).annotate(rows=Count('pk')).filter(rows__gt=1)
+        for duplicate in duplicates:
+            del duplicate['rows']
+            for row in model.objects.filter(**duplicate).order_by('pk')[1:]:
+                suffix = f' ({row.pk})'
+                setattr(row, field, getattr(row, field)[:max_length - len(suffix)] + suffix)
+                row.save(update_fields=[field])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workspace', '0005_task_usertask_final_at_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('workspace', 'name'), name='tag_ws_name_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(fields=('workspace', 'title'), name='task_ws_title_uniq'),
+        ),
+        # Same columns as the constraint's own index: only writes would pay for it.
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_ws_title_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='usertag',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='usertag_user_name_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='usertask',
+            constraint=models.UniqueConstraint(fields=('user', 'title'), name='usertask_user_title_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='workspace',
+            constraint=models.UniqueConstraint(fields=('title',), name='workspace_title_uniq'),
+        ),
+    ]
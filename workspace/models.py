@@ -1,9 +1,65 @@
 from datetime import timedelta
 
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef, Prefetch, Q
 from django.contrib.auth.models import User
 from django.utils.timezone import now
 
+from todo_api.db import delete_in_batches
+from workspace.versions import bump_user, bump_workspace
+
+
+class WorkspaceQuerySet(models.QuerySet):
+    def with_access(self, user):
+        # Annotates `is_admin` and `is_member` for `user` in the same query that fetches
+        # the workspace; membership is a single indexed EXISTS on the members table.
+        membership = self.model.members.through.objects.filter(workspace_id=OuterRef('pk'), user_id=user.pk)
+        return self.annotate(is_admin=Q(admin_id=user.pk), is_member=Exists(membership))
+
+    def with_related(self):
+        # Everything WorkspaceSerializer renders, in a constant number of queries.
+        return self.select_related('admin').prefetch_related('members')
+
+
+class BaseTaskQuerySet(models.QuerySet):
+    # Shared by Task and UserTask.
+
+    def set_status(self, status):
+        # Moves every task in the queryset that is not already in `status` to it
+        # (stamping `final_at` on completion) with a single UPDATE, and returns the
+        # ids that changed. The rows are locked first so the ids are exact.
+        with transaction.atomic(using=self.db):
+            ids = list(self.exclude(status=status).select_for_update().values_list('pk', flat=True))
+            if ids:
+                changes = {'status': status, 'updated_at': now()}
+                if status == 'completed':
+                    changes['final_at'] = now()
+                self.model._base_manager.using(self.db).filter(pk__in=ids).update(**changes)
+        return ids
+
+    def delete(self):
+        # Leaves a tombstone per deleted row for the sync endpoints (see workspace.sync)
+        # and bumps the content versions of the lists they were in (workspace.versions).
+        with transaction.atomic(using=self.db):
+            self.model.record_deletions(self)
+            return super().delete()
+
+
+class TaskQuerySet(BaseTaskQuerySet):
+    def with_access(self, user):
+        # Same as `WorkspaceQuerySet.with_access`, resolved through the task's workspace.
+        membership = Workspace.members.through.objects.filter(workspace_id=OuterRef('workspace_id'),
+                                                              user_id=user.pk)
+        return self.annotate(is_admin=Q(workspace__admin_id=user.pk), is_member=Exists(membership))
+
+    def with_related(self):
+        # Everything TaskSerializer renders (tags included, with their workspace)
+        # in a constant number of queries, whatever the number of tasks.
+        return self.select_related('assigned_to', 'workspace').prefetch_related(
+            Prefetch('tags', queryset=Tag.objects.select_related('workspace'))
+        )
+
 
 # Create your models here.
 class Workspace(models.Model):
@@ -12,16 +68,29 @@ class Workspace(models.Model):
     admin = models.ForeignKey(User, on_delete=models.CASCADE, related_name='admin_workspaces')
     members = models.ManyToManyField(User, related_name='member_workspaces', blank=True)
 
+    objects = WorkspaceQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['title'], name='workspace_title_uniq'),
+        ]
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        if not self.members.filter(id=self.admin.id).exists():
-            self.members.add(self.admin)
+        if not self.members.filter(id=self.admin_id).exists():
+            self.members.add(self.admin_id)
+
+    def has_access(self, user):
+        # Uses the annotations from `with_access(user)` when present.
+        if hasattr(self, 'is_member'):
+            return self.is_member or self.is_admin
+        return self.admin_id == user.pk or self.members.filter(pk=user.pk).exists()
 
     def can_delete(self, user):
-        return self.admin == user
+        return self.admin_id == user.pk
 
 
 class UserTag(models.Model):
@@ -29,6 +98,11 @@ class UserTag(models.Model):
     color = models.CharField(max_length=7)  # Hex color code
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='user_tags')
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'name'], name='usertag_user_name_uniq'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -38,6 +112,11 @@ class Tag(models.Model):
     color = models.CharField(max_length=7)  # Hex color code
     workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE, related_name='tags')
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['workspace', 'name'], name='tag_ws_name_uniq'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -52,12 +131,40 @@ class UserTask(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
     final_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='user_tasks')
     tags = models.ManyToManyField(UserTag, related_name='user_tasks', blank=True)
 
+    objects = BaseTaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'status', 'created_at'], name='usertask_user_status_idx'),
+            models.Index(fields=['user', 'created_at'], name='usertask_user_created_idx'),
+            models.Index(fields=['user', 'final_at'], name='usertask_user_final_idx'),
+            models.Index(fields=['user', 'updated_at'], name='usertask_user_updated_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'title'], name='usertask_user_title_uniq'),
+        ]
+
     def __str__(self):
         return self.title
 
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            UserTaskTombstone.objects.create(task_id=self.pk, user_id=self.user_id)
+            bump_user(self.user_id)
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def record_deletions(cls, queryset):
+        tombstones = UserTaskTombstone.objects.using(queryset.db).bulk_create(
+            UserTaskTombstone(task_id=pk, user_id=user_id) for pk, user_id in queryset.values_list('pk', 'user_id')
+        )
+        for user_id in {tombstone.user_id for tombstone in tombstones}:
+            bump_user(user_id)
+
 
 class Task(models.Model):
     STATUS_CHOICES = [
@@ -70,20 +177,94 @@ class Task(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
     final_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
     assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='tasks')
     workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE, related_name='tasks')
     tags = models.ManyToManyField(Tag, related_name='tasks', blank=True)
 
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        # Task listings are always scoped to one workspace, then filtered by status,
+        # assignee or date range and ordered by creation date or title.
+        indexes = [
+            models.Index(fields=['workspace', 'status', 'created_at'], name='task_ws_status_created_idx'),
+            models.Index(fields=['workspace', 'created_at'], name='task_ws_created_idx'),
+            models.Index(fields=['workspace', 'assigned_to'], name='task_ws_assigned_idx'),
+            models.Index(fields=['workspace', 'final_at'], name='task_ws_final_idx'),
+            models.Index(fields=['status', 'final_at'], name='task_status_final_idx'),
+            models.Index(fields=['workspace', 'updated_at'], name='task_ws_updated_idx'),
+        ]
+        # The unique constraint's index also serves ordering by title.
+        constraints = [
+            models.UniqueConstraint(fields=['workspace', 'title'], name='task_ws_title_uniq'),
+        ]
+
     def __str__(self):
         return self.title
 
+    def has_access(self, user):
+        # Uses the annotations from `with_access(user)` when present.
+        if hasattr(self, 'is_member'):
+            return self.is_member or self.is_admin
+        return self.workspace.has_access(user)
+
     def can_edit(self, user):
-        return user in self.workspace.members.all()
+        if hasattr(self, 'is_member'):
+            return self.is_member
+        return self.workspace.members.filter(pk=user.pk).exists()
 
     def can_delete(self, user):
-        return self.workspace.admin == user
+        return self.workspace.admin_id == user.pk
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            TaskTombstone.objects.create(task_id=self.pk, workspace_id=self.workspace_id)
+            bump_workspace(self.workspace_id)
+            return super().delete(*args, **kwargs)
 
     @classmethod
-    def delete_old_completed_tasks(cls):
-        three_months_ago = now() - timedelta(days=90)
-        cls.objects.filter(status='completed', final_at__lte=three_months_ago).delete()
\ No newline at end of file
+    def record_deletions(cls, queryset):
+        tombstones = TaskTombstone.objects.using(queryset.db).bulk_create(
+            TaskTombstone(task_id=pk, workspace_id=workspace_id)
+            for pk, workspace_id in queryset.values_list('pk', 'workspace_id')
+        )
+        for workspace_id in {tombstone.workspace_id for tombstone in tombstones}:
+            bump_workspace(workspace_id)
+
+    @classmethod
+    def delete_old_completed_tasks(cls, retention_days=None, batch_size=None):
+        # Deletes in short primary-key batches; run from the `purge_completed_tasks`
+        # command or the periodic job, never from a request. Returns the rows purged.
+        if retention_days is None:
+            retention_days = settings.COMPLETED_TASK_RETENTION_DAYS
+        if batch_size is None:
+            batch_size = settings.TASK_PURGE_BATCH_SIZE
+        cutoff = now() - timedelta(days=retention_days)
+        return delete_in_batches(cls.objects.filter(status='completed', final_at__lte=cutoff), batch_size)
+
+
+# Deleted tasks leave a tombstone so that the sync endpoints can tell clients which
+# ids to drop. They only keep ids (the workspace or user may be gone by then) and are
+# purged after `SYNC_TOMBSTONE_RETENTION_DAYS`.
+
+class TaskTombstone(models.Model):
+    task_id = models.BigIntegerField()
+    workspace_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['workspace_id', 'deleted_at'], name='tasktomb_ws_deleted_idx'),
+        ]
+
+
+class UserTaskTombstone(models.Model):
+    task_id = models.BigIntegerField()
+    user_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user_id', 'deleted_at'], name='usertasktomb_user_deleted_idx'),
+        ]
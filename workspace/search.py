@@ -0,0 +1,174 @@
+import re
+
+from django.db import DatabaseError, connections, transaction
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+
+# Indexed title search for `Task` and `UserTask`.
+#
+# SQLite: an external-content FTS5 table per model (`<table>_fts`) kept in sync by
+# triggers, so bulk_create/update/delete are covered too. Ranked with bm25.
+# PostgreSQL: a GIN index on `to_tsvector('simple', title)` for word-prefix
+# queries, ranked with ts_rank, plus a pg_trgm GIN index so substrings inside a
+# word ("port" in "report") are still found through an index.
+#
+# Both are created by migration 0004 and re-checked after every `migrate`, since
+# SQLite drops the triggers whenever Django rebuilds the table.
+
+SEARCH_TABLES = ('workspace_task', 'workspace_usertask')
+
+# Column each table's listings are scoped by: the FTS5 index is global, so the
+# search subquery joins back to the table to only return the caller's rows.
+SEARCH_SCOPES = {
+    'workspace_task': 'workspace_id',
+    'workspace_usertask': 'user_id',
+}
+
+SEARCH_MIGRATION = ('workspace', '0004_task_usertask_title_search')
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def search_tokens(term):
+    return TOKEN_RE.findall(term.lower())
+
+
+def fts_table(table):
+    return f'{table}_fts'
+
+
+def install_search_index(connection, tables=SEARCH_TABLES):
+    if connection.vendor == 'sqlite':
+        _install_sqlite(connection, tables)
+    elif connection.vendor == 'postgresql':
+        _install_postgresql(connection, tables)
+
+
+def uninstall_search_index(connection, tables=SEARCH_TABLES):
+    with connection.cursor() as cursor:
+        for table in tables:
+            if connection.vendor == 'sqlite':
+                for suffix in ('ai', 'ad', 'au'):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {fts_table(table)}_{suffix}')
+                cursor.execute(f'DROP TABLE IF EXISTS {fts_table(table)}')
+            elif connection.vendor == 'postgresql':
+                cursor.execute(f'DROP INDEX IF EXISTS {table}_title_tsv_idx')
+                cursor.execute(f'DROP INDEX IF EXISTS {table}_title_trgm_idx')
+
+
+def _install_sqlite(connection, tables):
+    with connection.cursor() as cursor:
+        for table in tables:
+            fts = fts_table(table)
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = %s", [f'{fts}_ad'])
+            if cursor.fetchone():
+                continue
+            # Missing triggers mean rows may have changed without the index noticing:
+            # recreate everything and rebuild the index from the table.
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"title, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN '
+                f'INSERT INTO {fts}(rowid, title) VALUES (new.id, new.title); END'
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN '
+                f"INSERT INTO {fts}({fts}, rowid, title) VALUES ('delete', old.id, old.title); END"
+            )
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF title ON {table} BEGIN '
+                f"INSERT INTO {fts}({fts}, rowid, title) VALUES ('delete', old.id, old.title); "
+                f'INSERT INTO {fts}(rowid, title) VALUES (new.id, new.title); END'
+            )
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _install_postgresql(connection, tables):
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table in tables:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_title_tsv_idx ON {table} "
+                f"USING gin (to_tsvector('simple', title))"
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {table}_title_trgm_idx ON {table} USING gin (title gin_trgm_ops)'
+            )
+
+
+def ensure_search_index(sender, using, **kwargs):
+    # post_migrate handler: repairs the search index after migrations that rebuilt
+    # the tables. Does nothing while migration 0004 is not applied.
+    connection = connections[using]
+    if SEARCH_MIGRATION not in MigrationRecorder(connection).applied_migrations():
+        return
+    try:
+        with transaction.atomic(using=using):
+            install_search_index(connection)
+    except DatabaseError:
+        # E.g. a PostgreSQL role without permission to create the pg_trgm extension;
+        # migration 0004 reports it, don't break unrelated migrate runs.
+        pass
+
+
+def search(queryset, term, ranked=True, scope=None):
+    """
+    Filters ``queryset`` (of ``Task`` or ``UserTask``) to rows whose title has
+    words starting with every word in ``term``. With ``ranked``, the rows are
+    annotated with ``search_rank`` and ordered by it, best match first.
+
+    ``scope`` is the workspace id (``Task``) or user id (``UserTask``) the
+    queryset is limited to; it is applied inside the index lookup so other
+    workspaces' matches are not read.
+    """
+    tokens = search_tokens(term)
+    if not tokens:
+        return queryset
+
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    table = queryset.model._meta.db_table
+    pk_column = quote(queryset.model._meta.pk.column)
+    pk = f'{quote(table)}.{pk_column}'
+    title = f'{quote(table)}.{quote("title")}'
+    scope_column = quote(SEARCH_SCOPES[table])
+
+    if connection.vendor == 'sqlite':
+        fts = fts_table(table)
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        if scope is None:
+            rowids = RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [match])
+        else:
+            # CROSS JOIN keeps the MATCH as the outer loop (run once) and each hit is
+            # checked by primary key; otherwise SQLite may rerun the MATCH per scoped row.
+            rowids = RawSQL(
+                f'SELECT {fts}.rowid FROM {fts} CROSS JOIN {quote(table)} AS scoped '
+                f'ON scoped.{pk_column} = {fts}.rowid WHERE {fts} MATCH %s AND scoped.{scope_column} = %s',
+                [match, scope]
+            )
+        queryset = queryset.filter(pk__in=rowids)
+        rank = RawSQL(f'SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND rowid = {pk}', [match],
+                      output_field=FloatField())
+    elif connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{token}:*' for token in tokens)
+        like = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        condition = f"(to_tsvector('simple', {title}) @@ to_tsquery('simple', %s) OR {title} ILIKE %s)"
+        params = [tsquery, like]
+        if scope is not None:
+            condition = f'({quote(table)}.{scope_column} = %s AND {condition})'
+            params = [scope, *params]
+        queryset = queryset.filter(RawSQL(condition, params, output_field=BooleanField()))
+        rank = RawSQL(f"ts_rank(to_tsvector('simple', {title}), to_tsquery('simple', %s))", [tsquery],
+                      output_field=FloatField())
+    else:
+        for token in tokens:
+            queryset = queryset.filter(title__icontains=token)
+        return queryset
+
+    if ranked:
+        queryset = queryset.annotate(search_rank=rank).order_by('-search_rank', '-pk')
+    return queryset
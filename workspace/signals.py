@@ -0,0 +1,106 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from workspace.membership import bump_version
+from workspace.models import Tag, Task, UserTag, UserTask, Workspace
+from workspace.versions import bump_user, bump_workspace
+
+
+# Keep the membership cache (see `workspace.membership`) in sync: any change to a
+# workspace's members, its admin, or its deletion bumps that workspace's version.
+
+@receiver(m2m_changed, sender=Workspace.members.through)
+def invalidate_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # `user.member_workspaces.clear()` does not report which workspaces changed;
+        # read them before they are gone. The bumps run once the clear commits.
+        for workspace_id in instance.member_workspaces.values_list('pk', flat=True):
+            bump_version(workspace_id)
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        bump_version(instance.pk)
+    elif pk_set:
+        for workspace_id in pk_set:
+            bump_version(workspace_id)
+
+
+@receiver(post_save, sender=Workspace)
+@receiver(post_delete, sender=Workspace)
+def invalidate_workspace(sender, instance, **kwargs):
+    bump_version(instance.pk)
+
+
+@receiver(pre_delete, sender=User)
+def touch_assigned_tasks(sender, instance, **kwargs):
+    # Deleting a user sets `assigned_to` to NULL with a plain UPDATE that does not
+    # touch `updated_at`; stamp the tasks so the sync endpoints report the change.
+    tasks = Task.objects.filter(assigned_to=instance)
+    for workspace_id in set(tasks.values_list('workspace_id', flat=True)):
+        bump_workspace(workspace_id)
+    tasks.update(updated_at=now())
+
+
+# Content versions behind the list ETags (see `workspace.versions`). Deleted tasks
+# bump theirs from Task.delete()/the task querysets' delete().
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def workspace_content_changed(sender, instance, **kwargs):
+    bump_workspace(instance.workspace_id)
+
+
+@receiver(m2m_changed, sender=Task.tags.through)
+def task_tags_changed(sender, instance, action, **kwargs):
+    # `instance` is the task, or the tag for `tag.tasks.*`; both belong to the workspace.
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_workspace(instance.workspace_id)
+
+
+@receiver(post_save, sender=UserTask)
+@receiver(post_save, sender=UserTag)
+@receiver(post_delete, sender=UserTag)
+def user_content_changed(sender, instance, **kwargs):
+    bump_user(instance.user_id)
+
+
+@receiver(m2m_changed, sender=UserTask.tags.through)
+def user_task_tags_changed(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_user(instance.user_id)
+
+
+@receiver(post_save, sender=Workspace)
+@receiver(pre_delete, sender=Workspace)
+def workspace_changed(sender, instance, **kwargs):
+    # The workspace shows up in the workspaces list of its admin and every member.
+    bump_workspace(instance.pk)
+    bump_user(instance.admin_id)
+    for user_id in instance.members.values_list('pk', flat=True):
+        bump_user(user_id)
+
+
+@receiver(m2m_changed, sender=Workspace.members.through)
+def members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # Every member sees the members list of the workspace, so all of them are bumped,
+    # including those being removed (they lose the workspace). `*_clear` reports no
+    # pk_set, so it is handled before the rows go away.
+    if action not in ('pre_clear', 'post_add', 'post_remove'):
+        return
+    through = Workspace.members.through
+    if reverse:
+        # `user.member_workspaces.*`: `instance` is the user, pk_set holds workspaces.
+        if action == 'pre_clear':
+            workspace_ids = through.objects.filter(user_id=instance.pk).values('workspace_id')
+        else:
+            workspace_ids = pk_set
+        user_ids = set(through.objects.filter(workspace_id__in=workspace_ids).values_list('user_id', flat=True))
+        user_ids.add(instance.pk)
+    else:
+        user_ids = set(instance.members.values_list('pk', flat=True)) | set(pk_set or ())
+    for user_id in user_ids:
+        bump_user(user_id)
@@ -0,0 +1,127 @@
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils.timezone import now
+
+from todo_api.db import delete_in_batches
+from workspace.models import TaskTombstone, UserTaskTombstone
+
+
+# Delta sync for task lists. A sync token is a signed (scope, time) pair: the time
+# the previous sync started. The next sync returns the tasks whose `updated_at`, and
+# the tombstones whose `deleted_at`, are later than that time minus
+# `SYNC_SAFETY_MARGIN_SECONDS`. The margin covers rows stamped before a slow
+# transaction committed; clients may see such a row twice and must apply changes
+# idempotently (upsert by id, delete by id).
+#
+# A sync returns at most SYNC_PAGE_SIZE changed tasks, in (updated_at, id) order. When
+# there are more, `has_more` is true and `sync_token` continues the same pass after the
+# last task sent. Deletions are listed on the first page of a pass. The token of the
+# last page counts from the time the pass started, so whatever changed while the
+# client was paging comes in the next sync.
+
+SALT = 'workspace.sync'
+
+# `since`: changes after this time (None: everything). `started_at`: when the pass
+# began, None on its first page. `after`: (updated_at, id) of the last task sent in
+# the pass.
+SyncState = namedtuple('SyncState', ['since', 'started_at', 'after'])
+
+
+class InvalidSyncToken(Exception):
+    pass
+
+
+class ExpiredSyncToken(Exception):
+    # Older than the tombstone retention: deletions may have been forgotten, so the
+    # client has to start again from a full sync.
+    pass
+
+
+def make_sync_token(scope, started_at):
+    return signing.dumps([scope, started_at.timestamp()], salt=SALT, compress=True)
+
+
+def _continue_token(scope, state, started_at, last_task):
+    since = state.since.isoformat() if state.since is not None else None
+    return signing.dumps(
+        [scope, since, started_at.isoformat(), last_task.updated_at.isoformat(), last_task.pk],
+        salt=SALT, compress=True,
+    )
+
+
+def next_sync_token(scope, state, started_at, last_task=None):
+    """
+    The ``sync_token`` of a response served at ``started_at``: the continuation
+    after ``last_task`` when there are more changes, else the token of the next pass.
+    """
+    started_at = state.started_at or started_at
+    if last_task is not None:
+        return _continue_token(scope, state, started_at, last_task)
+    return make_sync_token(scope, started_at)
+
+
+def read_sync_token(token, scope):
+    """
+    Returns the `SyncState` to serve (everything, for no token). Raises
+    ``InvalidSyncToken`` or ``ExpiredSyncToken``.
+    """
+    if not token:
+        return SyncState(None, None, None)
+    try:
+        token_scope, *values = signing.loads(token, salt=SALT)
+        if len(values) == 1:
+            since = datetime.fromtimestamp(values[0], tz=timezone.utc)
+            state = SyncState(since - timedelta(seconds=settings.SYNC_SAFETY_MARGIN_SECONDS), None, None)
+        else:
+            since, started_at, updated_at, pk = values
+            state = SyncState(
+                datetime.fromisoformat(since) if since is not None else None,
+                datetime.fromisoformat(started_at),
+                (datetime.fromisoformat(updated_at), int(pk)),
+            )
+    except (signing.BadSignature, TypeError, ValueError):
+        raise InvalidSyncToken()
+    if token_scope != scope:
+        raise InvalidSyncToken()
+
+    if state.since is not None and state.since < now() - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+        raise ExpiredSyncToken()
+    return state
+
+
+def changed_tasks(queryset, state):
+    # The tasks still to send in this pass, in the order pages are cut.
+    if state.since is not None:
+        queryset = queryset.filter(updated_at__gt=state.since)
+    if state.after is not None:
+        updated_at, pk = state.after
+        queryset = queryset.filter(updated_at__gte=updated_at).filter(
+            Q(updated_at__gt=updated_at) | Q(pk__gt=pk)
+        )
+    return queryset.order_by('updated_at', 'pk')[:settings.SYNC_PAGE_SIZE + 1]
+
+
+def split_page(tasks):
+    """Returns ``(page, last task if more follow, else None)``."""
+    if len(tasks) > settings.SYNC_PAGE_SIZE:
+        page = tasks[:settings.SYNC_PAGE_SIZE]
+        return page, page[-1]
+    return tasks, None
+
+
+def purge_tombstones(retention_days=None, batch_size=None):
+    # Run from the `purge_task_tombstones` command or the periodic job. Returns the
+    # number of tombstones purged.
+    if retention_days is None:
+        retention_days = settings.SYNC_TOMBSTONE_RETENTION_DAYS
+    if batch_size is None:
+        batch_size = settings.TASK_PURGE_BATCH_SIZE
+    cutoff = now() - timedelta(days=retention_days)
+    return sum(
+        delete_in_batches(model.objects.filter(deleted_at__lt=cutoff), batch_size)
+        for model in (TaskTombstone, UserTaskTombstone)
+    )
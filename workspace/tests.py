@@ -1,3 +1,1403 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import m2m_changed
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from django.utils.timezone import now
+
+from todo_api.compression import brotli, choose_encoding
+from workspace.jobs import purge_old_completed_tasks
+from workspace.membership import WorkspaceAccess, get_workspace_access
+from workspace.models import Workspace, Task, Tag, UserTag, UserTask, TaskTombstone, UserTaskTombstone
+from workspace.sync import purge_tombstones
+
+
+@override_settings(ACCESS_TOKEN_BLACKLIST_REFRESH_SECONDS=3600)
+class AuthenticatedWorkspaceTestCase(APITestCase):
+    """
+    Base class for endpoint tests: the client is authenticated as `owner`, the
+    admin of the workspace `Board`, and ``url`` is ``path`` under that workspace.
+    """
+    path = 'tasks/'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('owner', 'owner@example.com', 'password123')
+        self.client.force_authenticate(self.user)
+        self.workspace = Workspace.objects.create(title='Board', description='', admin=self.user)
+        self.url = f'/todo/workspaces/{self.workspace.id}/{self.path}'
+
+    def titles(self, url=None, **params):
+        # Titles of a task list in the order returned, paginated or not.
+        response = self.client.get(url or self.url, params)
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        return [task['title'] for task in results]
+
+    def post(self, data=None, url=None):
+        return self.client.post(url or self.url, data, format='json')
+
+
+class QueryCountTestCase(AuthenticatedWorkspaceTestCase):
+    """
+    Base class for tests asserting that an endpoint runs the same number of
+    queries whatever the number of rows it returns.
+    """
+
+    def count_queries(self, url):
+        # A first request warms the per-worker caches (blacklist, membership).
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+
+class TaskListQueryCountTests(QueryCountTestCase):
+
+    def setUp(self):
+        super().setUp()
+        tags = [Tag.objects.create(name=f'tag{i}', color='#FFFFFF', workspace=self.workspace) for i in range(3)]
+        for i in range(30):
+            task = Task.objects.create(title=f'Task {i}', workspace=self.workspace, assigned_to=self.user)
+            task.tags.set(tags)
+
+    def test_task_list_query_count_does_not_depend_on_page_size(self):
+        self.assertEqual(self.count_queries(f'{self.url}?limit=2'), self.count_queries(f'{self.url}?limit=30'))
+
+    def test_task_detail_query_count_does_not_depend_on_tag_count(self):
+        task = Task.objects.first()
+        url = f'/todo/workspace/tasks/{task.id}/'
+        with_three_tags = self.count_queries(url)
+        task.tags.clear()
+        self.assertEqual(self.count_queries(url), with_three_tags)
+
+
+class UserTaskListQueryCountTests(QueryCountTestCase):
+
+    def test_user_task_list_query_count_does_not_depend_on_task_count(self):
+        tags = [UserTag.objects.create(name=f'tag{i}', color='#FFFFFF', user=self.user) for i in range(3)]
+        UserTask.objects.create(title='First', user=self.user).tags.set(tags)
+        few = self.count_queries('/todo/user/tasks/')
+
+        for i in range(20):
+            UserTask.objects.create(title=f'Task {i}', user=self.user).tags.set(tags)
+        self.assertEqual(self.count_queries('/todo/user/tasks/'), few)
+
+
+class WorkspaceListQueryCountTests(QueryCountTestCase):
+
+    def test_workspace_list_query_count_does_not_depend_on_page_size(self):
+        members = [User.objects.create_user(f'member{i}', f'member{i}@example.com', 'password123') for i in range(5)]
+        for i in range(12):
+            workspace = Workspace.objects.create(title=f'Workspace {i}', description='', admin=self.user)
+            workspace.members.add(*members)
+
+        url = '/todo/workspaces/'
+        self.assertEqual(self.count_queries(f'{url}?limit=2'), self.count_queries(f'{url}?limit=12'))
+
+
+@override_settings(CACHE_IS_SHARED=True)
+class MembershipCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user('owner', 'owner@example.com', 'password123')
+        self.member = User.objects.create_user('member', 'member@example.com', 'password123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.workspace = Workspace.objects.create(title='Board', description='', admin=self.admin)
+            self.workspace.members.add(self.member)
+        self.workspace_id = self.workspace.pk
+
+    def access(self, user=None):
+        with CaptureQueriesContext(connection) as queries:
+            access = get_workspace_access(user or self.member, self.workspace_id)
+        return access, len(queries)
+
+    def test_allowed_access_is_cached(self):
+        self.assertEqual(self.access(), (WorkspaceAccess(False, True), 1))
+        self.assertEqual(self.access(), (WorkspaceAccess(False, True), 0))
+
+    def test_remove_revokes_cached_access(self):
+        self.access()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.workspace.members.remove(self.member)
+        self.assertEqual(self.access(), (WorkspaceAccess(False, False), 1))
+
+    def test_reverse_clear_revokes_cached_access(self):
+        self.access()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.member_workspaces.clear()
+        self.assertEqual(self.access(), (WorkspaceAccess(False, False), 1))
+
+    def test_add_grants_access(self):
+        other = User.objects.create_user('other', 'other@example.com', 'password123')
+        self.assertEqual(self.access(other), (WorkspaceAccess(False, False), 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.workspace.members.add(other)
+        self.assertEqual(self.access(other), (WorkspaceAccess(False, True), 1))
+        self.assertEqual(self.access(other), (WorkspaceAccess(False, True), 0))
+
+    def test_workspace_delete_revokes_cached_access(self):
+        self.access()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.workspace.delete()
+        self.assertEqual(self.access(), (None, 1))
+
+    def test_version_is_bumped_after_commit(self):
+        # Bumped before the commit, a concurrent request could cache the old
+        # membership under the new version.
+        self.access()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.workspace.members.remove(self.member)
+            self.assertEqual(self.access()[1], 0)
+        self.assertTrue(callbacks)
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_nothing_is_cached_with_a_process_local_cache(self):
+        self.assertEqual(self.access(), (WorkspaceAccess(False, True), 1))
+        self.assertEqual(self.access(), (WorkspaceAccess(False, True), 1))
+
+
+@override_settings(ACCESS_TOKEN_BLACKLIST_REFRESH_SECONDS=3600)
+class AsyncListViewTests(TestCase):
+    """The async list views, through the ASGI request handler and middleware chain."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('owner', 'owner@example.com', 'password123')
+        self.assignee = User.objects.create_user('member', 'member@example.com', 'password123')
+        self.workspace = Workspace.objects.create(title='Board', description='', admin=self.user)
+        self.workspace.members.add(self.assignee)
+        tag = Tag.objects.create(name='urgent', color='#FF0000', workspace=self.workspace)
+        for i in range(3):
+            task = Task.objects.create(title=f'Task {i}', workspace=self.workspace, assigned_to=self.assignee)
+            task.tags.add(tag)
+        UserTask.objects.create(title='Mine', user=self.user)
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    async def get(self, url, user=None):
+        headers = self.headers if user is None else {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        return await self.async_client.get(url, headers=headers)
+
+    async def test_task_list(self):
+        # Serializing the tags or assignee lazily would raise SynchronousOnlyOperation.
+        response = await self.get(f'/todo/workspaces/{self.workspace.id}/tasks/?limit=2')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(len(data['results']), 2)
+        self.assertEqual(data['results'][0]['assigned_to'], 'member')
+        self.assertEqual([tag['name'] for tag in data['results'][0]['tags_detail']], ['urgent'])
+        next_page = await self.async_client.get(data['next'], headers=self.headers)
+        self.assertEqual(len(next_page.json()['results']), 1)
+
+    async def test_task_list_access(self):
+        outsider = await User.objects.acreate(username='outsider', email='outsider@example.com')
+        self.assertEqual((await self.get(f'/todo/workspaces/{self.workspace.id}/tasks/', outsider)).status_code, 403)
+        self.assertEqual((await self.get('/todo/workspaces/0/tasks/')).status_code, 404)
+        response = await self.async_client.get(f'/todo/workspaces/{self.workspace.id}/tasks/')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_workspace_list(self):
+        response = await self.get('/todo/workspaces/', self.assignee)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([workspace['title'] for workspace in response.json()['results']], ['Board'])
+
+    async def test_user_task_list(self):
+        response = await self.get('/todo/user/tasks/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task['title'] for task in response.json()], ['Mine'])
+
+    @override_settings(WHITENOISE_USE_FINDERS=True, WHITENOISE_AUTOREFRESH=True)
+    async def test_static_files(self):
+        response = await self.async_client.get('/static/admin/css/base.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('text/css', response['Content-Type'])
+        response.close()
+
+    @override_settings(DEBUG=True)
+    def test_middleware_chain_stays_async(self):
+        # Django logs every handler it has to adapt between sync and async when DEBUG is on.
+        def adapted_handlers():
+            with mock.patch('django.core.handlers.base.logger') as logger:
+                ASGIHandler()
+            return [call.args[1] for call in logger.debug.call_args_list if 'adapted' in call.args[0]]
+
+        self.assertEqual(adapted_handlers(), [])
+        stock = [path.replace('todo_api.middleware.AsyncWhiteNoiseMiddleware', 'whitenoise.middleware.WhiteNoiseMiddleware')
+                 for path in settings.MIDDLEWARE]
+        with override_settings(MIDDLEWARE=stock):
+            self.assertEqual(adapted_handlers(), ['middleware whitenoise.middleware.WhiteNoiseMiddleware'])
+
+
+class ListQueryIndexTests(TestCase):
+    """
+    The list endpoints' access paths must be served by the composite indexes
+    declared in Task.Meta and UserTask.Meta (SQLite and PostgreSQL).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', 'owner@example.com', 'password123')
+        cls.workspace = Workspace.objects.create(title='Board', description='', admin=cls.user)
+
+    def assertUsesIndex(self, queryset, index_name):
+        if connection.vendor == 'postgresql':
+            # Tables are tiny in tests; make the planner show which index it would use.
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+        elif connection.vendor != 'sqlite':
+            self.skipTest(f'EXPLAIN checks are only written for SQLite and PostgreSQL, not {connection.vendor}.')
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+        # The ordering must come from the index too, not from a separate sort step.
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_status_filter_ordered_by_creation_date(self):
+        queryset = Task.objects.filter(workspace=self.workspace, status='pending').order_by('created_at')
+        self.assertUsesIndex(queryset, 'task_ws_status_created_idx')
+
+    def test_ordered_by_creation_date(self):
+        queryset = Task.objects.filter(workspace=self.workspace).order_by('-created_at')
+        self.assertUsesIndex(queryset, 'task_ws_created_idx')
+
+    def test_assigned_to_filter(self):
+        queryset = Task.objects.filter(workspace=self.workspace, assigned_to=self.user)
+        self.assertUsesIndex(queryset, 'task_ws_assigned_idx')
+
+    def test_ordered_by_title(self):
+        # The unique constraint's index; SQLite names it after the table.
+        queryset = Task.objects.filter(workspace=self.workspace).order_by('title')
+        index_name = 'sqlite_autoindex_workspace_task_1' if connection.vendor == 'sqlite' else 'task_ws_title_uniq'
+        self.assertUsesIndex(queryset, index_name)
+
+    def test_created_range(self):
+        queryset = Task.objects.filter(workspace=self.workspace, created_at__gte=now(), created_at__lt=now())
+        self.assertUsesIndex(queryset, 'task_ws_created_idx')
+
+    def test_completed_range(self):
+        queryset = Task.objects.filter(workspace=self.workspace, final_at__gte=now(), final_at__lt=now())
+        self.assertUsesIndex(queryset, 'task_ws_final_idx')
+
+    def test_completed_task_purge(self):
+        queryset = Task.objects.filter(status='completed', final_at__lte=now())
+        self.assertUsesIndex(queryset, 'task_status_final_idx')
+
+    def test_user_task_status_filter_ordered_by_creation_date(self):
+        queryset = UserTask.objects.filter(user=self.user, status='pending').order_by('created_at')
+        self.assertUsesIndex(queryset, 'usertask_user_status_idx')
+
+    def test_user_task_ordered_by_creation_date(self):
+        queryset = UserTask.objects.filter(user=self.user).order_by('created_at')
+        self.assertUsesIndex(queryset, 'usertask_user_created_idx')
+
+    def test_user_task_completed_range(self):
+        queryset = UserTask.objects.filter(user=self.user, final_at__gte=now(), final_at__lt=now())
+        self.assertUsesIndex(queryset, 'usertask_user_final_idx')
+
+
+class TagFilterTests(QueryCountTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.red, self.green, self.blue = [
+            Tag.objects.create(name=name, color='#FFFFFF', workspace=self.workspace) for name in ('red', 'green', 'blue')
+        ]
+        Task.objects.create(title='Red and green', workspace=self.workspace).tags.set([self.red, self.green])
+        Task.objects.create(title='Red', workspace=self.workspace).tags.set([self.red])
+        Task.objects.create(title='Untagged', workspace=self.workspace)
+
+    def test_any_mode_returns_each_task_once(self):
+        titles = self.titles(tags=f'{self.red.id},{self.green.id}')
+        self.assertCountEqual(titles, ['Red', 'Red and green'])
+        response = self.client.get(self.url, {'tags': f'{self.red.id},{self.green.id}'})
+        self.assertEqual(response.data['count'], 2)
+
+    def test_all_mode(self):
+        ids = f'{self.red.id},{self.green.id}'
+        self.assertEqual(self.titles(tags=ids, tags_mode='all'), ['Red and green'])
+        self.assertEqual(self.titles(tags=f'{ids},{self.blue.id}', tags_mode='all'), [])
+
+    def test_rejects_non_integer_ids(self):
+        for value in (f'{self.red.id}.5', 'red', f'{self.red.id},x'):
+            self.assertEqual(self.client.get(self.url, {'tags': value}).status_code, 400)
+            self.assertEqual(self.client.get('/todo/user/tasks/', {'tags': value}).status_code, 400)
+        self.assertCountEqual(self.titles(tags=f'{self.red.id},', tags_mode='all'), ['Red', 'Red and green'])
+
+    def test_tag_name_filter_returns_each_task_once(self):
+        self.assertCountEqual(self.titles(tags__name='red'), ['Red', 'Red and green'])
+
+    def test_query_count_does_not_depend_on_the_number_of_tags(self):
+        Task.objects.get(title='Red and green').tags.add(self.blue)
+        one = self.count_queries(f'{self.url}?tags={self.red.id}&tags_mode=all')
+        three = self.count_queries(f'{self.url}?tags={self.red.id},{self.green.id},{self.blue.id}&tags_mode=all')
+        self.assertEqual(one, three)
+        self.assertEqual(self.count_queries(f'{self.url}?tags={self.red.id},{self.green.id}'), one)
+
+    def test_user_task_tags(self):
+        home, work = [UserTag.objects.create(name=name, color='#FFFFFF', user=self.user) for name in ('home', 'work')]
+        UserTask.objects.create(title='Both', user=self.user).tags.set([home, work])
+        UserTask.objects.create(title='Home', user=self.user).tags.set([home])
+
+        url = '/todo/user/tasks/'
+        self.assertCountEqual(self.titles(url, tags=f'{home.id},{work.id}'), ['Both', 'Home'])
+        self.assertEqual(self.titles(url, tags=f'{home.id},{work.id}', tags_mode='all'), ['Both'])
+
+
+class DateRangeFilterTests(AuthenticatedWorkspaceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for day in (1, 2, 3):
+            task = Task.objects.create(title=f'Day {day}', workspace=self.workspace)
+            user_task = UserTask.objects.create(title=f'Day {day}', user=self.user)
+            moment = datetime(2026, 1, day, 12, tzinfo=timezone.utc)
+            Task.objects.filter(pk=task.pk).update(created_at=moment, final_at=moment + timedelta(days=1))
+            UserTask.objects.filter(pk=user_task.pk).update(created_at=moment, final_at=moment + timedelta(days=1))
+
+    def test_task_created_range(self):
+        titles = self.titles(created_after='2026-01-02', created_before='2026-01-03T12:00:00Z')
+        self.assertEqual(titles, ['Day 2'])
+
+    def test_task_completed_range(self):
+        self.assertCountEqual(self.titles(completed_after='2026-01-03T12:00:00Z'), ['Day 2', 'Day 3'])
+
+    def test_user_task_ranges(self):
+        url = '/todo/user/tasks/'
+        self.assertEqual(self.titles(url, created_before='2026-01-02'), ['Day 1'])
+        self.assertEqual(self.titles(url, completed_after='2026-01-04', completed_before='2026-01-05'), ['Day 3'])
+
+    def test_invalid_date_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'created_after': 'yesterday'}).status_code, 400)
+
+
+class TitleSearchTests(AuthenticatedWorkspaceTestCase):
+
+    def search(self, term, url=None, **params):
+        return self.titles(url, search=term, **params)
+
+    def test_matches_word_prefixes(self):
+        Task.objects.create(title='Deploy release', workspace=self.workspace)
+        Task.objects.create(title='Release notes', workspace=self.workspace)
+        Task.objects.create(title='Write docs', workspace=self.workspace)
+
+        self.assertCountEqual(self.search('rel'), ['Deploy release', 'Release notes'])
+        self.assertEqual(self.search('rel not'), ['Release notes'])
+        self.assertEqual(self.search('missing'), [])
+
+    def test_ranks_best_matches_first_unless_ordering_is_given(self):
+        Task.objects.create(title='Bug triage meeting with the team', workspace=self.workspace)
+        Task.objects.create(title='Bug bug bug', workspace=self.workspace)
+
+        self.assertEqual(self.search('bug')[0], 'Bug bug bug')
+        self.assertEqual(self.search('bug', ordering='-title'), ['Bug triage meeting with the team', 'Bug bug bug'])
+
+    def test_index_follows_updates_deletes_and_bulk_writes(self):
+        task = Task.objects.create(title='Old name', workspace=self.workspace)
+        Task.objects.bulk_create([Task(title=f'Bulk {i}', workspace=self.workspace) for i in range(3)])
+        self.assertEqual(len(self.search('bulk')), 3)
+
+        Task.objects.filter(pk=task.pk).update(title='New name')
+        self.assertEqual(self.search('old'), [])
+        self.assertEqual(self.search('new'), ['New name'])
+
+        Task.objects.filter(title__startswith='Bulk').delete()
+        self.assertEqual(self.search('bulk'), [])
+
+    def test_is_scoped_to_the_workspace(self):
+        other = Workspace.objects.create(title='Other', description='', admin=self.user)
+        Task.objects.create(title='Shared word', workspace=other)
+        self.assertEqual(self.search('shared'), [])
+
+    def test_index_lookup_is_scoped_to_the_workspace(self):
+        others = Workspace.objects.bulk_create([Workspace(title=f'Other {i}', description='', admin=self.user)
+                                                for i in range(30)])
+        Task.objects.bulk_create([Task(title=f'Report {i}', workspace=other) for other in others for i in range(5)])
+        Task.objects.create(title='Report', workspace=self.workspace)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.search('rep'), ['Report'])
+        sql = next(q['sql'] for q in queries if 'search_rank' in q['sql'])
+        if connection.vendor == 'sqlite':
+            # The MATCH runs once and each hit is checked against the workspace by primary key.
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = '\n'.join(row[-1] for row in cursor.fetchall())
+            self.assertIn('SEARCH scoped USING INTEGER PRIMARY KEY', plan)
+            self.assertIn(f'scoped."workspace_id" = {self.workspace.id}', sql)
+        elif connection.vendor == 'postgresql':
+            self.assertIn(f'"workspace_task"."workspace_id" = {self.workspace.id} AND (to_tsvector', sql)
+
+    def test_user_task_search(self):
+        UserTask.objects.create(title='Buy groceries', user=self.user)
+        UserTask.objects.create(title='Read a book', user=self.user)
+        other = User.objects.create_user('other', 'other@example.com', 'password123')
+        UserTask.objects.create(title='Buy a bike', user=other)
+
+        self.assertEqual(self.search('buy', url='/todo/user/tasks/'), ['Buy groceries'])
+
+
+class KeysetPaginationTests(AuthenticatedWorkspaceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        base = now() - timedelta(days=1)
+        for i in range(23):
+            task = Task.objects.create(title=f'Task {i:02d}', workspace=self.workspace)
+            # Five creation times shared by several tasks each, in an order unrelated to the titles.
+            Task.objects.filter(pk=task.pk).update(created_at=base + timedelta(minutes=i * 3 % 5))
+
+    def traverse(self, url, limit=4):
+        ids, pages = [], 0
+        while url is not None:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            self.assertLessEqual(len(response.data['results']), limit)
+            ids += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+            pages += 1
+        return ids, pages
+
+    def expected(self, queryset, ordering):
+        field = ordering.lstrip('-')
+        rows = sorted(queryset.values_list(field, 'pk'), reverse=ordering.startswith('-'))
+        return [pk for _, pk in rows]
+
+    def test_every_ordering_returns_each_task_once(self):
+        tasks = Task.objects.filter(workspace=self.workspace)
+        for ordering in ('', 'created_at', '-created_at', 'title', '-title'):
+            with self.subTest(ordering=ordering):
+                ids, pages = self.traverse(f'{self.url}?cursor=&limit=4&ordering={ordering}')
+                self.assertEqual(ids, self.expected(tasks, ordering or '-created_at'))
+                self.assertEqual(pages, 6)
+
+    def test_workspace_and_tag_orderings(self):
+        for i in range(5):
+            Workspace.objects.create(title=f'Workspace {i}', description='', admin=self.user)
+            Tag.objects.create(name=f'tag{i}', color='#FFFFFF', workspace=self.workspace)
+        workspaces = Workspace.objects.filter(admin=self.user)
+        for ordering in ('title', '-title'):
+            with self.subTest(ordering=ordering):
+                ids, _ = self.traverse(f'/todo/workspaces/?cursor=&limit=2&ordering={ordering}', limit=2)
+                self.assertEqual(ids, self.expected(workspaces, ordering))
+        tags = Tag.objects.filter(workspace=self.workspace)
+        for ordering in ('name', '-name'):
+            with self.subTest(ordering=ordering):
+                ids, _ = self.traverse(f'/todo/workspaces/{self.workspace.id}/tags/?cursor=&limit=2&ordering={ordering}',
+                                       limit=2)
+                self.assertEqual(ids, self.expected(tags, ordering))
+
+    def test_rows_inserted_between_pages_do_not_shift_them(self):
+        tasks = Task.objects.filter(workspace=self.workspace)
+        expected = self.expected(tasks, '-created_at')
+        first = self.client.get(f'{self.url}?cursor=&limit=4').data
+        # One task sorts before the first page, one after the last page, one between the two.
+        newest = Task.objects.create(title='Newest', workspace=self.workspace)
+        oldest = Task.objects.create(title='Oldest', workspace=self.workspace)
+        Task.objects.filter(pk=oldest.pk).update(created_at=now() - timedelta(days=2))
+        middle = Task.objects.create(title='Middle', workspace=self.workspace)
+        tie = tasks.get(pk=expected[10])
+        Task.objects.filter(pk=middle.pk).update(created_at=tie.created_at)
+
+        ids, _ = self.traverse(first['next'])
+        ids = [row['id'] for row in first['results']] + ids
+        self.assertNotIn(newest.pk, ids)
+        self.assertEqual(ids[-1], oldest.pk)
+        self.assertEqual(ids, self.expected(tasks.exclude(pk=newest.pk), '-created_at'))
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_tampered_cursor(self):
+        next_url = self.client.get(f'{self.url}?cursor=&limit=4').data['next']
+        cursor = next_url.split('cursor=')[1].split('&')[0]
+        tampered = cursor[:-1] + ('A' if cursor[-1] != 'A' else 'B')
+        for value in (tampered, 'not-a-cursor'):
+            with self.subTest(cursor=value):
+                response = self.client.get(f'{self.url}?cursor={value}&limit=4')
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(str(response.data['detail']), 'Invalid cursor')
+
+    def test_cursor_reused_with_another_ordering(self):
+        next_url = self.client.get(f'{self.url}?cursor=&limit=4&ordering=title').data['next']
+        for ordering in ('-title', 'created_at'):
+            with self.subTest(ordering=ordering):
+                response = self.client.get(next_url.replace('ordering=title', f'ordering={ordering}'))
+                self.assertEqual(response.status_code, 404)
+
+
+class CountModeTests(AuthenticatedWorkspaceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        Task.objects.bulk_create([Task(title=f'Task {i:04d}', workspace=self.workspace) for i in range(1001)])
+        Tag.objects.bulk_create([Tag(name=f'tag{i}', color='#FFFFFF', workspace=self.workspace) for i in range(25)])
+        self.tasks_url = self.url
+        self.tags_url = f'/todo/workspaces/{self.workspace.id}/tags/'
+
+    def page(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def count_queries_run(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            self.page(url, **params)
+        return [q['sql'] for q in queries if 'COUNT(' in q['sql']]
+
+    def test_modes(self):
+        # Both the async task list and the sync tag list.
+        for url, total in ((self.tasks_url, '1000+'), (self.tags_url, 25)):
+            with self.subTest(url=url):
+                self.assertEqual(self.page(url, limit=10)['count'], 1001 if total == '1000+' else total)
+                self.assertIsNone(self.page(url, limit=10, count='none')['count'])
+                self.assertEqual(self.page(url, limit=10, count='capped')['count'], total)
+                # No planner estimate on SQLite: the capped count instead.
+                self.assertEqual(self.page(url, limit=10, count='estimate')['count'], total)
+                self.assertEqual(self.page(url, limit=10, count='bogus')['count'], 1001 if total == '1000+' else total)
+
+    def test_none_runs_no_count_query(self):
+        self.page(self.tasks_url, limit=10, count='none')
+        self.assertEqual(self.count_queries_run(self.tasks_url, limit=10, count='none'), [])
+        self.assertEqual(len(self.count_queries_run(self.tasks_url, limit=10, count='capped')), 1)
+
+    def test_last_page_has_the_exact_count(self):
+        for mode in ('none', 'capped', 'estimate'):
+            with self.subTest(mode=mode):
+                data = self.page(self.tags_url, limit=10, offset=20, count=mode)
+                self.assertEqual(data['count'], 25)
+                self.assertEqual(len(data['results']), 5)
+                self.assertIsNone(data['next'])
+                self.assertEqual(self.count_queries_run(self.tags_url, limit=10, offset=20, count=mode), [])
+                # A page that ends exactly on the last row is the last one too.
+                data = self.page(self.tags_url, limit=5, offset=20, count=mode)
+                self.assertEqual((data['count'], data['next']), (25, None))
+
+    def test_next_links(self):
+        for mode in ('none', 'capped', 'estimate'):
+            with self.subTest(mode=mode):
+                url = self.tasks_url
+                seen = 0
+                params = {'limit': 400, 'count': mode}
+                while True:
+                    data = self.client.get(url, params).data
+                    seen += len(data['results'])
+                    if data['next'] is None:
+                        break
+                    self.assertIn(f'count={mode}', data['next'])
+                    url, params = data['next'], {}
+                self.assertEqual(seen, 1001)
+                self.assertEqual(data['count'], 1001)
+
+    def test_offset_past_the_end(self):
+        for mode in ('exact', 'none', 'capped', 'estimate'):
+            with self.subTest(mode=mode):
+                data = self.page(self.tags_url, limit=10, offset=100, count=mode)
+                self.assertEqual(data['results'], [])
+                self.assertIsNone(data['next'])
+                # Only `none` leaves the total unknown when the page is empty.
+                self.assertEqual(data['count'], None if mode == 'none' else 25)
+
+
+class WorkspaceAccessTests(QueryCountTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.member = User.objects.create_user('member', 'member@example.com', 'password123')
+        self.outsider = User.objects.create_user('outsider', 'outsider@example.com', 'password123')
+        self.workspace.members.add(self.member)
+        self.task = Task.objects.create(title='Task', workspace=self.workspace)
+
+    def test_with_access_annotations(self):
+        for user, expected in ((self.user, (True, True)), (self.member, (False, True)), (self.outsider, (False, False))):
+            with self.subTest(user=user.username):
+                workspace = Workspace.objects.with_access(user).get(pk=self.workspace.pk)
+                task = Task.objects.with_access(user).get(pk=self.task.pk)
+                self.assertEqual((workspace.is_admin, workspace.is_member), expected)
+                self.assertEqual((task.is_admin, task.is_member), expected)
+                self.assertEqual(workspace.has_access(user), expected[1])
+                self.assertEqual(task.has_access(user), expected[1])
+                # Without the annotations the checks fall back to a query.
+                self.assertEqual(Workspace.objects.get(pk=self.workspace.pk).has_access(user), expected[1])
+                self.assertEqual(Task.objects.get(pk=self.task.pk).can_edit(user), expected[1])
+
+    def test_forbidden_and_not_found(self):
+        # The detail views do not tell outsiders that the workspace or task exists.
+        requests = [
+            ('get', '/todo/workspaces/{}/', self.workspace.pk, 404),
+            ('get', '/todo/workspace/tasks/{}/', self.task.pk, 404),
+            ('get', '/todo/workspaces/{}/tasks/', self.workspace.pk, 403),
+            ('get', '/todo/workspaces/{}/tags/', self.workspace.pk, 403),
+            ('post', '/todo/workspaces/{}/tasks/', self.workspace.pk, 403),
+            ('post', '/todo/workspaces/{}/tags/', self.workspace.pk, 403),
+        ]
+        data = {'title': 'New', 'name': 'new', 'color': '#FFFFFF'}
+        for method, url, pk, outsider_status in requests:
+            with self.subTest(method=method, url=url):
+                self.client.force_authenticate(self.outsider)
+                response = getattr(self.client, method)(url.format(pk), data, format='json')
+                self.assertEqual(response.status_code, outsider_status)
+                response = getattr(self.client, method)(url.format(0), data, format='json')
+                self.assertEqual(response.status_code, 404)
+                self.client.force_authenticate(self.member)
+                response = getattr(self.client, method)(url.format(pk), data, format='json')
+                self.assertIn(response.status_code, (200, 201))
+
+    def test_access_check_does_not_depend_on_member_count(self):
+        self.client.force_authenticate(self.member)
+        url = f'/todo/workspace/tasks/{self.task.pk}/'
+        queries = self.count_queries(url)
+        User.objects.bulk_create([User(username=f'user{i}', email=f'user{i}@example.com') for i in range(20)])
+        self.workspace.members.add(*User.objects.filter(username__startswith='user'))
+        self.assertEqual(self.count_queries(url), queries)
+
+
+class CompletedTaskPurgeTests(TestCase):
+
+    def setUp(self):
+        admin = User.objects.create_user('owner', 'owner@example.com', 'password123')
+        self.workspace = Workspace.objects.create(title='Board', description='', admin=admin)
+
+    def create(self, title, task_status, days_ago):
+        task = Task.objects.create(title=title, workspace=self.workspace, status=task_status)
+        final_at = now() - timedelta(days=days_ago) if days_ago is not None else None
+        Task.objects.filter(pk=task.pk).update(final_at=final_at)
+        return task
+
+    def test_only_old_completed_tasks_in_batches(self):
+        old = [self.create(f'Old {i}', 'completed', 40).pk for i in range(5)]
+        kept = [
+            self.create('Recent', 'completed', 1).pk,
+            self.create('Pending', 'pending', 40).pk,
+            self.create('In progress', 'in_progress', None).pk,
+        ]
+        out = io.StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('purge_completed_tasks', retention_days=30, batch_size=2, stdout=out)
+        self.assertIn('Purged 5 completed tasks', out.getvalue())
+        deletes = [q['sql'] for q in queries if q['sql'].startswith('DELETE FROM "workspace_task"')]
+        self.assertEqual(len(deletes), 3)
+        self.assertEqual(sorted(Task.objects.values_list('pk', flat=True)), sorted(kept))
+        # The sync endpoints still learn about the purged tasks.
+        self.assertEqual(sorted(TaskTombstone.objects.values_list('task_id', flat=True)), sorted(old))
+
+    @override_settings(COMPLETED_TASK_RETENTION_DAYS=30, TASK_PURGE_BATCH_SIZE=2)
+    def test_periodic_job_uses_the_settings(self):
+        self.create('Old', 'completed', 31)
+        self.create('Recent', 'completed', 29)
+        self.assertEqual(purge_old_completed_tasks(), 1)
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['Recent'])
+
+
+class TaskBulkCreateTests(AuthenticatedWorkspaceTestCase):
+    path = 'tasks/bulk/'
+
+    def setUp(self):
+        super().setUp()
+        self.tags = [Tag.objects.create(name=f'tag{i}', color='#FFFFFF', workspace=self.workspace) for i in range(2)]
+
+    def test_creates_tasks_with_tags_and_reports_invalid_items(self):
+        Task.objects.create(title='Existing', workspace=self.workspace)
+        foreign_tag = Tag.objects.create(
+            name='other', color='#FFFFFF',
+            workspace=Workspace.objects.create(title='Other', description='', admin=self.user),
+        )
+        response = self.post([
+            {'title': 'First', 'tags': [tag.id for tag in self.tags]},
+            {'title': 'Existing'},
+            {'title': 'Second', 'status': 'in_progress'},
+            {'title': 'Second'},
+            {'title': 'Bad tag', 'tags': [foreign_tag.id]},
+            {'status': 'pending'},
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([task['title'] for task in response.data['created']], ['First', 'Second'])
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 3, 4, 5])
+        first = Task.objects.get(workspace=self.workspace, title='First')
+        self.assertCountEqual(first.tags.all(), self.tags)
+        self.assertEqual(Task.objects.get(workspace=self.workspace, title='Second').status, 'in_progress')
+
+    def test_nothing_created_is_a_bad_request(self):
+        self.assertEqual(self.post([{'status': 'pending'}]).status_code, 400)
+        self.assertEqual(self.post({'title': 'Not a list'}).status_code, 400)
+
+    def test_query_count_does_not_depend_on_batch_size(self):
+        def create(titles):
+            items = [{'title': title, 'tags': [tag.id for tag in self.tags]} for title in titles]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post(items)
+            self.assertEqual(response.status_code, 201)
+            return len(queries)
+
+        create(['Warm-up'])
+        self.assertEqual(create(['One']), create([f'Task {i}' for i in range(50)]))
+
+    def test_requires_workspace_access(self):
+        outsider = User.objects.create_user('outsider', 'outsider@example.com', 'password123')
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.post([{'title': 'Nope'}]).status_code, 403)
+
+
+class BulkStatusTests(AuthenticatedWorkspaceTestCase):
+    path = 'tasks/bulk/status/'
+
+    def setUp(self):
+        super().setUp()
+        self.member = User.objects.create_user('member', 'member@example.com', 'password123')
+        self.workspace.members.add(self.member)
+        self.mine = Task.objects.create(title='Mine', workspace=self.workspace, assigned_to=self.member)
+        self.other = Task.objects.create(title='Other', workspace=self.workspace)
+        self.done = Task.objects.create(title='Done', workspace=self.workspace, status='completed')
+
+    def set_status(self, ids, new_status, url=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post({'ids': ids, 'status': new_status}, url=url)
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(queries)
+
+    def test_admin_completes_every_open_task(self):
+        foreign = Task.objects.create(
+            title='Foreign', workspace=Workspace.objects.create(title='Other', description='', admin=self.member)
+        )
+        ids = [self.mine.id, self.other.id, self.done.id, foreign.id]
+        data, _ = self.set_status(ids, 'completed')
+
+        self.assertEqual(data, {'updated': sorted([self.mine.id, self.other.id]),
+                                'skipped': sorted([self.done.id, foreign.id])})
+        self.mine.refresh_from_db()
+        self.assertEqual(self.mine.status, 'completed')
+        self.assertIsNotNone(self.mine.final_at)
+        self.assertEqual(Task.objects.get(pk=foreign.pk).status, 'pending')
+
+    def test_member_only_completes_assigned_tasks(self):
+        self.client.force_authenticate(self.member)
+        data, _ = self.set_status([self.mine.id, self.other.id], 'completed')
+        self.assertEqual(data['updated'], [self.mine.id])
+
+        data, _ = self.set_status([self.other.id], 'in_progress')
+        self.assertEqual(data['updated'], [self.other.id])
+
+    def test_query_count_does_not_depend_on_the_number_of_tasks(self):
+        self.set_status([self.done.id], 'completed')
+        _, one = self.set_status([self.mine.id], 'in_progress')
+        many = [Task.objects.create(title=f'Task {i}', workspace=self.workspace).id for i in range(40)]
+        _, forty = self.set_status(many, 'in_progress')
+        self.assertEqual(one, forty)
+
+    def test_user_tasks(self):
+        own = UserTask.objects.create(title='Own', user=self.user)
+        theirs = UserTask.objects.create(title='Theirs', user=self.member)
+        data, _ = self.set_status([own.id, theirs.id], 'completed', url='/todo/user/tasks/bulk/status/')
+        self.assertEqual(data, {'updated': [own.id], 'skipped': [theirs.id]})
+        self.assertEqual(UserTask.objects.get(pk=theirs.pk).status, 'pending')
+
+
+class ConditionalUpdateTests(AuthenticatedWorkspaceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.member = User.objects.create_user('member', 'member@example.com', 'password123')
+        self.workspace.members.add(self.member)
+        self.task = Task.objects.create(title='Task', workspace=self.workspace)
+
+    def post_counting_writes(self, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(data or {}, url=url)
+        writes = [q for q in queries if q['sql'].startswith(('UPDATE', 'INSERT', 'DELETE'))]
+        return response, len(writes)
+
+    def test_complete_task_once(self):
+        url = f'/todo/workspace/tasks/{self.task.id}/complete/'
+        response, writes = self.post_counting_writes(url)
+        self.assertEqual((response.status_code, writes), (200, 1))
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'completed')
+        self.assertIsNotNone(self.task.final_at)
+
+        response, writes = self.post_counting_writes(url)
+        self.assertEqual((response.status_code, writes), (400, 1))
+
+    def test_complete_task_errors(self):
+        self.assertEqual(self.post(url='/todo/workspace/tasks/0/complete/').status_code, 404)
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.post(url=f'/todo/workspace/tasks/{self.task.id}/complete/').status_code, 403)
+        Task.objects.filter(pk=self.task.pk).update(assigned_to=self.member)
+        self.assertEqual(self.post(url=f'/todo/workspace/tasks/{self.task.id}/complete/').status_code, 200)
+
+    def test_complete_user_task(self):
+        task = UserTask.objects.create(title='Mine', user=self.user)
+        url = f'/todo/user/tasks/{task.id}/complete/'
+        self.assertEqual(self.post(url=url).status_code, 200)
+        self.assertEqual(self.post(url=url).status_code, 400)
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.post(url=url).status_code, 403)
+        self.assertEqual(self.post(url='/todo/user/tasks/0/complete/').status_code, 404)
+
+    def test_add_user_to_task(self):
+        url = f'/todo/workspace/tasks/{self.task.id}/add-user/'
+        response, writes = self.post_counting_writes(url, {'username': 'member'})
+        self.assertEqual((response.status_code, writes), (200, 1))
+        self.assertEqual(Task.objects.get(pk=self.task.pk).assigned_to, self.member)
+
+        User.objects.create_user('stranger', 'stranger@example.com', 'password123')
+        self.assertEqual(self.post({'username': 'stranger'}, url=url).status_code, 400)
+        self.assertEqual(self.post({'username': 'ghost'}, url=url).status_code, 404)
+        self.assertEqual(self.post(url=url).status_code, 400)
+        self.assertEqual(self.post({'username': 'member'}, url='/todo/workspace/tasks/0/add-user/').status_code, 404)
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.post({'username': 'member'}, url=url).status_code, 403)
+
+
+class UniqueConstraintTests(AuthenticatedWorkspaceTestCase):
+
+    def post_capturing_queries(self, url, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post(data, url=url)
+        return response, [q['sql'] for q in queries]
+
+    def test_duplicate_workspace_title(self):
+        data = {'title': 'Team', 'description': 'Team board'}
+        response, queries = self.post_capturing_queries('/todo/workspaces/', data)
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse([sql for sql in queries if '"workspace_workspace"."title" =' in sql])
+
+        response, _ = self.post_capturing_queries('/todo/workspaces/', data)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"error": "A workspace with this title already exists."})
+        self.assertEqual(Workspace.objects.filter(title='Team').count(), 1)
+
+    def test_duplicate_task_tag_and_user_task(self):
+        cases = [
+            (self.url, {'title': 'Task'}, "A task with this title already exists in this workspace."),
+            (f'/todo/workspaces/{self.workspace.id}/tags/', {'name': 'Tag', 'color': '#FFFFFF'},
+             "A tag with this name already exists in this workspace."),
+            ('/todo/user/tasks/', {'title': 'Task'}, "A task with this name already exists."),
+            ('/todo/user/tags/', {'name': 'Tag', 'color': '#FFFFFF'}, "A tag with this name already exists."),
+        ]
+        for url, data, error in cases:
+            with self.subTest(url=url):
+                self.assertEqual(self.post(data, url=url).status_code, 201)
+                response = self.post(data, url=url)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data, {"error": error})
+
+    def test_renaming_a_task_to_a_taken_title(self):
+        Task.objects.create(title='First', workspace=self.workspace)
+        second = Task.objects.create(title='Second', workspace=self.workspace)
+        response = self.client.put(f'/todo/workspace/tasks/{second.id}/', {'title': 'First'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Task.objects.get(pk=second.pk).title, 'Second')
+
+
+class TaskSyncTests(AuthenticatedWorkspaceTestCase):
+    path = 'tasks/sync/'
+
+    def sync(self, url, token=None):
+        response = self.client.get(url, {'since': token} if token else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def age(self, seconds):
+        # Moves every row and tombstone back in time, past the safety margin.
+        past = now() - timedelta(seconds=seconds)
+        for model in (Task, UserTask):
+            model.objects.update(updated_at=past)
+        for model in (TaskTombstone, UserTaskTombstone):
+            model.objects.update(deleted_at=past)
+
+    @override_settings(SYNC_SAFETY_MARGIN_SECONDS=0)
+    def test_returns_only_changes_and_deletions(self):
+        kept = Task.objects.create(title='Kept', workspace=self.workspace)
+        edited = Task.objects.create(title='Edited', workspace=self.workspace)
+        removed = Task.objects.create(title='Removed', workspace=self.workspace)
+        purged = Task.objects.create(title='Purged', workspace=self.workspace)
+
+        first = self.sync(self.url)
+        self.assertEqual(len(first['changed']), 4)
+        self.assertEqual(first['deleted'], [])
+
+        self.age(60)
+        self.assertEqual(self.sync(self.url, first['sync_token'])['changed'], [])
+
+        self.client.put(f'/todo/workspace/tasks/{edited.id}/', {'title': 'Edited again'}, format='json')
+        self.client.post(f'/todo/workspace/tasks/{kept.id}/complete/')
+        self.client.delete(f'/todo/workspace/tasks/{removed.id}/')
+        Task.objects.filter(pk=purged.pk).delete()
+
+        second = self.sync(self.url, first['sync_token'])
+        self.assertCountEqual([task['title'] for task in second['changed']], ['Edited again', 'Kept'])
+        self.assertCountEqual(second['deleted'], [removed.id, purged.id])
+
+    def test_rejects_foreign_and_expired_tokens(self):
+        other = Workspace.objects.create(title='Other', description='', admin=self.user)
+        token = self.sync(f'/todo/workspaces/{other.id}/tasks/sync/')['sync_token']
+        self.assertEqual(self.client.get(self.url, {'since': token}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': 'garbage'}).status_code, 400)
+
+        with override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=0):
+            token = self.sync(self.url)['sync_token']
+            self.assertEqual(self.client.get(self.url, {'since': token}).status_code, 410)
+
+    @override_settings(SYNC_SAFETY_MARGIN_SECONDS=0)
+    def test_user_tasks(self):
+        url = '/todo/user/tasks/sync/'
+        task = UserTask.objects.create(title='Mine', user=self.user)
+        gone = UserTask.objects.create(title='Gone', user=self.user)
+        token = self.sync(url)['sync_token']
+        self.age(60)
+
+        self.client.post(f'/todo/user/tasks/{task.id}/complete/')
+        self.client.delete(f'/todo/user/tasks/{gone.id}/delete/')
+        data = self.sync(url, token)
+        self.assertEqual([t['title'] for t in data['changed']], ['Mine'])
+        self.assertEqual(data['deleted'], [gone.id])
+
+    @override_settings(SYNC_PAGE_SIZE=2, SYNC_SAFETY_MARGIN_SECONDS=0)
+    def test_changes_are_paged(self):
+        tasks = [Task.objects.create(title=f'Task {i}', workspace=self.workspace) for i in range(5)]
+        # Several tasks with the same updated_at: pages are cut on (updated_at, id).
+        Task.objects.filter(pk__in=[task.pk for task in tasks[1:4]]).update(updated_at=now())
+
+        def sync_pass(token=None):
+            pages = []
+            while True:
+                data = self.sync(self.url, token)
+                pages.append(data)
+                token = data['sync_token']
+                if not data['has_more']:
+                    return pages, token
+
+        pages, token = sync_pass()
+        self.assertEqual([len(page['changed']) for page in pages], [2, 2, 1])
+        self.assertCountEqual([task['id'] for page in pages for task in page['changed']], [t.pk for t in tasks])
+
+        self.age(60)
+        Task.objects.filter(pk=tasks[0].pk).delete()
+        Task.objects.filter(pk__in=[t.pk for t in tasks[1:4]]).update(status='completed', updated_at=now())
+        first = self.sync(self.url, token)
+        self.assertTrue(first['has_more'])
+        self.assertEqual(first['deleted'], [tasks[0].pk])
+        # Deleted while paging: reported by the next pass, which starts when this one did.
+        Task.objects.filter(pk=tasks[4].pk).delete()
+        pages, token = sync_pass(first['sync_token'])
+        self.assertEqual([page['deleted'] for page in pages], [[]])
+        changed = [task['id'] for page in [first, *pages] for task in page['changed']]
+        self.assertEqual(changed, [t.pk for t in tasks[1:4]])
+        self.assertEqual(self.sync(self.url, token)['deleted'], [tasks[4].pk])
+
+    def test_rejects_tampered_continuation_tokens(self):
+        for i in range(3):
+            Task.objects.create(title=f'Task {i}', workspace=self.workspace)
+        with override_settings(SYNC_PAGE_SIZE=1):
+            token = self.sync(self.url)['sync_token']
+        self.assertEqual(self.client.get(self.url, {'since': token[:-2] + 'xx'}).status_code, 400)
+        other = Workspace.objects.create(title='Other', description='', admin=self.user)
+        self.assertEqual(self.client.get(f'/todo/workspaces/{other.id}/tasks/sync/', {'since': token}).status_code, 400)
+
+    def test_tombstone_purge(self):
+        Task.objects.create(title='Task', workspace=self.workspace).delete()
+        self.age(31 * 24 * 3600)
+        Task.objects.create(title='Recent', workspace=self.workspace).delete()
+        self.assertEqual(purge_tombstones(retention_days=30), 1)
+        self.assertEqual(TaskTombstone.objects.count(), 1)
+
+
+@override_settings(CACHE_IS_SHARED=True)
+class ListETagTests(AuthenticatedWorkspaceTestCase):
+
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task = Task.objects.create(title='Task', workspace=self.workspace)
+
+    def conditional_get(self, url, etag):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        return response, [q['sql'] for q in queries if '"workspace_task"' in q['sql']]
+
+    def test_matching_etag_skips_the_list_query(self):
+        etag = self.client.get(self.url)['ETag']
+        response, task_queries = self.conditional_get(self.url, etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(task_queries, [])
+
+    def test_writes_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/todo/workspace/tasks/{self.task.id}/complete/')
+        response, task_queries = self.conditional_get(self.url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertTrue(task_queries)
+
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.create(name='urgent', color='#FF0000', workspace=self.workspace)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_depends_on_the_query_string(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertNotEqual(self.client.get(f'{self.url}?status=pending')['ETag'], etag)
+        self.assertEqual(self.client.get(f'{self.url}?status=pending', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_user_lists(self):
+        for url in ('/todo/user/tasks/', '/todo/user/tags/', '/todo/workspaces/'):
+            etag = self.client.get(url)['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        etag = self.client.get('/todo/workspaces/')['ETag']
+        other = User.objects.create_user('member', 'member@example.com', 'password123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.workspace.members.add(other)
+        self.assertEqual(self.client.get('/todo/workspaces/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        etag = self.client.get('/todo/user/tasks/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            UserTask.objects.create(title='Mine', user=self.user)
+        self.assertEqual(self.client.get('/todo/user/tasks/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_settings(CACHE_IS_SHARED=False)
+    def test_no_etags_with_a_process_local_cache(self):
+        # Another worker's writes would not change the version this process sees.
+        response = self.client.get(self.url)
+        self.assertNotIn('ETag', response)
+        response, task_queries = self.conditional_get(self.url, '*')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(task_queries)
+        self.assertNotIn('ETag', self.client.get('/todo/workspaces/'))
+
+
+class TaskExportTests(AuthenticatedWorkspaceTestCase):
+    path = 'tasks/export/'
+
+    def setUp(self):
+        super().setUp()
+        tags = [Tag.objects.create(name=name, color='#FFFFFF', workspace=self.workspace) for name in ('b', 'a')]
+        for i in range(5):
+            task = Task.objects.create(title=f'Task {i}', workspace=self.workspace, assigned_to=self.user,
+                                       status='completed' if i % 2 else 'pending')
+            task.tags.set(tags[:i % 3])
+
+    def export(self, url, params=None):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        response, body = self.export(self.url)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row['title'] for row in rows], [f'Task {i}' for i in range(5)])
+        self.assertEqual(rows[2]['tags'], ['a', 'b'])
+        self.assertEqual(rows[0]['tags'], [])
+        self.assertEqual(rows[0]['assigned_to'], 'owner')
+
+    def test_csv_honors_list_filters(self):
+        response, body = self.export(self.url, {'output': 'csv', 'status': 'completed', 'ordering': '-title'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([row['title'] for row in rows], ['Task 3', 'Task 1'])
+        self.assertEqual(rows[1]['tags'], 'b')
+
+        self.assertEqual(self.client.get(self.url, {'output': 'xml'}).status_code, 400)
+
+    def test_csv_escapes_formulas(self):
+        task = Task.objects.create(title='=HYPERLINK("http://evil")', workspace=self.workspace)
+        task.tags.set([Tag.objects.create(name='@cmd', color='#FFFFFF', workspace=self.workspace)])
+        _, body = self.export(self.url, {'output': 'csv', 'search': 'HYPERLINK'})
+        row = list(csv.DictReader(io.StringIO(body)))[0]
+        self.assertEqual((row['title'], row['tags']), ('\'=HYPERLINK("http://evil")', "'@cmd"))
+
+        _, body = self.export(self.url, {'search': 'HYPERLINK'})
+        self.assertEqual(json.loads(body)['title'], '=HYPERLINK("http://evil")')
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_one_tag_query_per_chunk(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.export(self.url)
+        tag_queries = [q for q in queries if '"workspace_task_tags"' in q['sql']]
+        self.assertEqual(len(tag_queries), 3)
+
+    def test_user_tasks(self):
+        UserTask.objects.create(title='Mine', user=self.user)
+        response, body = self.export('/todo/user/tasks/export/', {'output': 'csv'})
+        header, row = csv.reader(io.StringIO(body))
+        self.assertEqual(header, ['id', 'title', 'status', 'created_at', 'final_at', 'tags'])
+        self.assertEqual(row[1:3] + row[4:], ['Mine', 'pending', '', ''])
+
+
+class TaskImportTests(AuthenticatedWorkspaceTestCase):
+    path = 'tasks/import/'
+
+    def setUp(self):
+        super().setUp()
+        Tag.objects.create(name='existing', color='#000000', workspace=self.workspace)
+
+    def upload(self, name, content, url=None):
+        upload = SimpleUploadedFile(name, content.encode())
+        return self.client.post(url or self.url, {'file': upload}, format='multipart')
+
+    def test_csv_with_errors(self):
+        Task.objects.create(title='Taken', workspace=self.workspace)
+        response = self.upload('tasks.csv', (
+            'title,status,assigned_to,tags\n'
+            'First,pending,owner,existing|new\n'
+            'Second,done,,\n'
+            'Taken,,,\n'
+            'Third,completed,,new\n'
+            'First,,,\n'
+            ',,,\n'
+        ))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 4))
+        self.assertCountEqual([error['line'] for error in response.data['errors']], [3, 4, 6, 7])
+
+        first = Task.objects.get(title='First')
+        self.assertEqual(first.assigned_to, self.user)
+        self.assertCountEqual(first.tags.values_list('name', flat=True), ['existing', 'new'])
+        self.assertIsNotNone(Task.objects.get(title='Third').final_at)
+        self.assertEqual(Tag.objects.filter(name='new').count(), 1)
+
+    def test_export_round_trip(self):
+        for i in range(3):
+            task = Task.objects.create(title=f'Task {i}', workspace=self.workspace, assigned_to=self.user)
+            task.tags.set(Tag.objects.all())
+        exported = b''.join(self.client.get(f'/todo/workspaces/{self.workspace.id}/tasks/export/')
+                            .streaming_content).decode()
+
+        other = Workspace.objects.create(title='Other', description='', admin=self.user)
+        response = self.upload('tasks.ndjson', exported, url=f'/todo/workspaces/{other.id}/tasks/import/')
+        self.assertEqual((response.status_code, response.data['created'], response.data['failed']), (201, 3, 0))
+        self.assertEqual(Task.tags.through.objects.filter(task__workspace=other, tag__name='existing').count(), 3)
+
+    def test_csv_export_round_trip_keeps_formula_like_cells(self):
+        Tag.objects.create(name='=sum', color='#000000', workspace=self.workspace)
+        task = Task.objects.create(title='-fix bug', workspace=self.workspace)
+        task.tags.set(Tag.objects.filter(name='=sum'))
+        Task.objects.create(title="'quoted", workspace=self.workspace)
+        exported = b''.join(self.client.get(f'/todo/workspaces/{self.workspace.id}/tasks/export/',
+                                            {'output': 'csv'}).streaming_content).decode()
+        self.assertIn("'-fix bug", exported)
+
+        other = Workspace.objects.create(title='Other', description='', admin=self.user)
+        response = self.upload('tasks.csv', exported, url=f'/todo/workspaces/{other.id}/tasks/import/')
+        self.assertEqual((response.status_code, response.data['created'], response.data['failed']), (201, 2, 0))
+        self.assertCountEqual(other.tasks.values_list('title', flat=True), ['-fix bug', "'quoted"])
+        self.assertEqual(list(Task.objects.get(workspace=other, title='-fix bug').tags.values_list('name', flat=True)),
+                         ['=sum'])
+
+    def test_query_count_does_not_depend_on_rows(self):
+        def count(rows):
+            content = '\n'.join(json.dumps({'title': f'{len(rows)}-{row}', 'tags': [row]}) for row in rows)
+            with self.settings(IMPORT_BATCH_SIZE=100), CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.upload('tasks.jsonl', content).status_code, 201)
+            return len(queries)
+
+        count(['warm-up'])  # Per-worker caches (blacklist, membership).
+        self.assertEqual(count(['a', 'b']), count([f'tag{i}' for i in range(50)]))
+
+    def test_impossible_dates_are_row_errors(self):
+        response = self.upload('tasks.jsonl', '{"title": "A", "final_at": "2024-13-45T10:00:00"}\n{"title": "B"}\n')
+        self.assertEqual((response.status_code, response.data['created'], response.data['failed']), (201, 1, 1))
+        self.assertEqual(response.data['errors'], [{'line': 1, 'errors': {'final_at': ['Datetime has wrong format.']}}])
+
+        response = self.upload('tasks.csv', 'title,final_at\nC,2024-02-30T10:00:00\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['line'], 2)
+
+    def test_oversized_csv_field_is_a_bad_request(self):
+        response = self.upload('tasks.csv', f'title\nA\n"{"x" * (csv.field_size_limit() + 1)}"\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('could not be read', response.data['error'])
+
+    def test_rejects_bad_uploads(self):
+        self.assertEqual(self.upload('tasks.txt', 'title\nA\n').status_code, 400)
+        self.assertEqual(self.upload('tasks.csv', 'name\nA\n').status_code, 400)
+        self.assertEqual(self.upload('tasks.csv', '').status_code, 400)
+
+    def test_command_writes_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tasks.jsonl')
+            with open(path, 'w') as file:
+                file.write('{"title": "A"}\nnot json\n{"title": "B", "status": "done"}\n')
+            out = io.StringIO()
+            call_command('import_tasks', self.workspace.id, path, '--batch-size', '1', stdout=out)
+            with open(f'{path}.errors.csv') as report:
+                rows = list(csv.reader(report))
+        self.assertIn('Imported 1 tasks.', out.getvalue())
+        self.assertEqual([row[:2] for row in rows], [['line', 'field'], ['2', 'row'], ['3', 'status']])
+
+
+class CompressionTests(AuthenticatedWorkspaceTestCase):
+    path = 'tasks/?limit=30'
+
+    def setUp(self):
+        super().setUp()
+        for i in range(30):
+            Task.objects.create(title=f'Task {i}', workspace=self.workspace)
+
+    def test_negotiation(self):
+        self.assertEqual(choose_encoding('gzip, deflate, br'), 'br')
+        self.assertEqual(choose_encoding('br;q=0.5, gzip'), 'gzip')
+        self.assertEqual(choose_encoding('br;q=0, *'), 'gzip')
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertIsNone(choose_encoding(''))
+
+    def test_compresses_json(self):
+        identity = self.client.get(self.url)
+        self.assertNotIn('Content-Encoding', identity)
+        self.assertIn('Accept-Encoding', identity['Vary'])
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertLess(len(response.content), len(identity.content))
+        self.assertEqual(gzip.decompress(response.content), identity.content)
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), identity.content)
+
+    def test_skips_small_responses(self):
+        response = self.client.get('/todo/user/tags/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_streaming_export(self):
+        url = f'/todo/workspaces/{self.workspace.id}/tasks/export/'
+        identity = b''.join(self.client.get(url).streaming_content)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), identity)
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_weak_etag_still_revalidates(self):
+        etag = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class NonMemberLookupTests(QueryCountTestCase):
+    path = 'non-members/'
+
+    def setUp(self):
+        super().setUp()
+        User.objects.bulk_create([User(username=username, email=f'{username}@example.com')
+                                  for username in ('alice', 'alicia', 'albert', 'bob', 'alex')])
+        self.workspace.members.add(User.objects.get(username='alex'))
+
+    def test_prefix_excludes_members_and_pages(self):
+        response = self.client.get(self.url, {'q': 'al', 'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], ['albert', 'alice'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'], ['alicia'])
+        self.assertIsNone(response.data['next'])
+
+    def test_query_count_does_not_depend_on_users(self):
+        url = f'{self.url}?q=us&limit=5'
+        few = self.count_queries(url)
+        User.objects.bulk_create([User(username=f'user{i}', email=f'user{i}@example.com') for i in range(30)])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual((len(queries), len(response.data['results'])), (few, 5))
+        self.assertIn('NOT EXISTS', queries[-1]['sql'])
+
+    def test_case_sensitivity_follows_the_database(self):
+        # Documented as backend-dependent: SQLite's LIKE ignores ASCII case, PostgreSQL's does not.
+        expected = {'sqlite': ['albert', 'alice', 'alicia'], 'postgresql': []}
+        if connection.vendor not in expected:
+            self.skipTest(f'Prefix case sensitivity is only documented for SQLite and PostgreSQL, not {connection.vendor}.')
+        response = self.client.get(self.url, {'q': 'AL'})
+        self.assertEqual(response.data['results'], expected[connection.vendor])
+
+    def test_requires_prefix_and_admin(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.client.force_authenticate(User.objects.get(username='alex'))
+        self.assertEqual(self.client.get(self.url, {'q': 'a'}).status_code, 403)
+
+
+class BulkMembershipTests(AuthenticatedWorkspaceTestCase):
+    path = 'members/bulk/'
+
+    def setUp(self):
+        super().setUp()
+        User.objects.bulk_create([User(username=f'user{i}', email=f'user{i}@example.com') for i in range(200)])
+
+    def members(self):
+        return set(self.workspace.members.values_list('username', flat=True))
+
+    def test_add_and_remove(self):
+        self.workspace.members.add(User.objects.get(username='user0'))
+        response = self.post({'usernames': ['user0', 'user1', 'user2', 'user1', 'ghost']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'added': ['user1', 'user2'], 'already_members': ['user0'],
+                                         'not_found': ['ghost']})
+        self.assertEqual(self.members(), {'owner', 'user0', 'user1', 'user2'})
+
+        response = self.client.delete(self.url, {'usernames': ['user1', 'user3', 'owner', 'ghost']}, format='json')
+        self.assertEqual(response.data, {'removed': ['user1'], 'not_members': ['user3'], 'not_found': ['ghost'],
+                                         'skipped': ['owner']})
+        self.assertEqual(self.members(), {'owner', 'user0', 'user2'})
+
+    def test_sends_the_same_signals_as_the_related_manager(self):
+        user0, user1 = User.objects.get(username='user0'), User.objects.get(username='user1')
+        self.workspace.members.add(user0)
+        sent = []
+
+        def receiver(action, pk_set, **kwargs):
+            sent.append((action, pk_set))
+
+        m2m_changed.connect(receiver, sender=Workspace.members.through)
+        self.addCleanup(m2m_changed.disconnect, receiver, sender=Workspace.members.through)
+        self.post({'usernames': ['user0', 'user1']})
+        self.client.delete(self.url, {'usernames': ['user0', 'user1']}, format='json')
+        self.assertEqual(sent, [
+            ('pre_add', {user1.pk}), ('post_add', {user1.pk}),
+            ('pre_remove', {user0.pk, user1.pk}), ('post_remove', {user0.pk, user1.pk}),
+        ])
+
+    def test_query_count_does_not_depend_on_team_size(self):
+        def add(usernames):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post({'usernames': usernames})
+            self.assertEqual(len(response.data['added']), len(usernames))
+            return len(queries)
+
+        self.assertEqual(add(['user0', 'user1']), add([f'user{i}' for i in range(2, 200)]))
+        self.assertEqual(len(self.members()), 201)
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_removed_members_lose_access(self):
+        member = User.objects.get(username='user0')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post({'usernames': ['user0']})
+        self.client.force_authenticate(member)
+        tasks_url = f'/todo/workspaces/{self.workspace.id}/tasks/'
+        self.assertEqual(self.client.get(tasks_url).status_code, 200)
+        self.assertEqual(self.client.delete(self.url, {'usernames': ['user1']}, format='json').status_code, 403)
+
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(self.url, {'usernames': ['user0']}, format='json')
+        self.client.force_authenticate(member)
+        self.assertEqual(self.client.get(tasks_url).status_code, 403)
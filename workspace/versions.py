@@ -0,0 +1,92 @@
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from todo_api.cache import aget_counter, bump_counter, get_counter
+
+
+# Content versions for conditional GETs on the list endpoints.
+#
+# A workspace's version covers its tasks (with their tags and assignees) and its
+# tags; a user's version covers their workspaces list, personal tasks and personal
+# tags. Writes bump the version after they commit: through the signals in
+# `workspace.signals`, and explicitly where signals are not sent (queryset
+# update(), bulk_create()). Lists read the version *before* querying, so the worst
+# a concurrent write can cause is one unnecessary full response.
+#
+# The versions must be the same in every worker, so ETags are only sent when the cache
+# is shared (settings.CACHE_IS_SHARED); otherwise the lists always answer in full.
+
+def workspace_scope(workspace_id):
+    return f'workspace:{int(workspace_id)}'
+
+
+def user_scope(user_id):
+    return f'user:{int(user_id)}'
+
+
+def _key(scope):
+    return f'{scope}:content-version'
+
+
+def get_version(scope):
+    return get_counter(_key(scope))
+
+
+async def aget_version(scope):
+    return await aget_counter(_key(scope))
+
+
+def bump(scope):
+    transaction.on_commit(partial(bump_counter, _key(scope)))
+
+
+def bump_workspace(workspace_id):
+    bump(workspace_scope(workspace_id))
+
+
+def bump_user(user_id):
+    bump(user_scope(user_id))
+
+
+def _etag(request, scope, version):
+    # The same version serves every page, filter and format of the list.
+    media_type = getattr(request, 'accepted_media_type', '')
+    digest = hashlib.sha1(f'{scope}:{version}:{request.get_full_path()}:{media_type}'.encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def list_etag(request, scope):
+    """The ETag of the list ``request`` asks for, or None when ETags are disabled."""
+    if not settings.CACHE_IS_SHARED:
+        return None
+    return _etag(request, scope, get_version(scope))
+
+
+async def alist_etag(request, scope):
+    if not settings.CACHE_IS_SHARED:
+        return None
+    return _etag(request, scope, await aget_version(scope))
+
+
+def not_modified(request, etag):
+    """
+    Returns a 304 response when the request's If-None-Match matches ``etag``,
+    otherwise None.
+    """
+    if etag is None:
+        return None
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        response['ETag'] = etag
+    return response
+
+
+def set_etag(response, etag):
+    if etag is not None:
+        response['ETag'] = etag
+    return response